@@ -0,0 +1,273 @@
+"""
+Ape-X style distributed DQN on a single CPU-only Linux machine
+Several actor processes collect experience, one learner process trains
+
+Reference: Horgan et al. (2018) "Distributed Prioritized Experience Replay"
+"""
+
+import os
+import queue
+import time
+
+import numpy as np
+import torch
+import torch.multiprocessing as mp
+import gymnasium as gym
+
+from train import create_agent
+
+
+def actor_epsilon(actor_id, num_actors, base_epsilon=0.4, alpha=7.0):
+    """Ape-X per-actor exploration: eps_i = base^(1 + alpha * i / (N - 1))"""
+    if num_actors == 1:
+        return base_epsilon
+    return base_epsilon ** (1 + alpha * actor_id / (num_actors - 1))
+
+
+class SharedWeights:
+    """
+    Learner -> actor weight broadcast
+
+    Holds a copy of the q_network whose tensors live in shared memory plus a
+    version counter. The learner copies its parameters in with publish();
+    actors poll the version and only reload when it changed.
+    """
+
+    def __init__(self, network, ctx=mp):
+        self.state = {k: v.detach().clone().share_memory_() for k, v in network.state_dict().items()}
+        self.version = ctx.Value('l', 0)
+        self.lock = ctx.Lock()
+
+    def publish(self, network):
+        with self.lock:
+            for key, value in network.state_dict().items():
+                self.state[key].copy_(value)
+            self.version.value += 1
+
+    def pull(self, network, known_version):
+        """Load the shared weights into network if newer; returns the version held"""
+        version = self.version.value
+        if version == known_version:
+            return known_version
+        with self.lock:
+            network.load_state_dict(self.state)
+            return self.version.value
+
+
+def put_until_stopped(transition_queue, item, stop_event, timeout=0.1):
+    """Queue item, giving up once stop_event is set (the learner may have stopped draining)"""
+    while not stop_event.is_set():
+        try:
+            transition_queue.put(item, timeout=timeout)
+            return True
+        except queue.Full:
+            pass
+    return False
+
+
+def run_actor(actor_id, algorithm, epsilon, shared_weights, transition_queue,
+              step_counters, stop_event, send_every=64, sync_every=400, seed=None):
+    """Actor process: act with a local q_network copy and stream transitions"""
+    torch.set_num_threads(1)
+    env = gym.make("LunarLander-v3")
+    state_dim = env.observation_space.shape[0]
+    action_dim = int(env.action_space.n)
+
+    agent = create_agent(algorithm, state_dim, action_dim, buffer_capacity=1)
+    agent.epsilon = epsilon
+    version = shared_weights.pull(agent.q_network, -1)
+
+    states = np.zeros((send_every, state_dim), dtype=np.float32)
+    next_states = np.zeros((send_every, state_dim), dtype=np.float32)
+    actions = np.zeros(send_every, dtype=np.int64)
+    rewards = np.zeros(send_every, dtype=np.float32)
+    dones = np.zeros(send_every, dtype=np.float32)
+    n = 0
+
+    obs, info = env.reset(seed=seed)
+    episode_reward, episode_length, steps = 0.0, 0, 0
+
+    while not stop_event.is_set():
+        action = agent.select_action(obs)
+        next_obs, reward, terminated, truncated, info = env.step(action)
+        done = terminated or truncated
+
+        states[n], actions[n], rewards[n], next_states[n], dones[n] = obs, action, reward, next_obs, done
+        n += 1
+        steps += 1
+        episode_reward += reward
+        episode_length += 1
+        obs = next_obs
+
+        if n == send_every:
+            if not put_until_stopped(transition_queue, ("transitions", (states.copy(), actions.copy(),
+                                     rewards.copy(), next_states.copy(), dones.copy())), stop_event):
+                break
+            step_counters[actor_id] += n
+            n = 0
+
+        if done:
+            if not put_until_stopped(transition_queue, ("episode", (actor_id, episode_reward, episode_length)),
+                                     stop_event):
+                break
+            obs, info = env.reset()
+            episode_reward, episode_length = 0.0, 0
+
+        if steps % sync_every == 0:
+            version = shared_weights.pull(agent.q_network, version)
+
+    env.close()
+    transition_queue.cancel_join_thread()
+
+
+def train_apex(
+    algorithm="ddqn",
+    num_actors=4,
+    max_updates=50000,
+    learning_starts=2000,
+    buffer_capacity=100000,
+    batch_size=64,
+    target_update_interval=1000,
+    publish_interval=100,
+    report_interval=10.0,
+    prioritized_replay=False,
+    seed=0,
+):
+    """Run the learner in this process against num_actors actor processes"""
+    print("="*60)
+    print(f"Ape-X {algorithm.upper()} on LunarLander-v3 ({num_actors} actors)")
+    print("="*60)
+
+    ctx = mp.get_context("spawn")
+    env = gym.make("LunarLander-v3")
+    state_dim = env.observation_space.shape[0]
+    action_dim = int(env.action_space.n)
+    env.close()
+
+    agent = create_agent(
+        algorithm, state_dim, action_dim,
+        buffer_capacity=buffer_capacity,
+        batch_size=batch_size,
+        prioritized_replay=prioritized_replay,
+    )
+    print(f"Learner: {agent.algorithm}, replay capacity {buffer_capacity}")
+
+    shared_weights = SharedWeights(agent.q_network, ctx)
+    transition_queue = ctx.Queue(maxsize=1024)
+    step_counters = ctx.Array('q', num_actors)
+    stop_event = ctx.Event()
+
+    actors = []
+    for actor_id in range(num_actors):
+        epsilon = actor_epsilon(actor_id, num_actors)
+        process = ctx.Process(
+            target=run_actor,
+            args=(actor_id, algorithm, epsilon, shared_weights, transition_queue,
+                  step_counters, stop_event),
+            kwargs={"seed": seed + actor_id},
+            daemon=True,
+        )
+        process.start()
+        actors.append(process)
+        print(f"  Actor {actor_id}: epsilon={epsilon:.4f}")
+
+    os.makedirs("models", exist_ok=True)
+
+    updates = 0
+    episode_rewards = []
+    best_avg_reward = -float('inf')
+    start_time = last_report = time.perf_counter()
+    last_steps, last_updates = 0, 0
+
+    try:
+        while updates < max_updates:
+            # Drain whatever the actors produced since the last update
+            while True:
+                try:
+                    kind, payload = transition_queue.get_nowait()
+                except queue.Empty:
+                    break
+                if kind == "transitions":
+                    agent.replay_buffer.push_batch(*payload)
+                else:
+                    episode_rewards.append(payload[1])
+
+            if len(agent.replay_buffer) < learning_starts:
+                time.sleep(0.01)
+            else:
+                agent.train_step()
+                updates += 1
+
+                if updates % target_update_interval == 0:
+                    agent.update_target_network()
+                if updates % publish_interval == 0:
+                    shared_weights.publish(agent.q_network)
+
+            now = time.perf_counter()
+            if now - last_report >= report_interval:
+                total_steps = sum(step_counters[:])
+                elapsed = now - last_report
+                avg_reward = np.mean(episode_rewards[-100:]) if episode_rewards else float('nan')
+                print(f"[{now - start_time:7.1f}s] "
+                      f"Actor steps/s: {(total_steps - last_steps) / elapsed:8.1f} | "
+                      f"Learner updates/s: {(updates - last_updates) / elapsed:7.1f} | "
+                      f"Episodes: {len(episode_rewards)} | "
+                      f"Avg Reward (100): {avg_reward:.2f}")
+                last_report, last_steps, last_updates = now, total_steps, updates
+
+                if episode_rewards and avg_reward > best_avg_reward:
+                    best_avg_reward = avg_reward
+                    agent.save("models/apex_best_model.pt")
+    finally:
+        stop_event.set()
+        for process in actors:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+
+    elapsed = time.perf_counter() - start_time
+    total_steps = sum(step_counters[:])
+    agent.save("models/apex_final_model.pt")
+
+    print("\n" + "="*60)
+    print(f"Actor steps: {total_steps} ({total_steps / elapsed:.1f} steps/s)")
+    print(f"Learner updates: {updates} ({updates / elapsed:.1f} updates/s)")
+    print(f"Episodes: {len(episode_rewards)}")
+    print("Models saved in 'models/' directory")
+    print("="*60)
+
+    return agent, episode_rewards
+
+
+if __name__ == "__main__":
+    import sys
+
+    algorithm = "ddqn"
+    num_actors = 4
+    max_updates = 50000
+    prioritized_replay = False
+
+    for arg in sys.argv[1:]:
+        arg_lower = arg.lower()
+        if arg_lower in ["dqn", "double_dqn", "ddqn", "dueling_dqn", "dueling", "duel",
+                         "dueling_double_dqn", "dueling_ddqn", "d3qn"]:
+            algorithm = arg_lower
+        elif arg_lower.startswith("--actors="):
+            num_actors = int(arg_lower.split("=", 1)[1])
+        elif arg_lower.startswith("--updates="):
+            max_updates = int(arg_lower.split("=", 1)[1])
+        elif arg_lower in ["--per", "--prioritized"]:
+            prioritized_replay = True
+        else:
+            print("Usage: python apex.py [algorithm] [--actors=N] [--updates=N] [--per]")
+            print("\nExamples:")
+            print("  python apex.py ddqn --actors=8")
+            print("  python apex.py d3qn --actors=6 --updates=200000 --per")
+            sys.exit(1)
+
+    train_apex(
+        algorithm=algorithm,
+        num_actors=num_actors,
+        max_updates=max_updates,
+        prioritized_replay=prioritized_replay,
+    )
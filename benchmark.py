@@ -0,0 +1,469 @@
+"""
+Throughput and latency benchmarks for the LunarLander DQN training stack
+Replay buffers, agent updates and action selection (eager vs compiled),
+environment stepping, checkpoint I/O and an end-to-end training loop;
+results can be written as JSON and checked against a stored baseline
+"""
+
+import json
+import os
+import platform
+import tempfile
+import time
+from datetime import datetime
+
+import gymnasium as gym
+import numpy as np
+import torch
+
+from train import create_agent, make_vector_env
+from compiled import compile_module
+from replay_buffer import ReplayBuffer, PrioritizedReplayBuffer, MemmapReplayBuffer
+from dqn_lunarlander_251129_integration import Qnet, DuelingQnet
+
+
+ALGORITHMS = ["dqn", "ddqn", "dueling", "d3qn"]
+SUITES = ["replay", "agents", "networks", "env", "checkpoint", "end_to_end"]
+EXTRA_SUITES = ["memmap_replay"]     # opt-in via --suites= (writes several GB)
+DEFAULT_CAPACITIES = [10_000, 100_000, 1_000_000]
+MEMMAP_CAPACITIES = [1_000_000, 10_000_000, 50_000_000]
+LOWER_IS_BETTER = {"us", "MB"}
+DEFAULT_BATCH_SIZES = [32, 64, 256]
+
+
+def time_call(fn, iterations=1000, warmup=50):
+    """Median wall time of fn() in microseconds"""
+    for _ in range(warmup):
+        fn()
+    times = np.empty(iterations)
+    for i in range(iterations):
+        start = time.perf_counter()
+        fn()
+        times[i] = time.perf_counter() - start
+    return float(np.median(times) * 1e6)
+
+
+def latency(name, us, mode="eager"):
+    """Result row for a per-call latency (lower is better)"""
+    return {"name": name, "mode": mode, "value": us, "unit": "us"}
+
+
+def throughput(name, per_second, mode="eager", unit="steps/s"):
+    """Result row for a rate (higher is better)"""
+    return {"name": name, "mode": mode, "value": per_second, "unit": unit}
+
+
+def memory(name, mb, mode="eager"):
+    """Result row for a memory footprint (lower is better)"""
+    return {"name": name, "mode": mode, "value": mb, "unit": "MB"}
+
+
+def resident_memory_mb():
+    """(anonymous, file-backed) resident set size of this process in MB (Linux /proc)"""
+    sizes = {}
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(("RssAnon:", "RssFile:")):
+                key, value = line.split(":")
+                sizes[key] = int(value.split()[0]) / 1024
+    return sizes.get("RssAnon", 0.0), sizes.get("RssFile", 0.0)
+
+
+def random_transitions(n, seed=0):
+    """n random LunarLander-shaped transitions as column arrays"""
+    rng = np.random.default_rng(seed)
+    return (
+        rng.standard_normal((n, 8)).astype(np.float32),
+        rng.integers(0, 4, n),
+        rng.standard_normal(n).astype(np.float32),
+        rng.standard_normal((n, 8)).astype(np.float32),
+        (rng.random(n) < 0.01).astype(np.float32),
+    )
+
+
+def fill_buffer(buffer, n, chunk=100_000):
+    """Push n random transitions in vectorized chunks"""
+    for start in range(0, n, chunk):
+        buffer.push_batch(*random_transitions(min(chunk, n - start), seed=start))
+    return buffer
+
+
+def make_filled_agent(algorithm, batch_size=64, compiled=False, seed=0):
+    """Agent with a replay buffer of random LunarLander-shaped transitions"""
+    torch.manual_seed(seed)
+    agent = create_agent(algorithm, 8, 4, batch_size=batch_size, buffer_capacity=10000)
+    agent.replay_buffer.push_batch(*random_transitions(5000, seed))
+    if compiled:
+        agent.compile()
+    return agent
+
+
+def bench_replay(iterations=1000, capacities=DEFAULT_CAPACITIES, batch_sizes=DEFAULT_BATCH_SIZES):
+    """push / push_batch / sample latency of uniform and prioritized replay at several capacities"""
+    rows = []
+    state = np.zeros(8, dtype=np.float32)
+    chunk = random_transitions(16)
+    for buffer_class in (ReplayBuffer, PrioritizedReplayBuffer):
+        kind = "uniform" if buffer_class is ReplayBuffer else "per"
+        for capacity in capacities:
+            buffer = fill_buffer(buffer_class(capacity), capacity)
+            rows.append(latency(f"replay {kind} push (cap {capacity})",
+                                time_call(lambda b=buffer: b.push(state, 0, 0.0, state, 0.0), iterations)))
+            rows.append(latency(f"replay {kind} push_batch 16 (cap {capacity})",
+                                time_call(lambda b=buffer: b.push_batch(*chunk), iterations)))
+            for batch_size in batch_sizes:
+                rows.append(latency(f"replay {kind} sample {batch_size} (cap {capacity})",
+                                    time_call(lambda b=buffer: b.sample(batch_size), iterations)))
+            if buffer_class is PrioritizedReplayBuffer:
+                indices = buffer.sample_indices(64)
+                errors = np.random.default_rng(0).random(64).astype(np.float32)
+                rows.append(latency(f"replay per update_priorities 64 (cap {capacity})",
+                                    time_call(lambda b=buffer: b.update_priorities(indices, errors), iterations)))
+            del buffer
+    return rows
+
+
+def bench_memmap_replay(iterations=1000, capacities=MEMMAP_CAPACITIES, batch_size=64, directory=None):
+    """
+    MemmapReplayBuffer fill rate, push / sample latency and resident memory
+    with float32 and float16 states at large capacities
+
+    Resident memory is split into anonymous (RAM-only columns, ~7 bytes per
+    transition) and file-backed pages (memory-mapped states currently
+    resident in the page cache, reclaimable by the OS).
+    """
+    rows = []
+    chunk = random_transitions(100_000)
+    state = np.zeros(8, dtype=np.float32)
+    for compress in (False, True):
+        mode = "float16" if compress else "float32"
+        for capacity in capacities:
+            with tempfile.TemporaryDirectory(dir=directory) as tmp:
+                anon_before, _ = resident_memory_mb()
+                buffer = MemmapReplayBuffer(capacity, tmp, compress_states=compress)
+                start = time.perf_counter()
+                for offset in range(0, capacity, len(chunk[1])):
+                    n = min(len(chunk[1]), capacity - offset)
+                    buffer.push_batch(*(column[:n] for column in chunk))
+                rows.append(throughput(f"memmap replay fill (cap {capacity})",
+                                       capacity / (time.perf_counter() - start), mode, "transitions/s"))
+                rows.append(latency(f"memmap replay push (cap {capacity})",
+                                    time_call(lambda b=buffer: b.push(state, 0, 0.0, state, 0.0), iterations), mode))
+                sample_us = time_call(lambda b=buffer: b.sample(batch_size), iterations)
+                rows.append(latency(f"memmap replay sample {batch_size} (cap {capacity})", sample_us, mode))
+                rows.append(throughput(f"memmap replay sampled transitions (cap {capacity})",
+                                       batch_size / sample_us * 1e6, mode, "transitions/s"))
+                anon, file_backed = resident_memory_mb()
+                rows.append(memory(f"memmap replay RSS anon (cap {capacity})", anon - anon_before, mode))
+                rows.append(memory(f"memmap replay RSS file-backed (cap {capacity})", file_backed, mode))
+                del buffer
+    return rows
+
+
+def bench_agents(iterations=1000, batch_sizes=DEFAULT_BATCH_SIZES, modes=("eager", "compiled", "prefetch")):
+    """
+    select_action latency and train_step latency per batch size for every agent class
+
+    "prefetch" is the eager agent with minibatches gathered by a background
+    PrefetchSampler (only train_step differs from "eager").
+    """
+    state = np.zeros(8, dtype=np.float32)
+    states = np.zeros((16, 8), dtype=np.float32)
+    rows = []
+    for algorithm in ALGORITHMS:
+        for mode in modes:
+            compiled = mode == "compiled"
+            agent = make_filled_agent(algorithm, batch_sizes[0], compiled)
+            rows.append(latency(f"{agent.algorithm} select_action",
+                                time_call(lambda: agent.select_action(state, training=False), iterations), mode))
+            rows.append(latency(f"{agent.algorithm} select_actions (batch 16)",
+                                time_call(lambda: agent.select_actions(states, training=False), iterations), mode))
+            for batch_size in batch_sizes:
+                agent.batch_size = batch_size
+                if mode == "prefetch":
+                    agent.start_prefetch()
+                rows.append(latency(f"{agent.algorithm} train_step (batch {batch_size})",
+                                    time_call(agent.train_step, iterations), mode))
+            agent.stop_prefetch()
+    return rows
+
+
+def bench_script_networks(iterations=1000, modes=("eager", "compiled")):
+    """Forward latency of the Qnet / DuelingQnet used by the comparison scripts"""
+    rows = []
+    for net_class in (Qnet, DuelingQnet):
+        net = net_class()
+        for batch in (1, 64):
+            x = torch.randn(batch, 8)
+            for mode in modes:
+                if mode == "prefetch":
+                    continue
+                forward = compile_module(net) if mode == "compiled" else net
+                with torch.no_grad():
+                    us = time_call(lambda: forward(x), iterations)
+                rows.append(latency(f"{net_class.__name__} forward (batch {batch})", us, mode))
+    return rows
+
+
+def env_steps_per_second(env, steps, vector=False):
+    """Random-action steps/s (transitions/s for a vector env), resetting single envs on done"""
+    env.reset(seed=0)
+    env.action_space.seed(0)
+    start = time.perf_counter()
+    for _ in range(steps):
+        _, _, terminated, truncated, _ = env.step(env.action_space.sample())
+        if not vector and (terminated or truncated):
+            env.reset()
+    elapsed = time.perf_counter() - start
+    return steps * (env.num_envs if vector else 1) / elapsed
+
+
+def bench_env(steps=5000, num_envs=(4, 8)):
+    """LunarLander-v3 steps/s for a single env and sync vector envs (headless, no rendering)"""
+    env = gym.make("LunarLander-v3")
+    rows = [throughput("env LunarLander-v3 single", env_steps_per_second(env, steps))]
+    env.close()
+    for n in num_envs:
+        env = make_vector_env(n)
+        rows.append(throughput(f"env LunarLander-v3 sync vector x{n}",
+                               env_steps_per_second(env, max(steps // n, 1), vector=True), unit="transitions/s"))
+        env.close()
+    return rows
+
+
+def bench_checkpoint(iterations=50):
+    """agent.save / agent.load latency (networks + optimizer state)"""
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for algorithm in ALGORITHMS:
+            agent = make_filled_agent(algorithm)
+            agent.train_step()
+            path = os.path.join(tmp, f"{algorithm}.pt")
+            rows.append(latency(f"{agent.algorithm} checkpoint save",
+                                time_call(lambda: agent.save(path), iterations, warmup=5)))
+            rows.append(latency(f"{agent.algorithm} checkpoint load",
+                                time_call(lambda: agent.load(path), iterations, warmup=5)))
+    return rows
+
+
+def bench_end_to_end(steps=3000, algorithm="ddqn", batch_size=64, learning_starts=1000):
+    """Env steps/s of the single-env collect + train loop of train_dqn (one update per step)"""
+    torch.manual_seed(0)
+    np.random.seed(0)
+    env = gym.make("LunarLander-v3")
+    agent = create_agent(algorithm, 8, 4, batch_size=batch_size)
+    obs, _ = env.reset(seed=0)
+    updates = 0
+    start = time.perf_counter()
+    for _ in range(steps):
+        action = agent.select_action(obs)
+        next_obs, reward, terminated, truncated, _ = env.step(action)
+        agent.replay_buffer.push(obs, action, reward, next_obs, terminated or truncated)
+        if len(agent.replay_buffer) >= learning_starts:
+            agent.train_step()
+            updates += 1
+        obs = next_obs
+        if terminated or truncated:
+            obs, _ = env.reset()
+            agent.decay_epsilon()
+    elapsed = time.perf_counter() - start
+    env.close()
+    return [
+        throughput(f"end-to-end {agent.algorithm} train loop", steps / elapsed),
+        throughput(f"end-to-end {agent.algorithm} updates", updates / elapsed, unit="updates/s"),
+    ]
+
+
+def check_checkpoint_compatibility():
+    """A checkpoint saved by a compiled agent loads into an eager one (and back)"""
+    states = torch.randn(16, 8)
+    with tempfile.TemporaryDirectory() as tmp:
+        for algorithm in ALGORITHMS:
+            compiled = make_filled_agent(algorithm, compiled=True)
+            for _ in range(5):
+                compiled.train_step()
+            path = os.path.join(tmp, f"{algorithm}.pt")
+            compiled.save(path)
+
+            eager = create_agent(algorithm, 8, 4)
+            eager.load(path)
+            assert eager.q_network.state_dict().keys() == compiled.q_network.state_dict().keys()
+            with torch.no_grad():
+                assert torch.allclose(eager.q_network(states), compiled.policy_fn(states), atol=1e-5)
+
+            eager.save(path)
+            compiled.load(path)
+    print("Checkpoint compatibility: OK (compiled <-> eager save/load)")
+
+
+def run_suites(suites=SUITES, iterations=1000, capacities=DEFAULT_CAPACITIES,
+               batch_sizes=DEFAULT_BATCH_SIZES, modes=("eager", "compiled", "prefetch"),
+               memmap_capacities=MEMMAP_CAPACITIES, memmap_dir=None):
+    """Run the selected suites; returns the list of result rows"""
+    rows = []
+    for suite in suites:
+        print(f"Running {suite}...", flush=True)
+        if suite == "replay":
+            rows += bench_replay(iterations, capacities, batch_sizes)
+        elif suite == "memmap_replay":
+            rows += bench_memmap_replay(iterations, memmap_capacities, batch_sizes[0], memmap_dir)
+        elif suite == "agents":
+            rows += bench_agents(iterations, batch_sizes, modes)
+        elif suite == "networks":
+            rows += bench_script_networks(iterations, modes)
+        elif suite == "env":
+            rows += bench_env(max(iterations * 5, 500))
+        elif suite == "checkpoint":
+            rows += bench_checkpoint(max(iterations // 20, 10))
+        elif suite == "end_to_end":
+            rows += bench_end_to_end(max(iterations * 3, 1500))
+        else:
+            raise ValueError(f"Unknown suite: {suite} (choose from {', '.join(SUITES + EXTRA_SUITES)})")
+    return rows
+
+
+def environment_info():
+    return {
+        "time": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "torch": torch.__version__,
+        "torch_threads": torch.get_num_threads(),
+        "numpy": np.__version__,
+        "gymnasium": gym.__version__,
+    }
+
+
+def save_results(rows, filepath):
+    with open(filepath, "w") as f:
+        json.dump({"environment": environment_info(), "results": rows}, f, indent=2)
+
+
+def row_key(row):
+    return f"{row['name']} [{row['mode']}]"
+
+
+def compare_to_baseline(rows, baseline_rows, threshold=0.10):
+    """
+    Relative change of every result against the baseline
+
+    Latencies and memory (units 'us', 'MB') regress when they grow by more
+    than threshold, rates when they drop by more than threshold. Rows missing from either
+    side are ignored.
+
+    Returns:
+        {row key: (change, regressed)} where change > 0 means better
+    """
+    baseline = {row_key(row): row for row in baseline_rows}
+    changes = {}
+    for row in rows:
+        base = baseline.get(row_key(row))
+        if base is None or base["unit"] != row["unit"] or base["value"] <= 0:
+            continue
+        if row["unit"] in LOWER_IS_BETTER:
+            change = base["value"] / row["value"] - 1
+        else:
+            change = row["value"] / base["value"] - 1
+        changes[row_key(row)] = (change, change < -threshold)
+    return changes
+
+
+def print_rows(rows, changes=None):
+    """Results table; speedup is compiled vs eager, delta is vs the baseline (+ = better)"""
+    print(f"{'Benchmark':<48} {'Mode':<9} {'Value':>12} {'Unit':<14} {'speedup':>8} {'vs base':>9}")
+    print("-" * 106)
+    eager = {}
+    for row in rows:
+        speedup = ""
+        if row["mode"] == "eager":
+            eager[row["name"]] = row["value"]
+        elif row["name"] in eager:
+            speedup = f"{eager[row['name']] / row['value']:.2f}x"
+        delta = ""
+        if changes and row_key(row) in changes:
+            change, regressed = changes[row_key(row)]
+            delta = f"{change * 100:+.1f}%" + (" !" if regressed else "")
+        print(f"{row['name']:<48} {row['mode']:<9} {row['value']:>12.1f} {row['unit']:<14} "
+              f"{speedup:>8} {delta:>9}")
+
+
+if __name__ == "__main__":
+    import sys
+
+    iterations = 1000
+    suites = SUITES
+    capacities = DEFAULT_CAPACITIES
+    batch_sizes = DEFAULT_BATCH_SIZES
+    modes = ["eager", "compiled", "prefetch"]
+    memmap_capacities = MEMMAP_CAPACITIES
+    memmap_dir = None
+    json_path = None
+    baseline_path = None
+    threshold = 0.10
+
+    for arg in sys.argv[1:]:
+        if arg.startswith("--iterations="):
+            iterations = int(arg.split("=", 1)[1])
+        elif arg.startswith("--suites="):
+            suites = arg.split("=", 1)[1].split(",")
+        elif arg.startswith("--capacities="):
+            capacities = [int(c) for c in arg.split("=", 1)[1].split(",")]
+        elif arg.startswith("--batch-sizes="):
+            batch_sizes = [int(b) for b in arg.split("=", 1)[1].split(",")]
+        elif arg.startswith("--batch-size="):
+            batch_sizes = [int(arg.split("=", 1)[1])]
+        elif arg.startswith("--memmap-capacities="):
+            memmap_capacities = [int(c) for c in arg.split("=", 1)[1].split(",")]
+        elif arg.startswith("--memmap-dir="):
+            memmap_dir = arg.split("=", 1)[1]
+        elif arg.startswith("--modes="):
+            modes = arg.split("=", 1)[1].split(",")
+        elif arg.startswith("--json="):
+            json_path = arg.split("=", 1)[1]
+        elif arg.startswith("--baseline="):
+            baseline_path = arg.split("=", 1)[1]
+        elif arg.startswith("--threshold="):
+            threshold = float(arg.split("=", 1)[1])
+        else:
+            print("Usage: python benchmark.py [--iterations=N] [--suites=replay,agents,...] "
+                  "[--capacities=N,...] [--batch-sizes=N,...] [--modes=eager,compiled,prefetch] "
+                  "[--json=results.json] [--baseline=baseline.json] [--threshold=0.10] "
+                  "[--memmap-capacities=N,...] [--memmap-dir=DIR]")
+            print(f"\nSuites: {', '.join(SUITES)} (default), {', '.join(EXTRA_SUITES)} (opt-in)")
+            print("\nExamples:")
+            print("  python benchmark.py --json=benchmark_baseline.json            # record a baseline")
+            print("  python benchmark.py --baseline=benchmark_baseline.json        # fail on >10% regressions")
+            print("  python benchmark.py --suites=replay,agents --modes=eager --iterations=200")
+            print("  python benchmark.py --suites=memmap_replay --memmap-dir=/data/tmp   # 1M / 10M / 50M")
+            sys.exit(1)
+
+    torch.set_num_threads(1)
+    print("="*60)
+    print(f"DQN training stack benchmarks (torch {torch.__version__}, "
+          f"{torch.get_num_threads()} thread, {os.cpu_count()} CPUs)")
+    print("="*60)
+    rows = run_suites(suites, iterations, capacities, batch_sizes, modes, memmap_capacities, memmap_dir)
+
+    changes = None
+    if baseline_path is not None:
+        with open(baseline_path) as f:
+            changes = compare_to_baseline(rows, json.load(f)["results"], threshold)
+    print()
+    print_rows(rows, changes)
+
+    if json_path is not None:
+        save_results(rows, json_path)
+        print(f"\nResults written to {json_path}")
+    if "compiled" in modes and "agents" in suites:
+        print()
+        check_checkpoint_compatibility()
+
+    if changes is not None:
+        regressions = [key for key, (_, regressed) in changes.items() if regressed]
+        print(f"\nBaseline {baseline_path}: {len(changes)} compared, {len(regressions)} regressed "
+              f"(threshold {threshold * 100:.0f}%)")
+        for key in regressions:
+            print(f"  REGRESSION {key}: {changes[key][0] * 100:+.1f}%")
+        sys.exit(1 if regressions else 0)
@@ -0,0 +1,143 @@
+"""
+Background checkpoint writing for the LunarLander DQN agents
+The training loop only snapshots state dicts into memory; torch.save and
+disk I/O run on a worker thread with atomic renames and a retention policy
+"""
+
+import copy
+import os
+import threading
+from collections import deque
+
+import torch
+
+
+def snapshot(state):
+    """Detached CPU copy of a (nested) checkpoint dict, safe to serialize while training continues"""
+    if isinstance(state, torch.Tensor):
+        return state.detach().to("cpu", copy=True)
+    if isinstance(state, dict):
+        return {key: snapshot(value) for key, value in state.items()}
+    if isinstance(state, (list, tuple)):
+        return type(state)(snapshot(value) for value in state)
+    return copy.deepcopy(state)
+
+
+def atomic_save(state, filepath):
+    """torch.save to a temporary file, then rename over filepath (readers never see a partial file)"""
+    directory = os.path.dirname(filepath)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{filepath}.tmp"
+    with open(tmp_path, "wb") as f:
+        torch.save(state, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, filepath)
+
+
+class CheckpointWriter:
+    """
+    Asynchronous checkpoint writer
+
+    submit() stores a snapshot and returns immediately; a single worker
+    thread writes pending snapshots with atomic_save(). A newer snapshot for
+    a path that has not been written yet replaces the older one, so a run of
+    best-model improvements costs one write. Paths submitted with a group
+    name keep only the newest keep_last files of that group on disk;
+    existing={group: [paths, oldest first]} registers files written by an
+    earlier process (e.g. before a resume) so they are pruned as well.
+    Write errors are re-raised from the next submit(), flush() or close().
+    """
+
+    def __init__(self, keep_last=5, existing=None):
+        self.keep_last = keep_last
+        self.pending = {}           # path -> (state, group), insertion ordered
+        self.written = {group: deque(paths) for group, paths in (existing or {}).items()}
+        self.writes = 0
+        self.coalesced = 0
+        self.error = None
+
+        self._busy = False
+        self._closed = False
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="checkpoint-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, state, filepath, group=None):
+        """Queue a checkpoint dict (snapshotted here) for writing to filepath"""
+        state = snapshot(state)
+        with self._condition:
+            self._raise_error()
+            if self._closed:
+                raise RuntimeError("CheckpointWriter is closed")
+            if filepath in self.pending:
+                del self.pending[filepath]
+                self.coalesced += 1
+            self.pending[filepath] = (state, group)
+            self._condition.notify_all()
+
+    def save(self, agent, filepath, group=None):
+        """Queue agent.checkpoint_state() for writing to filepath"""
+        self.submit(agent.checkpoint_state(), filepath, group)
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self.pending and not self._closed:
+                    self._condition.wait()
+                if not self.pending:
+                    return
+                filepath = next(iter(self.pending))
+                state, group = self.pending.pop(filepath)
+                self._busy = True
+
+            try:
+                atomic_save(state, filepath)
+                for path in self._retain(filepath, group):
+                    if os.path.exists(path):
+                        os.remove(path)
+                error = None
+            except Exception as e:
+                error = e
+            with self._condition:
+                if error is None:
+                    self.writes += 1
+                else:
+                    self.error = error
+                self._busy = False
+                self._condition.notify_all()
+
+    def _retain(self, filepath, group):
+        """Record a written file of a group; returns the files that fall out of retention"""
+        if group is None or self.keep_last is None:
+            return []
+        paths = self.written.setdefault(group, deque())
+        if filepath in paths:
+            paths.remove(filepath)
+        paths.append(filepath)
+        removed = []
+        while len(paths) > self.keep_last:
+            removed.append(paths.popleft())
+        return removed
+
+    def _raise_error(self):
+        if self.error is not None:
+            error, self.error = self.error, None
+            raise RuntimeError("Background checkpoint write failed") from error
+
+    def flush(self):
+        """Block until every submitted checkpoint is on disk"""
+        with self._condition:
+            while self.pending or self._busy:
+                self._condition.wait()
+            self._raise_error()
+
+    def close(self):
+        """Write everything still pending and stop the worker thread"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join()
+        with self._condition:
+            self._raise_error()
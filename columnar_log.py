@@ -0,0 +1,325 @@
+"""
+컬럼형(columnar) 바이너리 학습 로그
+컬럼마다 하나의 원시(raw) 배열 파일에 추가 기록하고, np.memmap 으로 복사 없이 읽음
+"""
+
+import json
+import os
+import shutil
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+from training_logger import StreamingTrainingLogger, load_streaming_log
+
+
+SCHEMA_FILE = 'schema.json'
+META_FILE = 'meta.json'
+
+EPISODE_COLUMNS = {
+    'episodes': 'int64',
+    'rewards': 'float64',
+    'avg_rewards': 'float64',
+    'best_rewards': 'float64',
+    'losses': 'float64',
+    'epsilons': 'float64',
+}
+TEST_COLUMNS = {
+    'test_episodes': 'int64',
+    'test_rewards': 'float64',
+}
+# 스텝 지표 컬럼 (log_step() 에 없는 지표는 NaN 으로 기록, 예: 학습 시작 전 loss)
+STEP_COLUMNS = {
+    'step': 'int64',
+    'epsilon': 'float64',
+    'buffer_size': 'float64',
+    'loss': 'float64',
+}
+
+# StreamingTrainingLogger 레코드 필드 -> 컬럼 이름
+EPISODE_FIELDS = {'episode': 'episodes', 'reward': 'rewards', 'avg_reward': 'avg_rewards',
+                  'best_reward': 'best_rewards', 'loss': 'losses', 'epsilon': 'epsilons'}
+TEST_FIELDS = {'episode': 'test_episodes', 'reward': 'test_rewards'}
+
+
+class ColumnTable:
+    """
+    추가 전용 컬럼 테이블
+
+    디렉토리 하나에 컬럼마다 <column>.bin (리틀 엔디언 원시 배열) 파일과
+    dtype 을 적은 schema.json 을 둡니다. 행은 메모리 버퍼에 모았다가
+    flush() 때 컬럼별로 한 번씩 파일 끝에 추가합니다.
+    """
+
+    def __init__(self, directory, columns, rows=None):
+        """
+        Args:
+            directory: 테이블 디렉토리
+            columns: {컬럼 이름: dtype 문자열}
+            rows: None 이면 기존 컬럼 파일을 비움, 정수면 앞의 rows 행만 남기고
+                  이어서 추가 (학습 재개용)
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.dtypes = {name: np.dtype(dtype).newbyteorder('<') for name, dtype in columns.items()}
+
+        with open(self.directory / SCHEMA_FILE, 'w') as f:
+            json.dump({name: dtype.str for name, dtype in self.dtypes.items()}, f)
+
+        if rows is None:
+            self._files = {name: open(self.directory / f'{name}.bin', 'wb') for name in self.dtypes}
+        else:
+            # 체크포인트 이후에 기록된 행은 잘라냄
+            self._files = {}
+            for name, dtype in self.dtypes.items():
+                path = self.directory / f'{name}.bin'
+                with open(path, 'ab') as f:
+                    f.truncate(rows * dtype.itemsize)
+                self._files[name] = open(path, 'ab')
+        self._buffers = {name: [] for name in self.dtypes}
+        self.pending = 0
+        self.rows = rows or 0
+
+    def append(self, **row):
+        """한 행 추가 (모든 컬럼 값 필요)"""
+        for name, buffer in self._buffers.items():
+            buffer.append(row[name])
+        self.pending += 1
+        self.rows += 1
+
+    def extend(self, **columns):
+        """여러 행을 컬럼 배열로 한 번에 추가 (바로 파일에 기록)"""
+        self.flush()
+        for name, f in self._files.items():
+            np.asarray(columns[name], dtype=self.dtypes[name]).tofile(f)
+            f.flush()
+        self.rows += len(next(iter(columns.values()), []))
+
+    def flush(self):
+        if not self.pending:
+            return
+        for name, f in self._files.items():
+            np.asarray(self._buffers[name], dtype=self.dtypes[name]).tofile(f)
+            f.flush()
+            self._buffers[name].clear()
+        self.pending = 0
+
+    def close(self):
+        self.flush()
+        for f in self._files.values():
+            f.close()
+
+
+def read_table(directory):
+    """
+    컬럼 테이블을 {컬럼 이름: 읽기 전용 np.memmap} 으로 열기
+
+    파일 크기에서 행 수를 계산하며, 비정상 종료로 컬럼 길이가 어긋나면
+    모든 컬럼을 가장 짧은 길이에 맞춥니다. 데이터는 복사하지 않습니다.
+    """
+    directory = Path(directory)
+    with open(directory / SCHEMA_FILE) as f:
+        dtypes = {name: np.dtype(dtype) for name, dtype in json.load(f).items()}
+
+    lengths = {name: os.path.getsize(directory / f'{name}.bin') // dtype.itemsize
+               for name, dtype in dtypes.items()}
+    n = min(lengths.values(), default=0)
+
+    columns = {}
+    for name, dtype in dtypes.items():
+        if n == 0:
+            columns[name] = np.empty(0, dtype=dtype)
+        else:
+            columns[name] = np.memmap(directory / f'{name}.bin', dtype=dtype, mode='r', shape=(n,))
+    return columns
+
+
+class ColumnarTrainingLogger(StreamingTrainingLogger):
+    """
+    컬럼형 바이너리 형식으로 기록하는 스트리밍 로거
+
+    training_logs/<algorithm>_log/ 아래에
+    - episodes/ : 에피소드별 컬럼 (episodes, rewards, avg_rewards, ...)
+    - tests/    : 테스트 결과 컬럼 (test_episodes, test_rewards)
+    - steps/    : 스텝 지표 컬럼 (step_columns 로 고정, 빠진 지표는 NaN)
+    - meta.json : 알고리즘 이름, 시작/종료 시각, 최종 테스트 보상
+    을 기록합니다. 버퍼링/flush 규칙과 인터페이스는 StreamingTrainingLogger 와 같습니다.
+
+    resume 에 이전 실행의 row_counts() 를 주면 로그를 지우지 않고 그 행 수까지
+    잘라낸 뒤 이어서 기록하고, get_summary 용 누적 값도 복원합니다.
+    """
+
+    def __init__(self, algorithm_name, log_dir='training_logs', flush_every=100,
+                 flush_interval=5.0, step_every=1, resume=None, step_columns=STEP_COLUMNS):
+        self.resume = resume
+        self.step_columns = step_columns
+        super().__init__(algorithm_name, log_dir, flush_every, flush_interval, step_every)
+        if resume is not None:
+            self._restore_summary()
+
+    def _open(self):
+        self.path = self.log_dir / f'{self.algorithm}_log'
+        self.step_path = self.path / 'steps'
+        self.meta = {}
+        self.step_table = None
+        if self.resume is not None:
+            with open(self.path / META_FILE) as f:
+                self.meta = json.load(f)
+            self.episode_table = ColumnTable(self.path / 'episodes', EPISODE_COLUMNS, self.resume['episodes'])
+            self.test_table = ColumnTable(self.path / 'tests', TEST_COLUMNS, self.resume['tests'])
+            if (self.step_path / SCHEMA_FILE).exists():
+                with open(self.step_path / SCHEMA_FILE) as f:
+                    self.step_table = ColumnTable(self.step_path, json.load(f), self.resume['steps'])
+            self._step_calls = self.resume['step_calls']
+            return
+
+        # 같은 알고리즘의 이전 로그는 교체 (TrainingLogger 의 덮어쓰기와 동일)
+        if self.path.is_dir():
+            shutil.rmtree(self.path)
+        self.path.mkdir()
+        self.episode_table = ColumnTable(self.path / 'episodes', EPISODE_COLUMNS)
+        self.test_table = ColumnTable(self.path / 'tests', TEST_COLUMNS)
+
+    def _restore_summary(self):
+        """이어서 기록하는 경우 기존 행으로 get_summary 누적 값 복원"""
+        self.flush()
+        episodes = read_table(self.path / 'episodes')
+        self.num_episodes = len(episodes['rewards'])
+        if self.num_episodes:
+            self.best_reward = float(episodes['best_rewards'].max())
+            self.last_avg_reward = float(episodes['avg_rewards'][-1])
+            self.recent_rewards.extend(episodes['rewards'][-self.recent_rewards.maxlen:].tolist())
+        self.num_tests = len(read_table(self.path / 'tests')['test_rewards'])
+
+    def row_counts(self):
+        """학습 재개용 현재 행 수 (버퍼의 행 포함, 저장 전에 flush() 권장)"""
+        return {
+            'episodes': self.episode_table.rows,
+            'tests': self.test_table.rows,
+            'steps': self.step_table.rows if self.step_table is not None else 0,
+            'step_calls': self._step_calls,
+        }
+
+    def _write(self, record):
+        kind = record['type']
+        if kind == 'meta' and self.resume is not None:
+            # 재개: 처음 시작 시각은 유지하고 재개 시각만 추가
+            self.meta.setdefault('resumed_at', []).append(record['start_time'])
+            with open(self.path / META_FILE, 'w') as f:
+                json.dump(self.meta, f, indent=2)
+        elif kind == 'episode':
+            self.episode_table.append(**{column: record[field] for field, column in EPISODE_FIELDS.items()})
+        elif kind == 'test':
+            self.test_table.append(**{column: record[field] for field, column in TEST_FIELDS.items()})
+        else:
+            # meta / final / end 는 드물게 발생하므로 meta.json 을 바로 다시 씀
+            self.meta.update({k: v for k, v in record.items() if k != 'type'})
+            if kind == 'final':
+                self.meta['final_test_rewards'] = self.meta.pop('rewards')
+            with open(self.path / META_FILE, 'w') as f:
+                json.dump(self.meta, f, indent=2)
+        self._maybe_flush()
+
+    def _write_step(self, record):
+        if self.step_table is None:
+            self.step_table = ColumnTable(self.step_path, self.step_columns)
+        unknown = set(record) - set(self.step_table.dtypes)
+        if unknown:
+            raise ValueError(f"스텝 지표 스키마에 없는 키: {sorted(unknown)} "
+                             f"(컬럼: {list(self.step_table.dtypes)})")
+        self.step_table.append(**{name: record.get(name, np.nan) for name in self.step_table.dtypes})
+        self._maybe_flush()
+
+    def _tables(self):
+        return [t for t in (self.episode_table, self.test_table, self.step_table) if t is not None]
+
+    def _pending(self):
+        return sum(table.pending for table in self._tables())
+
+    def flush(self):
+        """버퍼의 레코드를 파일에 기록"""
+        for table in self._tables():
+            table.flush()
+        self._last_flush = time.monotonic()
+
+    def _close_files(self):
+        for table in self._tables():
+            table.close()
+
+
+def load_columnar_log(directory):
+    """
+    컬럼형 로그를 TrainingLogger.save() 와 같은 dict 형태로 열기
+    (리스트 대신 np.memmap 배열 -> 수백만 행도 즉시 로드)
+    """
+    directory = Path(directory)
+    meta_file = directory / META_FILE
+    meta = {}
+    if meta_file.exists():
+        with open(meta_file) as f:
+            meta = json.load(f)
+
+    data = {
+        'algorithm': meta.get('algorithm'),
+        'start_time': meta.get('start_time'),
+        **read_table(directory / 'episodes'),
+        **read_table(directory / 'tests'),
+        'final_test_rewards': meta.get('final_test_rewards', []),
+    }
+    if 'end_time' in meta:
+        data['end_time'] = meta['end_time']
+    return data
+
+
+def load_columnar_steps(directory):
+    """스텝 지표 컬럼을 {지표 이름: np.memmap} 으로 열기 (없으면 None)"""
+    step_dir = Path(directory) / 'steps'
+    if not (step_dir / SCHEMA_FILE).exists():
+        return None
+    return read_table(step_dir)
+
+
+def convert_log(source, directory=None):
+    """
+    기존 .json (TrainingLogger) / .jsonl (StreamingTrainingLogger) 로그를
+    컬럼형 로그 디렉토리로 변환
+
+    Returns:
+        생성된 디렉토리 경로
+    """
+    source = Path(source)
+    if source.suffix == '.jsonl':
+        data = load_streaming_log(source)
+    else:
+        with open(source) as f:
+            data = json.load(f)
+
+    directory = Path(directory) if directory is not None else source.with_suffix('')
+    episodes = ColumnTable(directory / 'episodes', EPISODE_COLUMNS)
+    episodes.extend(**{name: data.get(name, []) for name in EPISODE_COLUMNS})
+    episodes.close()
+    tests = ColumnTable(directory / 'tests', TEST_COLUMNS)
+    tests.extend(**{name: data.get(name, []) for name in TEST_COLUMNS})
+    tests.close()
+
+    meta = {key: data[key] for key in ('algorithm', 'start_time', 'end_time', 'final_test_rewards')
+            if key in data}
+    meta['converted_at'] = datetime.now().isoformat()
+    with open(directory / META_FILE, 'w') as f:
+        json.dump(meta, f, indent=2)
+    return directory
+
+
+if __name__ == '__main__':
+    import sys
+
+    if len(sys.argv) < 2:
+        print("Usage: python columnar_log.py <log.json|log.jsonl> [...]")
+        print("\n예시:")
+        print("  python columnar_log.py training_logs/*_log.json")
+        sys.exit(1)
+
+    for path in sys.argv[1:]:
+        print(f"📦 변환: {path} -> {convert_log(path)}")
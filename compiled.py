@@ -0,0 +1,71 @@
+"""
+Opt-in compiled execution for the small LunarLander Q-networks
+torch.compile first, TorchScript for modules as a fallback, eager as a last resort
+"""
+
+import warnings
+
+import torch
+
+
+class FallbackCallable:
+    """
+    Call a compiled function, falling back to the eager one for good
+
+    torch.compile compiles lazily on the first call, so a missing C++
+    toolchain or an unsupported op only shows up there. The first failure
+    is reported once and every later call goes straight to the eager path.
+    """
+
+    def __init__(self, compiled_fn, eager_fn, backend, eager_backend="eager"):
+        self.compiled_fn = compiled_fn
+        self.eager_fn = eager_fn
+        self.backend = backend if compiled_fn is not None else eager_backend
+        self.eager_backend = eager_backend
+
+    def __call__(self, *args, **kwargs):
+        if self.compiled_fn is not None:
+            try:
+                return self.compiled_fn(*args, **kwargs)
+            except Exception as e:
+                warnings.warn(f"{self.backend} failed ({type(e).__name__}: {e}); "
+                              f"using {self.eager_backend}")
+                self.compiled_fn = None
+                self.backend = self.eager_backend
+        return self.eager_fn(*args, **kwargs)
+
+
+def compile_function(fn, mode=None):
+    """torch.compile a Python function (e.g. a full loss/backward/step update)"""
+    if hasattr(torch, "compile"):
+        try:
+            return FallbackCallable(torch.compile(fn, mode=mode), fn, "torch.compile")
+        except Exception as e:
+            warnings.warn(f"torch.compile unavailable ({type(e).__name__}: {e}); using eager mode")
+    return FallbackCallable(None, fn, None)
+
+
+def compile_module(module, mode=None):
+    """
+    Compiled forward for an nn.Module: torch.compile -> TorchScript -> eager
+
+    The returned callable shares parameters with module, so the module itself
+    (and its state_dict) is still what gets trained, saved and loaded.
+    """
+    scripted = None
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            scripted = torch.jit.script(module)
+    except Exception:
+        pass
+
+    eager = scripted if scripted is not None else module
+    eager_backend = "TorchScript" if scripted is not None else "eager"
+
+    if hasattr(torch, "compile"):
+        try:
+            return FallbackCallable(torch.compile(module, mode=mode), eager, "torch.compile", eager_backend)
+        except Exception as e:
+            warnings.warn(f"torch.compile unavailable ({type(e).__name__}: {e}); using {eager_backend}")
+    return FallbackCallable(None, eager, None, eager_backend)
@@ -1,6 +1,5 @@
 # libraries
 import gymnasium as gym
-import collections
 import random
 import numpy as np
 
@@ -16,6 +15,11 @@ import os
 import matplotlib.pyplot as plt
 import pandas as pd
 
+from replay_buffer import ReplayBuffer as ArrayReplayBuffer
+from evaluation import evaluate_policy
+from update_scheduler import UpdateScheduler
+from rolling_stats import trailing_mean
+
 # --- Global Parameters (Used as defaults/overridden) ---
 # NOTE: These are defaults, actual values are set in run_test from TEST_CONFIGS
 learning_rate = 0.001
@@ -31,26 +35,21 @@ EVAL_EPISODES = 20        # Evaluation episodes for final table metrics
 
 # --- Classes and Core Functions ---
 
-class ReplayBuffer():
+class ReplayBuffer(ArrayReplayBuffer):
+    # 💡 deque 대신 NumPy 링 버퍼(replay_buffer.py)에 저장, put/sample/size 인터페이스는 그대로 유지
     def __init__(self):
-        self.buffer = collections.deque(maxlen=buffer_limit)    
+        super().__init__(capacity=buffer_limit)
     def put(self, transition):
-        self.buffer.append(transition)
+        self.push(*transition)
     def sample(self, n):
-        mini_batch = random.sample(self.buffer, n)
-        s_lst, a_lst, r_lst, s_prime_lst, done_mask_lst = [], [], [], [], []
-        for transition in mini_batch:
-            s, a, r, s_prime, done_mask = transition
-            s_lst.append(s)
-            a_lst.append([a])
-            r_lst.append([r])
-            s_prime_lst.append(s_prime)
-            done_mask_lst.append([done_mask])
-        return torch.tensor(np.array(s_lst), dtype=torch.float), torch.tensor(a_lst), \
-               torch.tensor(r_lst, dtype=torch.float), torch.tensor(np.array(s_prime_lst), dtype=torch.float), \
-               torch.tensor(done_mask_lst, dtype=torch.float)
+        s, a, r, s_prime, done_mask = super().sample(n)
+        return s, a.unsqueeze(1), r.unsqueeze(1), s_prime, done_mask.unsqueeze(1)
     def size(self):
-        return len(self.buffer)
+        return len(self)
+    def sample_batches(self, k, n):
+        # 💡 k개의 미니배치(크기 n)를 한 번의 벡터화된 샘플링으로 뽑아 나눠서 반환
+        s, a, r, s_prime, done_mask = self.sample(k * n)
+        return list(zip(s.split(n), a.split(n), r.split(n), s_prime.split(n), done_mask.split(n)))
 
 class Qnet(nn.Module):
     def __init__(self):
@@ -94,11 +93,10 @@ class DuelingQnet(nn.Module):
         if coin < epsilon: return random.randint(0,3)
         else: return out.argmax(dim=1).item()
 
-# 📌 train_dqn/train_double_dqn 함수가 하이퍼파라미터를 인수로 받지 않고, 
-# 전역 변수를 사용하므로, run_test에서 전역 변수를 먼저 설정해야 합니다.
-def train_dqn(q, q_target, memory, optimizer):
-    # Uses global batch_size, gamma, tau
-    s,a,r,s_prime,done_mask = memory.sample(batch_size)
+# 📌 하이퍼파라미터(gamma, batch_size, tau)를 인수로 받습니다 (기본값은 전역 기본값).
+# 전역 변수를 바꾸지 않으므로 여러 설정을 별도 프로세스에서 병렬 실행할 수 있습니다 (sweep.py).
+def train_dqn(q, q_target, memory, optimizer, gamma=gamma, batch_size=batch_size, tau=tau, batch=None):
+    s,a,r,s_prime,done_mask = memory.sample(batch_size) if batch is None else batch
     q_out = q(s)
     q_a = q_out.gather(1,a)
     max_q_prime = q_target(s_prime).max(1)[0].unsqueeze(1)
@@ -110,12 +108,13 @@ def train_dqn(q, q_target, memory, optimizer):
     for target_param, local_param in zip(q_target.parameters(), q.parameters()):
         target_param.data.copy_(tau*local_param.data + (1.0-tau)*target_param.data)
 
-def train_double_dqn(q, q_target, memory, optimizer):
-    # Uses global batch_size, gamma, tau
-    s,a,r,s_prime,done_mask = memory.sample(batch_size)
-    q_out = q(s)
-    q_a = q_out.gather(1,a)
-    argmax_Q = q(s_prime).max(1)[1].unsqueeze(1)
+def train_double_dqn(q, q_target, memory, optimizer, gamma=gamma, batch_size=batch_size, tau=tau, batch=None):
+    s,a,r,s_prime,done_mask = memory.sample(batch_size) if batch is None else batch
+    # 💡 s와 s_prime을 한 번의 forward로 계산 (s_prime 부분은 detach)
+    n = s.shape[0]
+    q_out = q(torch.cat([s, s_prime]))
+    q_a = q_out[:n].gather(1,a)
+    argmax_Q = q_out[n:].detach().max(1)[1].unsqueeze(1)
     max_q_prime = q_target(s_prime).gather(1, argmax_Q)
     target = r + gamma * max_q_prime * done_mask
     loss = F.mse_loss(q_a, target)
@@ -126,28 +125,19 @@ def train_double_dqn(q, q_target, memory, optimizer):
         target_param.data.copy_(tau*local_param.data + (1.0-tau)*target_param.data)
 
 def evaluate_model(q_net, num_episodes):
-    env = gym.make('LunarLander-v3')
-    total_score, success_count, total_length = 0.0, 0, 0.0
-    for _ in range(num_episodes):
-        s, _ = env.reset()
-        done, episode_score, episode_length = False, 0.0, 0 
-        with torch.no_grad():
-            while not done:
-                a = q_net.sample_action(torch.from_numpy(s).float(), 0.0)
-                s_prime, r, terminated, truncated, info = env.step(a)
-                done = (terminated or truncated)
-                s = s_prime; episode_score += r; episode_length += 1
-                if done: break
-        total_score += episode_score
-        if episode_score >= 200: success_count += 1
-        total_length += episode_length
-    env.close()
-    return total_score / num_episodes, (success_count / num_episodes) * 100, total_length / num_episodes
+    # 💡 evaluation.py: 여러 에피소드를 동시에 실행하고 그리디 행동을 한 번의 배치 forward로 계산
+    return evaluate_policy(q_net, num_episodes)
 
-# 💡 run_test 함수 수정: LR, Gamma를 인수로 받아 optimizer 생성에 사용
-def run_test(alg_type, train_fn, n_episodes, lr_val):
-    global epsilon
+# 💡 run_test 함수 수정: LR, Gamma, Batch, Tau, Seed를 모두 인수로 받습니다 (전역 변수 변경 없음)
+# 💡 updates_per_step / train_every: 환경 스텝당 업데이트 비율과 K 스텝마다 몰아서 업데이트 (UpdateScheduler)
+def run_test(alg_type, train_fn, n_episodes, lr_val, gamma_val=gamma, batch_val=batch_size,
+             tau_val=tau, seed=None, updates_per_step=1.0, train_every=1):
     env = gym.make('LunarLander-v3')
+    if seed is not None:
+        random.seed(seed)
+        np.random.seed(seed)
+        torch.manual_seed(seed)
+        env.reset(seed=seed)
     
     # Network Selection
     if alg_type == "Dueling_DQN":
@@ -162,10 +152,11 @@ def run_test(alg_type, train_fn, n_episodes, lr_val):
     # 📌 현재 테스트의 LR 값으로 Optimizer 생성
     optimizer = optim.Adam(q.parameters(), lr=lr_val) 
     
-    score, score_history = 0.0, []
+    score, score_history, episode_scores = 0.0, [], []
+    # memory.size() > 2000 이후부터 학습 (기존 조건과 동일)
+    scheduler = UpdateScheduler(updates_per_step, learning_starts=2001, train_every=train_every)
     
-    # Gamma, batch_size는 전역에서 설정된 현재 테스트 값을 사용합니다.
-    print(f"  [Training Start] LR: {lr_val}, Gamma: {gamma}, Batch: {batch_size}, Decay: 0.995")
+    print(f"  [Training Start] LR: {lr_val}, Gamma: {gamma_val}, Batch: {batch_val}, Decay: 0.995")
     
     for n_epi in range(n_episodes): 
         s, _ = env.reset()
@@ -177,18 +168,23 @@ def run_test(alg_type, train_fn, n_episodes, lr_val):
             memory.put((s,a,r,s_prime, 0.0 if done else 1.0))
             s = s_prime
             score += r
-            if memory.size()>2000:
-                # train_fn 호출. 내부적으로 global gamma, batch_size 사용
-                train_fn(q, q_target, memory, optimizer) 
+            n_updates = scheduler.step(memory.size())
+            if n_updates == 1:
+                train_fn(q, q_target, memory, optimizer, gamma_val, batch_val, tau_val)
+            elif n_updates > 1:
+                for batch in memory.sample_batches(n_updates, batch_val):
+                    train_fn(q, q_target, memory, optimizer, gamma_val, batch_val, tau_val, batch)
             if done: break
             
         epsilon = max(0.01, epsilon * 0.995)
+        episode_scores.append(score)
+        score = 0.0
         
         if n_epi % PRINT_INTERVAL == 0 and n_epi != 0: 
-            avg_score = score / PRINT_INTERVAL
+            # 📌 최근 PRINT_INTERVAL 에피소드의 평균 점수 (rolling_stats 공용 함수)
+            avg_score = trailing_mean(episode_scores, PRINT_INTERVAL)
             print(f"    Epi: {n_epi:<4} / {n_episodes} | Avg Score: {avg_score:.2f} | Buffer: {memory.size():<5} | Epsilon: {epsilon*100:.1f}%")
             score_history.append((n_epi, avg_score))
-            score = 0.0
 
     env.close()
     avg_return, success_rate, avg_length = evaluate_model(q, EVAL_EPISODES)
@@ -247,51 +243,50 @@ TEST_CONFIGS = [
     {'version': 'V2', 'alg': 'Double DQN', 'fn': train_double_dqn, 'params': {'lr': 0.001, 'gamma': 0.99, 'batch_size': 64}},
 ]
 
-results = []
-all_history_data = []
-all_history_labels = []
+# 📌 스크립트로 실행할 때만 실험을 돌립니다 (sweep.py 등에서 import 가능)
+if __name__ == '__main__':
+    results = []
+    all_history_data = []
+    all_history_labels = []
 
-print(f"==============================================================")
-print(f"🔥 Starting 6 Total Experiments (Training: {TRAINING_EPISODES}, Evaluation: {EVAL_EPISODES})")
-print(f"==============================================================")
+    print(f"==============================================================")
+    print(f"🔥 Starting 6 Total Experiments (Training: {TRAINING_EPISODES}, Evaluation: {EVAL_EPISODES})")
+    print(f"==============================================================")
 
-for i, config in enumerate(TEST_CONFIGS):
-    # 📌 global 선언 제거: 스크립트 레벨에서 바로 변경합니다.
-    learning_rate = config['params']['lr']
-    gamma = config['params']['gamma']
-    batch_size = config['params']['batch_size']
-    
-    alg_name = f"{config['alg']} {config['version']}"
+    for i, config in enumerate(TEST_CONFIGS):
+        params = config['params']
+        alg_name = f"{config['alg']} {config['version']}"
     
-    print(f"\n--- Running Test {i+1}/6: {alg_name} ---")
+        print(f"\n--- Running Test {i+1}/6: {alg_name} ---")
     
-    # Run training and collect history (LR 값만 run_test에 인수로 전달)
-    avg_return, success_rate, avg_length, score_history = run_test(
-        config['alg'].replace(' ', '_'), config['fn'], TRAINING_EPISODES, learning_rate
-    )
+        # Run training and collect history (하이퍼파라미터는 모두 인수로 전달)
+        avg_return, success_rate, avg_length, score_history = run_test(
+            config['alg'].replace(' ', '_'), config['fn'], TRAINING_EPISODES,
+            params['lr'], params['gamma'], params['batch_size']
+        )
     
-    # Collect results for table
-    results.append({
-        'Algorithm': alg_name,
-        '평균리턴': f"{avg_return:.2f}",
-        '성공률': f"{success_rate:.2f}%",
-        '에피소드길이': f"{avg_length:.1f}",
-        '수렴속도': '라인 그래프 참조',
-        '학습안정성': '라인 그래프 참조',
-        '데이터효율성': '고정'
-    })
+        # Collect results for table
+        results.append({
+            'Algorithm': alg_name,
+            '평균리턴': f"{avg_return:.2f}",
+            '성공률': f"{success_rate:.2f}%",
+            '에피소드길이': f"{avg_length:.1f}",
+            '수렴속도': '라인 그래프 참조',
+            '학습안정성': '라인 그래프 참조',
+            '데이터효율성': '고정'
+        })
     
-    # Collect history for graph
-    all_history_data.append(score_history)
-    all_history_labels.append(alg_name)
+        # Collect history for graph
+        all_history_data.append(score_history)
+        all_history_labels.append(alg_name)
 
-# --- Final Result Output (Table & Graph) ---
-print(f"\n==============================================================")
-print(f"✅ All Experiments Completed (Evaluation Episodes: {EVAL_EPISODES} each)")
-print(f"==============================================================")
+    # --- Final Result Output (Table & Graph) ---
+    print(f"\n==============================================================")
+    print(f"✅ All Experiments Completed (Evaluation Episodes: {EVAL_EPISODES} each)")
+    print(f"==============================================================")
 
-df = pd.DataFrame(results)
-print(df.to_string(index=False))
+    df = pd.DataFrame(results)
+    print(df.to_string(index=False))
 
-# Generate and display the final comparison graph
-plot_results(all_history_data, all_history_labels)
\ No newline at end of file
+    # Generate and display the final comparison graph
+    plot_results(all_history_data, all_history_labels)
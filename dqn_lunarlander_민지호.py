@@ -1,8 +1,6 @@
 # libraries
 import gymnasium as gym
-import collections
 import random
-import numpy as np
 
 # pytorch library is used for deep learning
 import torch
@@ -15,6 +13,10 @@ import os
 # 💡 그래프 출력을 위해 matplotlib 라이브러리 추가
 import matplotlib.pyplot as plt
 
+from replay_buffer import ReplayBuffer as ArrayReplayBuffer
+from evaluation import evaluate_policy
+from rolling_stats import trailing_mean
+
 # hyperparameters
 learning_rate = 0.005
 gamma = 0.98
@@ -24,31 +26,20 @@ tau = 1e-3                  # for soft update
 epsilon = 1.0               # Epsilon을 전역 변수로 관리
 PRINT_INTERVAL = 20         # 💡 평균 점수 계산 및 출력 간격 (Global로 정의)
 
-class ReplayBuffer():
+class ReplayBuffer(ArrayReplayBuffer):
+    # 💡 deque 대신 NumPy 링 버퍼(replay_buffer.py)에 저장 (put/sample/size 인터페이스는 동일)
     def __init__(self):
-        self.buffer = collections.deque(maxlen=buffer_limit)    # double-ended queue
+        super().__init__(capacity=buffer_limit)
 
     def put(self, transition):
-        self.buffer.append(transition)
+        self.push(*transition)
 
     def sample(self, n):
-        mini_batch = random.sample(self.buffer, n)
-        s_lst, a_lst, r_lst, s_prime_lst, done_mask_lst = [], [], [], [], []
-
-        for transition in mini_batch:
-            s, a, r, s_prime, done_mask = transition
-            s_lst.append(s)
-            a_lst.append([a])
-            r_lst.append([r])
-            s_prime_lst.append(s_prime)
-            done_mask_lst.append([done_mask])
-
-        return torch.tensor(np.array(s_lst), dtype=torch.float), torch.tensor(a_lst), \
-               torch.tensor(r_lst, dtype=torch.float), torch.tensor(np.array(s_prime_lst), dtype=torch.float), \
-               torch.tensor(done_mask_lst, dtype=torch.float)
+        s, a, r, s_prime, done_mask = super().sample(n)
+        return s, a.unsqueeze(1), r.unsqueeze(1), s_prime, done_mask.unsqueeze(1)
 
     def size(self):
-        return len(self.buffer)
+        return len(self)
 
 class Qnet(nn.Module):
     def __init__(self):
@@ -140,11 +131,13 @@ def train_double_dqn(q, q_target, memory, optimizer, tau):
     """Double DQN training"""
     s,a,r,s_prime,done_mask = memory.sample(batch_size)
 
-    q_out = q(s)
-    q_a = q_out.gather(1,a)
+    # 💡 s와 s_prime을 한 번의 forward로 계산 (s_prime 부분은 detach)
+    n = s.shape[0]
+    q_out = q(torch.cat([s, s_prime]))
+    q_a = q_out[:n].gather(1,a)
 
     # Double DQN
-    argmax_Q = q(s_prime).max(1)[1].unsqueeze(1)
+    argmax_Q = q_out[n:].detach().max(1)[1].unsqueeze(1)
     max_q_prime = q_target(s_prime).gather(1, argmax_Q)
 
     target = r + gamma * max_q_prime * done_mask
@@ -206,6 +199,7 @@ def run_experiment(algorithm_type="DQN", render=False, load_model=False):
     optimizer = optim.Adam(q.parameters(), lr=learning_rate) 
     
     score_history = []
+    episode_scores = []
     
     for n_epi in range(1000): 
         s, _ = env.reset()
@@ -229,13 +223,15 @@ def run_experiment(algorithm_type="DQN", render=False, load_model=False):
         
         # 💡 고정된 decay rate 0.999 사용
         epsilon = max(0.01, epsilon * 0.995) 
+        episode_scores.append(score)
+        score = 0.0
 
         if n_epi % PRINT_INTERVAL == 0 and n_epi != 0: 
-            avg_score = score / PRINT_INTERVAL
+            # 📌 최근 PRINT_INTERVAL 에피소드의 평균 점수 (rolling_stats 공용 함수)
+            avg_score = trailing_mean(episode_scores, PRINT_INTERVAL)
             print("n_episode :{}, score : {:.1f}, n_buffer : {}, eps : {:.1f}%".format(
                                                             n_epi, avg_score, memory.size(), epsilon*100))
             score_history.append((n_epi, avg_score))
-            score = 0.0
 
     env.close()
     
@@ -253,47 +249,20 @@ def evaluate_model(q_net, env_name='LunarLander-v3', num_episodes=100, render=Fa
     # 📌 튜닝 모드 관련 출력 제거 (단일 실험 모드)
     print(f"\n=== Evaluating Model over {num_episodes} episodes ===")
     
+    # 💡 evaluation.py: 여러 환경(기본 16개)을 동시에 진행하며 그리디 행동(탐험 없음)을 배치로 계산
+    avg_return, success_rate, avg_length = evaluate_policy(q_net, num_episodes, env_name=env_name)
+
     if render:
+        # GUI 확인용으로 한 에피소드만 화면에 재생
         env = gym.make(env_name, render_mode='human')
-    else:
-        env = gym.make(env_name)
-    
-    total_score = 0.0
-    success_count = 0  # 성공 횟수 카운터
-    total_length = 0.0 # 총 에피소드 길이 누적 변수
-    
-    epsilon_eval = 0.0 # 평가 시 탐험 없음 (최적 행동만)
-
-    for n_epi in range(num_episodes):
         s, _ = env.reset()
         done = False
-        episode_score = 0.0
-        episode_length = 0 
-
-        with torch.no_grad(): # 평가 시에는 그래디언트 계산 불필요
+        with torch.no_grad():
             while not done:
-                a = q_net.sample_action(torch.from_numpy(s).float(), epsilon_eval)
-                s_prime, r, terminated, truncated, info = env.step(a)
+                a = q_net.sample_action(torch.from_numpy(s).float(), 0.0)
+                s, r, terminated, truncated, info = env.step(a)
                 done = (terminated or truncated)
-                s = s_prime
-                episode_score += r
-                episode_length += 1
-                
-                if done:
-                    break
-        
-        total_score += episode_score
-        
-        if episode_score >= 200:
-            success_count += 1
-            
-        total_length += episode_length
-
-    env.close()
-    
-    avg_return = total_score / num_episodes
-    success_rate = (success_count / num_episodes) * 100
-    avg_length = total_length / num_episodes
+        env.close()
 
     # 📌 튜닝 모드 관련 출력 제거 (단일 실험 모드)
     print(f"\n[Evaluation Results - {num_episodes} Episodes]")
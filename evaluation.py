@@ -0,0 +1,96 @@
+"""
+Batched greedy evaluation for trained LunarLander Q-networks
+Runs many episodes side by side and evaluates all live states in one forward
+"""
+
+import numpy as np
+import torch
+import gymnasium as gym
+
+
+def _greedy_actions(policy, states):
+    """argmax_a Q(s, a) for a float32 [B, state_dim] batch"""
+    if isinstance(policy, torch.nn.Module):
+        with torch.inference_mode():
+            return policy(torch.from_numpy(states)).argmax(1).numpy()
+    return np.asarray(policy(states)).argmax(1)
+
+
+def run_episodes(policy, num_episodes=100, num_envs=16, seeds=None, env_name='LunarLander-v3'):
+    """
+    Play num_episodes greedy episodes, num_envs of them concurrently
+
+    Args:
+        policy: Q-network (nn.Module) or any callable mapping a float32
+            [B, state_dim] array to [B, action_dim] Q-values
+        num_episodes: total number of episodes to play
+        num_envs: number of environments stepped in lockstep
+        seeds: optional list of num_episodes reset seeds; episode i is always
+            played from seeds[i], independent of num_envs
+        env_name: Gymnasium environment id
+
+    Returns:
+        (returns, lengths) as arrays of shape [num_episodes], in episode order
+    """
+    if seeds is not None and len(seeds) != num_episodes:
+        raise ValueError(f"Expected {num_episodes} seeds, got {len(seeds)}")
+
+    num_envs = max(1, min(num_envs, num_episodes))
+    envs = [gym.make(env_name) for _ in range(num_envs)]
+    obs_dim = envs[0].observation_space.shape[0]
+
+    returns = np.zeros(num_episodes)
+    lengths = np.zeros(num_episodes, dtype=np.int64)
+    obs = np.zeros((num_envs, obs_dim), dtype=np.float32)
+    episode_of = np.full(num_envs, -1)   # episode index played by each env, -1 = idle
+    next_episode = 0
+
+    def start_episode(slot):
+        nonlocal next_episode
+        seed = None if seeds is None else int(seeds[next_episode])
+        obs[slot], _ = envs[slot].reset(seed=seed)
+        episode_of[slot] = next_episode
+        next_episode += 1
+
+    for slot in range(num_envs):
+        start_episode(slot)
+
+    while True:
+        live = np.flatnonzero(episode_of >= 0)
+        if len(live) == 0:
+            break
+
+        actions = _greedy_actions(policy, obs[live])
+        for slot, action in zip(live, actions):
+            episode = episode_of[slot]
+            s_prime, r, terminated, truncated, _ = envs[slot].step(int(action))
+            returns[episode] += r
+            lengths[episode] += 1
+
+            if terminated or truncated:
+                if next_episode < num_episodes:
+                    start_episode(slot)
+                else:
+                    episode_of[slot] = -1
+            else:
+                obs[slot] = s_prime
+
+    for env in envs:
+        env.close()
+
+    return returns, lengths
+
+
+def evaluate_policy(policy, num_episodes=100, num_envs=16, seeds=None,
+                    env_name='LunarLander-v3', success_threshold=200):
+    """
+    Greedy evaluation with the same metrics as evaluate_model
+
+    Returns:
+        (average return, success rate in %, average episode length)
+    """
+    returns, lengths = run_episodes(policy, num_episodes, num_envs, seeds, env_name)
+    avg_return = returns.mean()
+    success_rate = (returns >= success_threshold).mean() * 100
+    avg_length = lengths.mean()
+    return avg_return, success_rate, avg_length
@@ -0,0 +1,208 @@
+"""
+Live training monitor for the LunarLander DQN agents
+The training loop publishes metrics as fire-and-forget UDP datagrams on
+localhost; a separate viewer process plots them as they arrive
+"""
+
+import json
+import socket
+import time
+from collections import deque
+
+
+DEFAULT_PORT = 5600
+
+
+class MetricsPublisher:
+    """
+    Non-blocking metrics sender used inside the training loop
+
+    Every message is one small JSON datagram sent with a non-blocking UDP
+    socket, so publishing never waits for (or even needs) a viewer: with no
+    listener or a full socket buffer the datagram is simply dropped.
+    Per-step metrics are additionally rate-limited to one message every
+    step_interval seconds, which bounds the cost independently of the step
+    rate. The time spent inside publish calls is accumulated so the
+    overhead on the training process can be reported.
+    """
+
+    def __init__(self, host="127.0.0.1", port=DEFAULT_PORT, step_interval=0.1):
+        self.address = (host, port)
+        self.step_interval = step_interval
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setblocking(False)
+
+        self.start_time = time.perf_counter()
+        self.publish_time = 0.0
+        self.sent = 0
+        self.dropped = 0
+        self._last_step_time = self.start_time
+        self._last_steps = 0
+        self._last_updates = 0
+
+    def _send(self, message):
+        try:
+            self.sock.sendto(json.dumps(message).encode(), self.address)
+            self.sent += 1
+        except (BlockingIOError, ConnectionRefusedError, OSError):
+            self.dropped += 1
+
+    def publish_episode(self, episode, reward, avg_reward, epsilon, loss):
+        start = time.perf_counter()
+        self._send({"type": "episode", "episode": int(episode), "reward": float(reward),
+                    "avg_reward": float(avg_reward), "epsilon": float(epsilon), "loss": float(loss),
+                    "time": start - self.start_time})
+        self.publish_time += time.perf_counter() - start
+
+    def publish_step(self, steps, updates, loss=None, epsilon=None):
+        """Called every env step; sends at most one message per step_interval"""
+        start = time.perf_counter()
+        elapsed = start - self._last_step_time
+        if elapsed < self.step_interval:
+            self.publish_time += time.perf_counter() - start
+            return
+
+        message = {"type": "step", "steps": int(steps), "updates": int(updates),
+                   "steps_per_sec": (steps - self._last_steps) / elapsed,
+                   "updates_per_sec": (updates - self._last_updates) / elapsed,
+                   "time": start - self.start_time}
+        if loss is not None:
+            message["loss"] = float(loss)
+        if epsilon is not None:
+            message["epsilon"] = float(epsilon)
+        self._send(message)
+
+        self._last_step_time = start
+        self._last_steps, self._last_updates = steps, updates
+        self.publish_time += time.perf_counter() - start
+
+    def overhead(self):
+        """Fraction of wall time since construction spent publishing"""
+        return self.publish_time / max(time.perf_counter() - self.start_time, 1e-9)
+
+    def close(self):
+        self.sock.close()
+
+
+class MetricsReceiver:
+    """Viewer side: drains datagrams into bounded histories"""
+
+    def __init__(self, host="127.0.0.1", port=DEFAULT_PORT, history=5000):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind((host, port))
+        self.sock.setblocking(False)
+        self.episodes = deque(maxlen=history)
+        self.steps = deque(maxlen=history)
+
+    def poll(self):
+        """Read every pending message; returns how many arrived"""
+        received = 0
+        while True:
+            try:
+                data, _ = self.sock.recvfrom(65536)
+            except BlockingIOError:
+                return received
+            message = json.loads(data)
+            (self.episodes if message["type"] == "episode" else self.steps).append(message)
+            received += 1
+
+    def close(self):
+        self.sock.close()
+
+
+def run_viewer(port=DEFAULT_PORT, refresh_ms=500):
+    """Plot reward, loss, epsilon and throughput as they arrive"""
+    import matplotlib.pyplot as plt
+    from matplotlib.animation import FuncAnimation
+
+    receiver = MetricsReceiver(port=port)
+    fig, ((ax_reward, ax_loss), (ax_epsilon, ax_rate)) = plt.subplots(2, 2, figsize=(14, 8))
+    fig.suptitle(f"Live training monitor (udp://127.0.0.1:{port})")
+
+    def column(messages, key):
+        return [m[key] for m in messages if key in m]
+
+    def update(_):
+        if not receiver.poll():
+            return
+
+        episodes = list(receiver.episodes)
+        steps = list(receiver.steps)
+        for ax in (ax_reward, ax_loss, ax_epsilon, ax_rate):
+            ax.clear()
+            ax.grid(True, alpha=0.3)
+
+        x = column(episodes, "episode")
+        ax_reward.plot(x, column(episodes, "reward"), alpha=0.3, label="Reward")
+        ax_reward.plot(x, column(episodes, "avg_reward"), linewidth=2, label="Avg Reward (10)")
+        ax_reward.axhline(y=200, color="red", linestyle="--", alpha=0.5)
+        ax_reward.set_title("Episode reward")
+        ax_reward.legend(loc="lower right")
+
+        step_x = [m["steps"] for m in steps if "loss" in m]
+        ax_loss.plot(step_x, column(steps, "loss"))
+        ax_loss.set_title("Loss")
+        ax_loss.set_xlabel("Env steps")
+
+        ax_epsilon.plot(x, column(episodes, "epsilon"))
+        ax_epsilon.set_title("Epsilon")
+        ax_epsilon.set_xlabel("Episode")
+
+        t = column(steps, "time")
+        ax_rate.plot(t, column(steps, "steps_per_sec"), label="Env steps/s")
+        ax_rate.plot(t, column(steps, "updates_per_sec"), label="Updates/s")
+        ax_rate.set_title("Throughput")
+        ax_rate.set_xlabel("Seconds")
+        ax_rate.legend(loc="lower right")
+
+    animation = FuncAnimation(fig, update, interval=refresh_ms, cache_frame_data=False)
+    plt.show()
+    receiver.close()
+    return animation
+
+
+def run_text_viewer(port=DEFAULT_PORT, refresh=1.0):
+    """Headless viewer: print the latest metrics once per refresh interval"""
+    receiver = MetricsReceiver(port=port)
+    print(f"Listening on udp://127.0.0.1:{port} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(refresh)
+            if not receiver.poll():
+                continue
+            line = []
+            if receiver.episodes:
+                e = receiver.episodes[-1]
+                line.append(f"Episode {e['episode']} | Reward: {e['reward']:.2f} | "
+                            f"Avg Reward (10): {e['avg_reward']:.2f} | Epsilon: {e['epsilon']:.3f}")
+            if receiver.steps:
+                s = receiver.steps[-1]
+                line.append(f"Steps: {s['steps']} | {s['steps_per_sec']:.0f} steps/s | "
+                            f"{s['updates_per_sec']:.0f} updates/s")
+            print(" | ".join(line))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        receiver.close()
+
+
+if __name__ == "__main__":
+    import sys
+
+    port = DEFAULT_PORT
+    text = False
+
+    for arg in sys.argv[1:]:
+        if arg.startswith("--port="):
+            port = int(arg.split("=", 1)[1])
+        elif arg == "--text":
+            text = True
+        else:
+            print("Usage: python live_monitor.py [--port=N] [--text]")
+            print("\nStart it next to a run launched with: python train.py ddqn --live")
+            sys.exit(1)
+
+    if text:
+        run_text_viewer(port)
+    else:
+        run_viewer(port)
@@ -0,0 +1,170 @@
+"""
+NumPy-only inference for trained LunarLander Q-networks
+export_npz() converts a torch checkpoint once; NumpyPolicy then loads the
+.npz and runs the forward pass without importing torch at all
+"""
+
+import numpy as np
+
+
+# state_dict layer prefixes per architecture: (trunk, value head, advantage head)
+LAYOUTS = {
+    "DQN": (["fc1", "fc2", "fc3"], [], []),
+    "DuelingDQN": (["feature.0", "feature.2"],
+                   ["value_stream.0", "value_stream.2"],
+                   ["advantage_stream.0", "advantage_stream.2"]),
+    "DuelingQnet": (["fc1"], ["fc_value", "value"], ["fc_adv", "adv"]),
+}
+LAYOUTS["Qnet"] = LAYOUTS["DQN"]
+
+
+def detect_layout(state_dict):
+    """Architecture name for a q-network state_dict (Qnet shares the DQN layout)"""
+    if "feature.0.weight" in state_dict:
+        return "DuelingDQN"
+    if "fc_adv.weight" in state_dict:
+        return "DuelingQnet"
+    if "fc3.weight" in state_dict:
+        return "DQN"
+    raise ValueError(f"Unknown Q-network layout: {sorted(state_dict)}")
+
+
+def export_npz(source, filepath):
+    """
+    Write the weights of a Q-network to a compressed .npz file
+
+    Args:
+        source: nn.Module, state_dict, DQNAgent checkpoint dict (uses its
+            'q_network' entry) or a path to a file saved with torch.save
+        filepath: output .npz path
+
+    Only the online network is exported. Weights are stored transposed
+    ([in, out]) so the forward is a plain x @ W + b.
+    """
+    import torch
+
+    if isinstance(source, str):
+        source = torch.load(source, map_location="cpu")
+    if isinstance(source, torch.nn.Module):
+        source = source.state_dict()
+    state_dict = source.get("q_network", source)
+
+    layout = detect_layout(state_dict)
+    arrays = {"layout": np.array(layout)}
+    for group, prefixes in zip(("trunk", "value", "advantage"), LAYOUTS[layout]):
+        for i, prefix in enumerate(prefixes):
+            weight = state_dict[f"{prefix}.weight"].detach().cpu().numpy().astype(np.float32)
+            bias = state_dict[f"{prefix}.bias"].detach().cpu().numpy().astype(np.float32)
+            arrays[f"{group}.{i}.weight"] = np.ascontiguousarray(weight.T)
+            arrays[f"{group}.{i}.bias"] = bias
+
+    np.savez_compressed(filepath, **arrays)
+    return layout
+
+
+class NumpyPolicy:
+    """
+    Greedy policy backed by an exported .npz file
+
+    Reproduces q_network(x) for DQN / Qnet (ReLU MLP) and DuelingDQN /
+    DuelingQnet (shared trunk, then Q = V + A - mean(A)) in float32.
+    Calling the policy on a [B, state_dim] array returns Q-values, so it can
+    be passed anywhere evaluation.run_episodes accepts a policy.
+    """
+
+    def __init__(self, filepath):
+        with np.load(filepath) as data:
+            self.layout = str(data["layout"])
+            self.trunk = self._layers(data, "trunk")
+            self.value = self._layers(data, "value")
+            self.advantage = self._layers(data, "advantage")
+        self.dueling = bool(self.advantage)
+        self.state_dim = self.trunk[0][0].shape[0]
+        self.action_dim = (self.advantage or self.trunk)[-1][0].shape[1]
+
+    @staticmethod
+    def _layers(data, group):
+        layers = []
+        while f"{group}.{len(layers)}.weight" in data:
+            i = len(layers)
+            layers.append((data[f"{group}.{i}.weight"], data[f"{group}.{i}.bias"]))
+        return layers
+
+    @staticmethod
+    def _mlp(x, layers, relu_last):
+        last = len(layers) - 1
+        for i, (weight, bias) in enumerate(layers):
+            x = x @ weight
+            x += bias
+            if i < last or relu_last:
+                np.maximum(x, 0, out=x)
+        return x
+
+    def __call__(self, states):
+        """Q-values for a [B, state_dim] (or single [state_dim]) float32 array"""
+        x = np.asarray(states, dtype=np.float32)
+        if x.ndim == 1:
+            x = x[None]
+
+        if not self.dueling:
+            return self._mlp(x, self.trunk, relu_last=False)
+
+        features = self._mlp(x, self.trunk, relu_last=True)
+        value = self._mlp(features, self.value, relu_last=False)
+        advantages = self._mlp(features, self.advantage, relu_last=False)
+        return value + (advantages - advantages.mean(axis=1, keepdims=True))
+
+    def act(self, state):
+        """Greedy action for a single state"""
+        return int(self(state)[0].argmax())
+
+    def act_batch(self, states):
+        """Greedy actions for a [B, state_dim] batch"""
+        return self(states).argmax(axis=1)
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    if len(sys.argv) not in (2, 3):
+        print("Usage: python numpy_policy.py <checkpoint.pt|.pth> [output.npz]")
+        print("\nExamples:")
+        print("  python numpy_policy.py models/best_model.pt")
+        print("  python numpy_policy.py Dueling_DQN_q_net.pth dueling_policy.npz")
+        sys.exit(1)
+
+    source = sys.argv[1]
+    output = sys.argv[2] if len(sys.argv) == 3 else source.rsplit(".", 1)[0] + ".npz"
+
+    layout = export_npz(source, output)
+    print(f"Exported {layout} weights: {source} -> {output}")
+
+    # Verify against the torch network on random states
+    import torch
+
+    policy = NumpyPolicy(output)
+    checkpoint = torch.load(source, map_location="cpu")
+    if "q_network" in checkpoint:
+        from policy_server import load_q_network
+        network = load_q_network(source)
+    elif layout == "DuelingQnet":
+        from dqn_lunarlander_251129_integration import DuelingQnet
+        network = DuelingQnet()
+        network.load_state_dict(checkpoint)
+    else:
+        from train import DQN
+        network = DQN(policy.state_dim, policy.action_dim, policy.trunk[0][0].shape[1])
+        network.load_state_dict(checkpoint)
+
+    states = np.random.default_rng(0).standard_normal((1024, policy.state_dim)).astype(np.float32)
+    with torch.no_grad():
+        expected = network(torch.from_numpy(states)).numpy()
+    actual = policy(states)
+    print(f"Max |Q_numpy - Q_torch|: {np.abs(actual - expected).max():.2e} | "
+          f"argmax agreement: {(actual.argmax(1) == expected.argmax(1)).mean() * 100:.2f}%")
+
+    start = time.perf_counter()
+    for state in states:
+        policy.act(state)
+    print(f"NumpyPolicy.act: {(time.perf_counter() - start) / len(states) * 1e6:.1f} us/action")
@@ -0,0 +1,235 @@
+"""
+Offline transition datasets for the LunarLander DQN agents
+DatasetWriter records transitions into chunked, compressed columnar .npz
+files; OfflineDataset streams them back with background chunk prefetching
+"""
+
+import json
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+
+MANIFEST_FILE = "manifest.json"
+CHUNK_DTYPES = {
+    "states": np.float32,
+    "actions": np.int16,
+    "rewards": np.float32,
+    "next_states": np.float32,
+    "dones": np.uint8,
+}
+
+
+def _json_default(value):
+    """NumPy scalars / arrays in caller metadata (e.g. Discrete.n) as plain JSON values"""
+    if isinstance(value, (np.generic, np.ndarray)):
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class DatasetWriter:
+    """
+    Append transitions to <directory>/chunk_NNNNN.npz
+
+    Rows are collected in preallocated column arrays; every chunk_size rows
+    the chunk is compressed and written by a background thread (zlib
+    releases the GIL, so recording does not stall the training loop). Each
+    chunk is written to a temporary name and renamed, and manifest.json,
+    which lists the finished chunks, is rewritten after every chunk, so an
+    interrupted run still leaves a readable dataset.
+
+    For resumable training, flush() writes the partial chunk and counts()
+    returns the dataset size to store with the training state; passing those
+    counts back as resume continues the dataset at that point, dropping the
+    chunks recorded after the snapshot (their episodes are replayed).
+    """
+
+    def __init__(self, directory, chunk_size=100_000, compress=True, metadata=None, resume=None):
+        self.directory = directory
+        self.chunk_size = int(chunk_size)
+        self.compress = compress
+        os.makedirs(directory, exist_ok=True)
+
+        self.manifest = {"chunks": [], "rows": 0, "state_shape": None, "metadata": metadata or {}}
+        self.columns = None
+        self.filled = 0
+        self.rows = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="dataset-writer")
+        self._futures = []
+        if resume is not None:
+            self._truncate(resume)
+        self.next_chunk = len(self.manifest["chunks"])
+
+    def _truncate(self, counts):
+        """Keep the first counts["chunks"] chunks of the dataset on disk and delete the rest"""
+        with open(os.path.join(self.directory, MANIFEST_FILE)) as f:
+            manifest = json.load(f)
+        kept = manifest["chunks"][:counts["chunks"]]
+        if len(kept) != counts["chunks"] or sum(c["rows"] for c in kept) != counts["rows"]:
+            raise ValueError(f"{self.directory} does not contain the {counts['chunks']} chunks / "
+                             f"{counts['rows']} rows recorded before the training-state snapshot")
+        for chunk in manifest["chunks"][counts["chunks"]:]:
+            path = os.path.join(self.directory, chunk["file"])
+            if os.path.exists(path):
+                os.remove(path)
+        self.manifest = {**manifest, "chunks": kept, "rows": counts["rows"]}
+        self._write_manifest()
+
+    def _allocate(self, state_shape):
+        if self.manifest["state_shape"] not in (None, list(state_shape)):
+            raise ValueError(f"{self.directory} holds states of shape {self.manifest['state_shape']}, "
+                             f"not {list(state_shape)}")
+        self.manifest["state_shape"] = list(state_shape)
+        self.columns = {
+            name: np.empty((self.chunk_size, *state_shape) if name.endswith("states") else self.chunk_size,
+                           dtype=dtype)
+            for name, dtype in CHUNK_DTYPES.items()
+        }
+
+    def add(self, state, action, reward, next_state, done):
+        """Record one transition"""
+        self.add_batch(np.asarray(state)[None], [action], [reward], np.asarray(next_state)[None], [done])
+
+    def add_batch(self, states, actions, rewards, next_states, dones):
+        """Record a batch of transitions (e.g. the live sub-envs of one vector step)"""
+        if self.columns is None:
+            self._allocate(np.shape(states)[1:])
+        batch = {"states": states, "actions": actions, "rewards": rewards,
+                 "next_states": next_states, "dones": dones}
+        n, offset = len(actions), 0
+        self.rows += n
+        while offset < n:
+            take = min(n - offset, self.chunk_size - self.filled)
+            for name, column in self.columns.items():
+                column[self.filled:self.filled + take] = batch[name][offset:offset + take]
+            self.filled += take
+            offset += take
+            if self.filled == self.chunk_size:
+                self._submit_chunk()
+
+    def _submit_chunk(self):
+        chunk = {name: column[:self.filled].copy() for name, column in self.columns.items()}
+        index = self.next_chunk
+        self.next_chunk += 1
+        self._futures.append(self._executor.submit(self._write_chunk, index, chunk))
+        self.filled = 0
+
+    def _write_chunk(self, index, chunk):
+        name = f"chunk_{index:05d}.npz"
+        tmp_path = os.path.join(self.directory, f".{name}.tmp")
+        with open(tmp_path, "wb") as f:
+            (np.savez_compressed if self.compress else np.savez)(f, **chunk)
+        os.replace(tmp_path, os.path.join(self.directory, name))
+
+        with self._lock:
+            self.manifest["chunks"].append({"file": name, "rows": len(chunk["actions"])})
+            self.manifest["rows"] += len(chunk["actions"])
+            self._write_manifest()
+
+    def _write_manifest(self):
+        tmp_manifest = os.path.join(self.directory, f".{MANIFEST_FILE}.tmp")
+        with open(tmp_manifest, "w") as f:
+            json.dump(self.manifest, f, indent=2, default=_json_default)
+        os.replace(tmp_manifest, os.path.join(self.directory, MANIFEST_FILE))
+
+    def flush(self):
+        """Write the partial chunk and wait until every recorded row is on disk"""
+        if self.filled:
+            self._submit_chunk()
+        for future in self._futures:
+            future.result()
+        self._futures.clear()
+
+    def counts(self):
+        """{"chunks", "rows"} on disk, for resume (call after flush())"""
+        with self._lock:
+            return {"chunks": len(self.manifest["chunks"]), "rows": self.manifest["rows"]}
+
+    def close(self):
+        """Write the partial last chunk and wait for every chunk to be on disk"""
+        self.flush()
+        self._executor.shutdown()
+        return self.manifest["rows"]
+
+
+class OfflineDataset:
+    """Read-only view of a DatasetWriter directory"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        with open(os.path.join(directory, MANIFEST_FILE)) as f:
+            self.manifest = json.load(f)
+        self.chunks = self.manifest["chunks"]
+        self.state_shape = tuple(self.manifest["state_shape"])
+
+    def __len__(self):
+        return self.manifest["rows"]
+
+    def load_chunk(self, i):
+        """Decompress chunk i into a dict of column arrays"""
+        with np.load(os.path.join(self.directory, self.chunks[i]["file"])) as data:
+            return {name: data[name] for name in CHUNK_DTYPES}
+
+    def iter_chunks(self, epochs=1, shuffle=True, prefetch=2, seed=0):
+        """
+        Yield chunks (column dicts) for the given number of epochs
+
+        A background thread decompresses up to prefetch chunks ahead of the
+        consumer. With shuffle, chunk order is permuted each epoch.
+        """
+        rng = np.random.default_rng(seed)
+        order = [i for _ in range(epochs)
+                 for i in (rng.permutation(len(self.chunks)) if shuffle else range(len(self.chunks)))]
+        ready = queue.Queue(maxsize=max(1, prefetch))
+        stop = threading.Event()
+
+        def producer():
+            try:
+                for i in order:
+                    if stop.is_set():
+                        return
+                    ready.put(self.load_chunk(i))
+            except Exception as e:
+                ready.put(e)
+                return
+            ready.put(None)
+
+        thread = threading.Thread(target=producer, name="dataset-prefetch", daemon=True)
+        thread.start()
+        try:
+            while True:
+                chunk = ready.get()
+                if chunk is None:
+                    return
+                if isinstance(chunk, Exception):
+                    raise chunk
+                yield chunk
+        finally:
+            stop.set()
+            while thread.is_alive():
+                try:
+                    ready.get_nowait()
+                except queue.Empty:
+                    thread.join(timeout=0.01)
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) != 2:
+        print("Usage: python offline_dataset.py <dataset_dir>")
+        print("\nRecord one with: python train.py 500 ddqn --record-dataset=datasets/ddqn_500")
+        sys.exit(1)
+
+    dataset = OfflineDataset(sys.argv[1])
+    size = sum(os.path.getsize(os.path.join(dataset.directory, c["file"])) for c in dataset.chunks)
+    print(f"{sys.argv[1]}: {len(dataset)} transitions in {len(dataset.chunks)} chunks "
+          f"({size / 2**20:.1f} MiB on disk, state shape {dataset.state_shape})")
+    if dataset.manifest["metadata"]:
+        print(f"Recorded by: {dataset.manifest['metadata']}")
+    dones = sum(int(chunk["dones"].sum()) for chunk in dataset.iter_chunks(shuffle=False))
+    print(f"Episode ends: {dones}")
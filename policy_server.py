@@ -0,0 +1,360 @@
+"""
+Low-latency CPU inference for trained LunarLander checkpoints
+Loads only the q_network of a DQNAgent.save() checkpoint and serves greedy
+actions in-process or over a local TCP socket, micro-batching concurrent requests
+"""
+
+import queue
+import socket
+import socketserver
+import struct
+import threading
+import time
+import warnings
+
+import numpy as np
+import torch
+
+from train import DQN, DuelingDQN
+
+
+def load_q_network(filepath):
+    """
+    Rebuild the online q_network from a DQNAgent checkpoint
+
+    The architecture (DQN or DuelingDQN) and its sizes are read off the
+    state_dict, so the algorithm does not need to be known. The target
+    network, optimizer state and epsilon are dropped.
+    """
+    checkpoint = torch.load(filepath, map_location="cpu")
+    state_dict = checkpoint["q_network"]
+
+    if "feature.0.weight" in state_dict:
+        hidden_dim, state_dim = state_dict["feature.0.weight"].shape
+        action_dim = state_dict["advantage_stream.2.weight"].shape[0]
+        network = DuelingDQN(state_dim, action_dim, hidden_dim)
+    else:
+        hidden_dim, state_dim = state_dict["fc1.weight"].shape
+        action_dim = state_dict["fc3.weight"].shape[0]
+        network = DQN(state_dim, action_dim, hidden_dim)
+
+    network.load_state_dict(state_dict)
+    return network.eval()
+
+
+def freeze_for_inference(network):
+    """Frozen TorchScript graph with weights inlined as constants (falls back to the module)"""
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            return torch.jit.optimize_for_inference(torch.jit.freeze(torch.jit.script(network.eval())))
+    except Exception as e:
+        warnings.warn(f"TorchScript freeze failed ({type(e).__name__}: {e}); using eager module")
+        return network.eval()
+
+
+class InferencePolicy:
+    """
+    Greedy policy for serving
+
+    States are copied into a preallocated float32 input buffer (no tensor
+    construction per call) and evaluated under torch.inference_mode by a
+    frozen TorchScript graph. The buffer is reused across calls, so one
+    InferencePolicy must only be called from one thread at a time.
+    """
+
+    def __init__(self, network, max_batch=64, freeze=True, warmup=20):
+        self.network = freeze_for_inference(network) if freeze else network.eval()
+        self.state_dim = next(network.parameters()).shape[1]
+        self.max_batch = max_batch
+        self._input = torch.zeros(max_batch, self.state_dim)
+        self._input_np = self._input.numpy()
+        self._single = self._input[:1]
+
+        # Frozen graphs are profiled and optimized during the first calls
+        for batch in (1, max_batch):
+            for _ in range(warmup):
+                with torch.inference_mode():
+                    self.network(self._input[:batch])
+
+    @classmethod
+    def from_checkpoint(cls, filepath, **kwargs):
+        return cls(load_q_network(filepath), **kwargs)
+
+    def act(self, state):
+        """Greedy action for a single state"""
+        self._input_np[0] = state
+        with torch.inference_mode():
+            return int(self.network(self._single).argmax())
+
+    def act_batch(self, states):
+        """Greedy actions for a [B, state_dim] batch (B may exceed max_batch)"""
+        states = np.asarray(states, dtype=np.float32)
+        actions = np.empty(len(states), dtype=np.int64)
+        for start in range(0, len(states), self.max_batch):
+            chunk = states[start:start + self.max_batch]
+            n = len(chunk)
+            self._input_np[:n] = chunk
+            with torch.inference_mode():
+                actions[start:start + n] = self.network(self._input[:n]).argmax(1).numpy()
+        return actions
+
+
+class MicroBatcher:
+    """
+    Coalesce concurrent act() requests into one batched forward
+
+    A single worker thread owns the InferencePolicy. It blocks for the first
+    request, takes every other request already queued (up to max_batch) and
+    answers them all with one forward, so requests that arrive while a
+    forward is running are served together by the next one. With
+    max_wait_us > 0 it additionally waits that long for stragglers, trading
+    single-request latency for larger batches.
+
+    If a batched forward fails (e.g. one client sent a state of the wrong
+    shape), its requests are retried one by one, so only the offending
+    requests fail: their exception is re-raised from submit() and the
+    worker keeps serving.
+    """
+
+    def __init__(self, policy, max_batch=None, max_wait_us=0):
+        self.policy = policy
+        self.max_batch = max_batch or policy.max_batch
+        self.max_wait = max_wait_us * 1e-6
+        self.requests = queue.SimpleQueue()
+        self.batch_sizes = []
+        self._stop = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, state):
+        """Blocking: returns the greedy action for state (raises the policy's error for a bad state)"""
+        request = [state, None, threading.Event(), None]
+        self.requests.put(request)
+        request[2].wait()
+        if request[3] is not None:
+            raise request[3]
+        return request[1]
+
+    def close(self):
+        self._stop = True
+        self.requests.put(None)
+        self._thread.join(timeout=1)
+
+    def _run(self):
+        while not self._stop:
+            batch = [self.requests.get()]
+            if batch[0] is None:
+                break
+
+            deadline = time.perf_counter() + self.max_wait
+            while len(batch) < self.max_batch:
+                try:
+                    request = self.requests.get_nowait()
+                except queue.Empty:
+                    if self.max_wait <= 0 or time.perf_counter() >= deadline:
+                        break
+                    time.sleep(0)
+                    continue
+                if request is None:
+                    self._stop = True
+                    break
+                batch.append(request)
+
+            try:
+                if len(batch) == 1:
+                    self._act_one(batch[0])
+                else:
+                    try:
+                        actions = self.policy.act_batch([request[0] for request in batch])
+                        for request, action in zip(batch, actions):
+                            request[1] = int(action)
+                    except Exception:
+                        for request in batch:
+                            self._act_one(request)
+                self.batch_sizes.append(len(batch))
+            finally:
+                for request in batch:
+                    request[2].set()
+
+    def _act_one(self, request):
+        try:
+            request[1] = self.policy.act(request[0])
+        except Exception as e:
+            request[3] = e
+
+
+class _PolicyRequestHandler(socketserver.BaseRequestHandler):
+    """One client connection: state_dim float32 in, one int32 action out, repeated"""
+
+    def handle(self):
+        self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        state_dim = self.server.batcher.policy.state_dim
+        message_size = 4 * state_dim
+        self.request.sendall(struct.pack("<I", state_dim))
+
+        buffer = bytearray(message_size)
+        view = memoryview(buffer)
+        while True:
+            received = 0
+            while received < message_size:
+                n = self.request.recv_into(view[received:])
+                if n == 0:
+                    return
+                received += n
+            state = np.frombuffer(buffer, dtype="<f4").copy()
+            self.request.sendall(struct.pack("<i", self.server.batcher.submit(state)))
+
+
+class PolicyServer(socketserver.ThreadingTCPServer):
+    """
+    Local TCP endpoint for a trained policy
+
+    Protocol (little-endian): on connect the server sends state_dim as
+    uint32; the client then sends state_dim float32 values per request and
+    reads back one int32 action. Requests from all connections go through
+    one MicroBatcher.
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, policy, host="127.0.0.1", port=5555, max_wait_us=0):
+        self.batcher = MicroBatcher(policy, max_wait_us=max_wait_us)
+        super().__init__((host, port), _PolicyRequestHandler)
+
+    def server_close(self):
+        super().server_close()
+        self.batcher.close()
+
+
+class PolicyClient:
+    """Blocking client for PolicyServer"""
+
+    def __init__(self, host="127.0.0.1", port=5555):
+        self.sock = socket.create_connection((host, port))
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.state_dim = struct.unpack("<I", self._recv_exact(4))[0]
+
+    def _recv_exact(self, size):
+        data = b""
+        while len(data) < size:
+            chunk = self.sock.recv(size - len(data))
+            if not chunk:
+                raise ConnectionError("Policy server closed the connection")
+            data += chunk
+        return data
+
+    def act(self, state):
+        self.sock.sendall(np.asarray(state, dtype="<f4").tobytes())
+        return struct.unpack("<i", self._recv_exact(4))[0]
+
+    def close(self):
+        self.sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def latency_percentiles(fn, iterations=5000, warmup=200):
+    """(p50, p99) wall time of fn() in microseconds"""
+    for _ in range(warmup):
+        fn()
+    times = np.empty(iterations)
+    for i in range(iterations):
+        start = time.perf_counter()
+        fn()
+        times[i] = time.perf_counter() - start
+    return np.percentile(times, 50) * 1e6, np.percentile(times, 99) * 1e6
+
+
+def run_latency_report(filepath, port, num_clients=4, iterations=5000):
+    """Measure per-action latency in-process and through a local server"""
+    torch.set_num_threads(1)
+    rng = np.random.default_rng(0)
+
+    network = load_q_network(filepath)
+    policy = InferencePolicy(network)
+    states = rng.standard_normal((256, policy.state_dim)).astype(np.float32)
+
+    def report(name, fn):
+        p50, p99 = latency_percentiles(fn, iterations)
+        print(f"  {name:<36} p50 {p50:8.1f} us | p99 {p99:8.1f} us")
+
+    print(f"Latency per action ({type(network).__name__}, {filepath})")
+    with torch.no_grad():
+        report("nn.Module (select_action style)",
+               lambda: network(torch.FloatTensor(states[0]).unsqueeze(0)).argmax(1).item())
+    report("InferencePolicy.act", lambda: policy.act(states[0]))
+
+    server = PolicyServer(InferencePolicy(network), port=port)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    with PolicyClient(port=port) as client:
+        report("PolicyClient.act (1 client)", lambda: client.act(states[0]))
+
+    # Concurrent clients exercise the micro-batcher
+    results = []
+
+    def client_loop():
+        with PolicyClient(port=port) as client:
+            results.append(latency_percentiles(lambda: client.act(states[0]), iterations // num_clients))
+
+    threads = [threading.Thread(target=client_loop) for _ in range(num_clients)]
+    server.batcher.batch_sizes.clear()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    p50 = np.median([r[0] for r in results])
+    p99 = np.max([r[1] for r in results])
+    print(f"  {f'PolicyClient.act ({num_clients} clients)':<36} p50 {p50:8.1f} us | p99 {p99:8.1f} us "
+          f"| mean batch {np.mean(server.batcher.batch_sizes):.2f}")
+
+    server.shutdown()
+    server.server_close()
+
+
+if __name__ == "__main__":
+    import sys
+
+    filepath = "models/best_model.pt"
+    host = "127.0.0.1"
+    port = 5555
+    max_wait_us = 0
+    bench = False
+
+    for arg in sys.argv[1:]:
+        if arg.startswith("--host="):
+            host = arg.split("=", 1)[1]
+        elif arg.startswith("--port="):
+            port = int(arg.split("=", 1)[1])
+        elif arg.startswith("--max-wait-us="):
+            max_wait_us = int(arg.split("=", 1)[1])
+        elif arg == "--bench":
+            bench = True
+        elif not arg.startswith("--"):
+            filepath = arg
+        else:
+            print("Usage: python policy_server.py [checkpoint] [--host=H] [--port=N] "
+                  "[--max-wait-us=N] [--bench]")
+            print("\nExamples:")
+            print("  python policy_server.py models/best_model.pt --port=5555")
+            print("  python policy_server.py models/best_model.pt --bench")
+            sys.exit(1)
+
+    if bench:
+        run_latency_report(filepath, port)
+        sys.exit(0)
+
+    torch.set_num_threads(1)
+    server = PolicyServer(InferencePolicy.from_checkpoint(filepath), host, port, max_wait_us)
+    print(f"Serving {filepath} on {host}:{port} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -0,0 +1,251 @@
+"""
+Low-overhead hot-path profiling for train_dqn
+Monotonic per-phase timers with power-of-two histograms, plus optional
+cProfile and torch.profiler capture windows over a range of episodes
+"""
+
+import contextlib
+import cProfile
+import io
+import json
+import pstats
+import time
+from pathlib import Path
+
+
+NUM_BUCKETS = 64    # bucket b holds durations in [2^(b-1), 2^b) ns
+
+
+class PhaseStats:
+    """Aggregated durations of one phase (no per-call samples are kept)"""
+
+    __slots__ = ("count", "total_ns", "min_ns", "max_ns", "histogram")
+
+    def __init__(self):
+        self.count = 0
+        self.total_ns = 0
+        self.min_ns = None
+        self.max_ns = 0
+        self.histogram = [0] * NUM_BUCKETS
+
+    def record(self, ns):
+        self.count += 1
+        self.total_ns += ns
+        if self.min_ns is None or ns < self.min_ns:
+            self.min_ns = ns
+        if ns > self.max_ns:
+            self.max_ns = ns
+        self.histogram[min(ns.bit_length(), NUM_BUCKETS - 1)] += 1
+
+    def percentile(self, q):
+        """Approximate q-th percentile in ns (geometric middle of the histogram bucket)"""
+        if not self.count:
+            return 0.0
+        rank = q / 100 * self.count
+        seen = 0
+        for bucket, n in enumerate(self.histogram):
+            seen += n
+            if n and seen >= rank:
+                if bucket == 0:
+                    return 0.0
+                low, high = 2 ** (bucket - 1), 2 ** bucket
+                return min(max((low * high) ** 0.5, self.min_ns), self.max_ns)
+        return float(self.max_ns)
+
+    def summary(self):
+        return {
+            "calls": self.count,
+            "total_s": self.total_ns / 1e9,
+            "mean_us": self.total_ns / self.count / 1e3 if self.count else 0.0,
+            "p50_us": self.percentile(50) / 1e3,
+            "p99_us": self.percentile(99) / 1e3,
+            "min_us": (self.min_ns or 0) / 1e3,
+            "max_us": self.max_ns / 1e3,
+            "histogram_ns_pow2": {f"<2^{b}": n for b, n in enumerate(self.histogram) if n},
+        }
+
+
+class _PhaseContext:
+    """Reusable context manager timing one phase (not re-entrant for the same name)"""
+
+    __slots__ = ("stats", "start")
+
+    def __init__(self, stats):
+        self.stats = stats
+        self.start = 0
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self.stats.record(time.perf_counter_ns() - self.start)
+        return False
+
+
+class PhaseTimer:
+    """
+    Named phase timers: `with timer.phase("env_step"): ...`
+
+    Phases may nest (e.g. "replay_sample" inside "train"); a nested phase is
+    also counted in its parent's time.
+    """
+
+    def __init__(self):
+        self.stats = {}
+        self._contexts = {}
+        self.start_time = time.perf_counter()
+
+    def phase(self, name):
+        context = self._contexts.get(name)
+        if context is None:
+            self.stats[name] = PhaseStats()
+            context = self._contexts[name] = _PhaseContext(self.stats[name])
+        return context
+
+    def elapsed(self):
+        return time.perf_counter() - self.start_time
+
+    def summary(self):
+        wall = self.elapsed()
+        phases = {}
+        for name, stats in self.stats.items():
+            phases[name] = stats.summary()
+            phases[name]["percent_of_wall"] = 100 * stats.total_ns / 1e9 / wall if wall else 0.0
+        return {"wall_time_s": wall, "phases": phases}
+
+
+class NullTimer:
+    """Drop-in PhaseTimer that measures nothing (profiling disabled)"""
+
+    _context = contextlib.nullcontext()
+
+    def phase(self, name):
+        return self._context
+
+
+NULL_TIMER = NullTimer()
+
+
+def format_phase_table(summary):
+    """Phase summary as a text table, slowest phase first"""
+    lines = [f"Wall time: {summary['wall_time_s']:.2f} s",
+             f"{'Phase':<16} {'Calls':>9} {'Total s':>9} {'% wall':>7} {'Mean us':>10} "
+             f"{'p50 us':>10} {'p99 us':>10} {'Max us':>11}"]
+    for name, s in sorted(summary["phases"].items(), key=lambda item: -item[1]["total_s"]):
+        lines.append(f"{name:<16} {s['calls']:>9} {s['total_s']:>9.3f} {s['percent_of_wall']:>6.1f}% "
+                     f"{s['mean_us']:>10.1f} {s['p50_us']:>10.1f} {s['p99_us']:>10.1f} {s['max_us']:>11.1f}")
+    return "\n".join(lines)
+
+
+def parse_window(text):
+    """'A-B' (inclusive episode range) or 'A' -> (A, B)"""
+    start, _, stop = text.partition("-")
+    start = int(start)
+    stop = int(stop) if stop else start
+    if stop < start:
+        raise ValueError(f"Empty episode window: {text}")
+    return start, stop
+
+
+class TrainingProfiler:
+    """
+    Phase timing plus optional capture windows for one training run
+
+    Reports are written next to the training log:
+    - <log_dir>/<algorithm>_profile.txt  : phase table (+ cProfile / torch.profiler tops)
+    - <log_dir>/<algorithm>_profile.json : phase summary with histograms
+    - <log_dir>/<algorithm>_cprofile.prof : pstats dump of the cProfile window
+    - <log_dir>/<algorithm>_torch_trace.json : Chrome trace of the torch.profiler window
+    """
+
+    def __init__(self, algorithm, log_dir="training_logs", cprofile_window=None, torch_window=None):
+        """
+        Args:
+            algorithm: log file prefix (TrainingLogger.algorithm)
+            log_dir: directory of the training log
+            cprofile_window / torch_window: (first, last) episodes to capture, or None
+        """
+        self.timer = PhaseTimer()
+        self.phase = self.timer.phase
+        self.algorithm = algorithm
+        self.log_dir = Path(log_dir)
+        self.cprofile_window = cprofile_window
+        self.torch_window = torch_window
+
+        self._cprofile = None
+        self._cprofile_stats = None
+        self._torch_profiler = None
+        self._torch_table = None
+        self.on_episode_end(0)
+
+    def on_episode_end(self, episode):
+        """Open / close the capture windows; call with 0 before training starts"""
+        if self.cprofile_window is not None:
+            first, last = self.cprofile_window
+            if episode + 1 == first:
+                self._cprofile = cProfile.Profile()
+                self._cprofile.enable()
+            elif episode == last and self._cprofile is not None:
+                self._stop_cprofile()
+
+        if self.torch_window is not None:
+            first, last = self.torch_window
+            if episode + 1 == first:
+                import torch.profiler
+                self._torch_profiler = torch.profiler.profile(
+                    activities=[torch.profiler.ProfilerActivity.CPU], record_shapes=True)
+                self._torch_profiler.__enter__()
+            elif episode == last and self._torch_profiler is not None:
+                self._stop_torch_profiler()
+
+    def _stop_cprofile(self):
+        self._cprofile.disable()
+        self.log_dir.mkdir(exist_ok=True)
+        self._cprofile.dump_stats(self.log_dir / f"{self.algorithm}_cprofile.prof")
+        stream = io.StringIO()
+        pstats.Stats(self._cprofile, stream=stream).sort_stats("cumulative").print_stats(30)
+        self._cprofile_stats = stream.getvalue()
+        self._cprofile = None
+
+    def _stop_torch_profiler(self):
+        self._torch_profiler.__exit__(None, None, None)
+        self.log_dir.mkdir(exist_ok=True)
+        self._torch_profiler.export_chrome_trace(str(self.log_dir / f"{self.algorithm}_torch_trace.json"))
+        self._torch_table = self._torch_profiler.key_averages().table(sort_by="self_cpu_time_total", row_limit=25)
+        self._torch_profiler = None
+
+    def write_report(self):
+        """Close any open window and write the report files; returns the text report path"""
+        if self._cprofile is not None:
+            self._stop_cprofile()
+        if self._torch_profiler is not None:
+            self._stop_torch_profiler()
+
+        summary = self.timer.summary()
+        self.log_dir.mkdir(exist_ok=True)
+        with open(self.log_dir / f"{self.algorithm}_profile.json", "w") as f:
+            json.dump(summary, f, indent=2)
+
+        text = [f"Training profile: {self.algorithm}", format_phase_table(summary)]
+        if self._cprofile_stats is not None:
+            text += [f"\ncProfile, episodes {self.cprofile_window[0]}-{self.cprofile_window[1]}"
+                     " (top 30 by cumulative time)", self._cprofile_stats]
+        if self._torch_table is not None:
+            text += [f"\ntorch.profiler, episodes {self.torch_window[0]}-{self.torch_window[1]}"
+                     " (top 25 by self CPU time)", self._torch_table]
+        path = self.log_dir / f"{self.algorithm}_profile.txt"
+        with open(path, "w") as f:
+            f.write("\n".join(text) + "\n")
+        return path
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) != 2:
+        print("Usage: python profiling.py <training_logs/<algorithm>_profile.json>")
+        sys.exit(1)
+
+    with open(sys.argv[1]) as f:
+        print(format_phase_table(json.load(f)))
@@ -0,0 +1,165 @@
+"""
+Reduced-precision inference variants for deployed LunarLander Q-networks
+Dynamic int8 (nn.Linear) and float16 / bfloat16 weights, checked against
+the float32 model by an accuracy gate on a fixed seed set
+"""
+
+import copy
+import io
+import time
+import warnings
+
+import numpy as np
+import torch
+import torch.nn as nn
+
+from evaluation import evaluate_policy, run_episodes
+from policy_server import load_q_network
+
+
+MODES = ["float32", "int8", "float16", "bfloat16"]
+
+
+class CastPolicy(nn.Module):
+    """Run a network whose weights are stored in a low-precision float dtype"""
+
+    def __init__(self, network, dtype):
+        super().__init__()
+        self.network = network.to(dtype)
+        self.dtype = dtype
+
+    def forward(self, x):
+        return self.network(x.to(self.dtype)).float()
+
+
+def quantize_q_network(network, mode="int8"):
+    """
+    Inference copy of a float32 Q-network in the given precision
+
+    - int8: dynamic quantization of every nn.Linear (int8 weights,
+      activations quantized per batch on the fly)
+    - float16 / bfloat16: weights cast to that dtype, inputs cast on entry
+      and Q-values returned as float32
+    """
+    network = copy.deepcopy(network).eval()
+    if mode == "float32":
+        return network
+    if mode == "int8":
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            return torch.ao.quantization.quantize_dynamic(network, {nn.Linear}, dtype=torch.qint8)
+    if mode == "float16":
+        return CastPolicy(network, torch.float16).eval()
+    if mode == "bfloat16":
+        return CastPolicy(network, torch.bfloat16).eval()
+    raise ValueError(f"Unknown mode: {mode} (choose from {', '.join(MODES)})")
+
+
+def load_quantized(filepath, mode="int8"):
+    """Load the q_network of a DQNAgent checkpoint (no target network / optimizer) in the given precision"""
+    return quantize_q_network(load_q_network(filepath), mode)
+
+
+def model_bytes(network):
+    """Serialized size of the network's state_dict"""
+    buffer = io.BytesIO()
+    torch.save(network.state_dict(), buffer)
+    return buffer.tell()
+
+
+def actions_per_second(network, state_dim, iterations=2000):
+    """Single-state greedy actions per second under inference_mode"""
+    state = torch.zeros(1, state_dim)
+    with torch.inference_mode():
+        for _ in range(100):
+            network(state)
+        start = time.perf_counter()
+        for _ in range(iterations):
+            network(state).argmax()
+    return iterations / (time.perf_counter() - start)
+
+
+def accuracy_gate(reference, candidate, seeds, min_agreement=0.99, max_return_drop=5.0):
+    """
+    Compare a quantized network against the float32 reference
+
+    Greedy action agreement is measured on every state the reference
+    visits during the seeded episodes; mean episodic return is measured by
+    running both policies on the same seeds. The candidate passes when the
+    agreement is at least min_agreement and its mean return is at most
+    max_return_drop below the reference.
+
+    Returns:
+        dict with agreement, reference_return, candidate_return, passed
+    """
+    visited = []
+
+    def recording_reference(states):
+        visited.append(states.copy())
+        with torch.inference_mode():
+            return reference(torch.from_numpy(states)).numpy()
+
+    returns, _ = run_episodes(recording_reference, len(seeds), seeds=seeds)
+    states = torch.from_numpy(np.concatenate(visited))
+    with torch.inference_mode():
+        agreement = (reference(states).argmax(1) == candidate(states).argmax(1)).float().mean().item()
+
+    candidate_return, _, _ = evaluate_policy(candidate, len(seeds), seeds=seeds)
+    reference_return = returns.mean()
+    return {
+        "agreement": agreement,
+        "reference_return": float(reference_return),
+        "candidate_return": float(candidate_return),
+        "passed": agreement >= min_agreement and candidate_return >= reference_return - max_return_drop,
+    }
+
+
+if __name__ == "__main__":
+    import sys
+
+    filepath = "models/best_model.pt"
+    modes = ["int8", "float16", "bfloat16"]
+    num_episodes = 20
+    min_agreement = 0.99
+    max_return_drop = 5.0
+
+    for arg in sys.argv[1:]:
+        if arg.startswith("--modes="):
+            modes = arg.split("=", 1)[1].split(",")
+        elif arg.startswith("--episodes="):
+            num_episodes = int(arg.split("=", 1)[1])
+        elif arg.startswith("--min-agreement="):
+            min_agreement = float(arg.split("=", 1)[1])
+        elif arg.startswith("--max-return-drop="):
+            max_return_drop = float(arg.split("=", 1)[1])
+        elif not arg.startswith("--"):
+            filepath = arg
+        else:
+            print("Usage: python quantization.py [checkpoint] [--modes=int8,float16,bfloat16] "
+                  "[--episodes=N] [--min-agreement=A] [--max-return-drop=R]")
+            sys.exit(1)
+
+    torch.set_num_threads(1)
+    reference = load_q_network(filepath)
+    state_dim = next(reference.parameters()).shape[1]
+    seeds = list(range(num_episodes))
+
+    print("="*60)
+    print(f"Quantization gate: {filepath} ({type(reference).__name__}, {num_episodes} seeded episodes)")
+    print("="*60)
+    ref_bytes = model_bytes(reference)
+    ref_rate = actions_per_second(reference, state_dim)
+    print(f"{'float32':<9} | {ref_bytes / 1024:7.1f} KiB | {ref_rate:8.0f} actions/s |")
+
+    failed = False
+    for mode in modes:
+        candidate = quantize_q_network(reference, mode)
+        result = accuracy_gate(reference, candidate, seeds, min_agreement, max_return_drop)
+        failed |= not result["passed"]
+        print(f"{mode:<9} | {model_bytes(candidate) / 1024:7.1f} KiB | "
+              f"{actions_per_second(candidate, state_dim):8.0f} actions/s | "
+              f"Agreement: {result['agreement'] * 100:6.2f}% | "
+              f"Return: {result['candidate_return']:7.2f} vs {result['reference_return']:7.2f} | "
+              f"{'PASS' if result['passed'] else 'FAIL'}")
+
+    sys.exit(1 if failed else 0)
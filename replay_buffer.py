@@ -0,0 +1,440 @@
+"""
+Array-backed experience replay for the LunarLander DQN agents
+Transitions are stored column-wise in preallocated NumPy arrays
+"""
+
+import json
+import os
+import queue
+import threading
+import time
+
+import numpy as np
+import torch
+
+
+COLUMNS = ["states", "actions", "rewards", "next_states", "dones"]
+
+
+class ReplayBuffer:
+    """
+    Experience Replay Buffer (structure-of-arrays ring buffer)
+
+    Each field of a transition lives in its own contiguous array:
+    - states / next_states : float32 [capacity, state_dim]
+    - actions              : int64   [capacity]
+    - rewards / dones      : float32 [capacity]
+
+    push() writes one row in O(1) and sample() gathers a whole minibatch
+    with a single fancy-index per column, so there are no per-transition
+    Python objects no matter how large the capacity is. Arrays are allocated
+    lazily on the first push, once the state shape is known. Writes hold
+    self.lock so a PrefetchSampler thread never gathers a half-written row.
+    """
+
+    def __init__(self, capacity=10000):
+        self.capacity = int(capacity)
+        self.position = 0
+        self.count = 0
+        self.total_pushed = 0
+        self.lock = threading.RLock()
+
+        self.states = None
+        self.actions = None
+        self.rewards = None
+        self.next_states = None
+        self.dones = None
+
+    def _allocate(self, state_shape):
+        """Allocate the column arrays for the given state shape"""
+        self.states = np.zeros((self.capacity, *state_shape), dtype=np.float32)
+        self.next_states = np.zeros((self.capacity, *state_shape), dtype=np.float32)
+        self.actions = np.zeros(self.capacity, dtype=np.int64)
+        self.rewards = np.zeros(self.capacity, dtype=np.float32)
+        self.dones = np.zeros(self.capacity, dtype=np.float32)
+
+    def push(self, state, action, reward, next_state, done):
+        with self.lock:
+            if self.states is None:
+                self._allocate(np.shape(state))
+
+            i = self.position
+            self.states[i] = state
+            self.actions[i] = action
+            self.rewards[i] = reward
+            self.next_states[i] = next_state
+            self.dones[i] = done
+
+            self.position = (i + 1) % self.capacity
+            self.count = min(self.count + 1, self.capacity)
+            self.total_pushed += 1
+
+    def push_batch(self, states, actions, rewards, next_states, dones):
+        """Write a batch of transitions (e.g. one step of a vector env) at once"""
+        with self.lock:
+            n = len(actions)
+            if self.states is None:
+                self._allocate(np.shape(states)[1:])
+
+            indices = (self.position + np.arange(n)) % self.capacity
+            self.states[indices] = states
+            self.actions[indices] = actions
+            self.rewards[indices] = rewards
+            self.next_states[indices] = next_states
+            self.dones[indices] = dones
+
+            self.position = (self.position + n) % self.capacity
+            self.count = min(self.count + n, self.capacity)
+            self.total_pushed += n
+            return indices
+
+    def sample_indices(self, batch_size):
+        """Draw batch_size slot indices uniformly (with replacement)"""
+        return np.random.randint(0, self.count, size=batch_size)
+
+    def get_batch(self, indices):
+        """Gather the transitions at the given slots as torch tensors"""
+        return (
+            torch.from_numpy(self.states[indices]),
+            torch.from_numpy(self.actions[indices]),
+            torch.from_numpy(self.rewards[indices]),
+            torch.from_numpy(self.next_states[indices]),
+            torch.from_numpy(self.dones[indices]),
+        )
+
+    def sample(self, batch_size):
+        return self.get_batch(self.sample_indices(batch_size))
+
+    def __len__(self):
+        return self.count
+
+    def _meta(self):
+        return {"class": type(self).__name__, "capacity": self.capacity, "position": self.position,
+                "count": self.count, "total_pushed": self.total_pushed}
+
+    def save(self, directory):
+        """
+        Write the filled slots as one .npy file per column plus meta.json
+
+        The .npy files are plain arrays that load() memory-maps, so saving and
+        restoring a million transitions is a sequential write / read of
+        ~70 MB rather than pickling Python objects.
+        """
+        os.makedirs(directory, exist_ok=True)
+        if self.states is not None:
+            for name in COLUMNS:
+                np.save(os.path.join(directory, f"{name}.npy"), getattr(self, name)[:self.count])
+        with open(os.path.join(directory, "meta.json"), "w") as f:
+            json.dump(self._meta(), f)
+
+    def load(self, directory):
+        """Restore a buffer written by save() (capacity must match)"""
+        with open(os.path.join(directory, "meta.json")) as f:
+            meta = json.load(f)
+        if meta["capacity"] != self.capacity:
+            raise ValueError(f"Saved buffer capacity {meta['capacity']} != {self.capacity}")
+
+        self.position, self.count, self.total_pushed = meta["position"], meta["count"], meta["total_pushed"]
+        if self.count:
+            columns = {name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r") for name in COLUMNS}
+            self._allocate(columns["states"].shape[1:])
+            for name, column in columns.items():
+                getattr(self, name)[:self.count] = column
+        return meta
+
+
+class MemmapReplayBuffer(ReplayBuffer):
+    """
+    Replay buffer whose state columns live in np.memmap files
+
+    states / next_states (the bulk of every transition) are stored on disk
+    in <directory>/{states,next_states}.dat, optionally as float16, and
+    paged in by the OS on demand. actions, rewards and dones stay in RAM in
+    compact dtypes (int16 / float32 / uint8, 7 bytes per transition), so
+    tens of millions of transitions fit without holding the states in
+    memory. Same push / push_batch / sample interface as ReplayBuffer;
+    get_batch() reads the minibatch rows in ascending slot order for
+    locality and returns float32 tensors in the requested order.
+    """
+
+    def __init__(self, capacity, directory, compress_states=False):
+        super().__init__(capacity)
+        self.directory = directory
+        self.state_dtype = np.float16 if compress_states else np.float32
+
+    def _allocate(self, state_shape):
+        os.makedirs(self.directory, exist_ok=True)
+        shape = (self.capacity, *state_shape)
+        self.states = np.memmap(os.path.join(self.directory, "states.dat"),
+                                dtype=self.state_dtype, mode="w+", shape=shape)
+        self.next_states = np.memmap(os.path.join(self.directory, "next_states.dat"),
+                                     dtype=self.state_dtype, mode="w+", shape=shape)
+        self.actions = np.zeros(self.capacity, dtype=np.int16)
+        self.rewards = np.zeros(self.capacity, dtype=np.float32)
+        self.dones = np.zeros(self.capacity, dtype=np.uint8)
+
+    def get_batch(self, indices):
+        indices = np.asarray(indices)
+        order = np.argsort(indices, kind="stable")
+        rows = indices[order]
+        states = np.empty((len(indices), *self.states.shape[1:]), dtype=np.float32)
+        next_states = np.empty_like(states)
+        states[order] = self.states[rows]
+        next_states[order] = self.next_states[rows]
+        return (
+            torch.from_numpy(states),
+            torch.from_numpy(self.actions[indices].astype(np.int64)),
+            torch.from_numpy(self.rewards[indices]),
+            torch.from_numpy(next_states),
+            torch.from_numpy(self.dones[indices].astype(np.float32)),
+        )
+
+    def flush(self):
+        """Write dirty state pages back to the memmap files"""
+        if self.states is not None:
+            self.states.flush()
+            self.next_states.flush()
+
+
+class SumTree:
+    """
+    Binary sum-tree over leaf priorities
+
+    Stored as a flat heap array (root at index 1, children of node i at
+    2i and 2i+1) with a power-of-two number of leaves, so every leaf sits
+    at the same depth. Both prefix-sum lookup and priority updates walk one
+    tree level at a time for the whole batch, giving O(log N) work per
+    element with a handful of NumPy calls per level.
+    """
+
+    def __init__(self, capacity):
+        self.leaf_count = max(2, 1 << (int(capacity) - 1).bit_length())
+        self.depth = self.leaf_count.bit_length() - 1
+        self.tree = np.zeros(2 * self.leaf_count, dtype=np.float64)
+        self._shifts = np.arange(self.depth + 1)
+
+    def total(self):
+        return self.tree[1]
+
+    def get(self, indices):
+        return self.tree[np.asarray(indices) + self.leaf_count]
+
+    def set_one(self, index, priority):
+        """Set a single leaf and propagate the change to all of its ancestors"""
+        leaf = index + self.leaf_count
+        delta = priority - self.tree[leaf]
+        self.tree[leaf >> self._shifts] += delta
+
+    def update(self, indices, priorities):
+        """Set a batch of leaves, then recompute every touched parent level by level"""
+        nodes = np.asarray(indices, dtype=np.int64) + self.leaf_count
+        self.tree[nodes] = priorities
+
+        # Parents of a sorted, de-duplicated level stay sorted, so each level
+        # only needs a neighbour comparison instead of a full np.unique
+        nodes = np.unique(nodes)
+        for _ in range(self.depth):
+            nodes >>= 1
+            keep = np.empty(len(nodes), dtype=bool)
+            keep[0] = True
+            np.not_equal(nodes[1:], nodes[:-1], out=keep[1:])
+            nodes = nodes[keep]
+            self.tree[nodes] = self.tree[2 * nodes] + self.tree[2 * nodes + 1]
+
+    def find(self, values):
+        """Return the leaf index whose prefix-sum interval contains each value"""
+        values = np.array(values, dtype=np.float64)
+        nodes = np.ones(len(values), dtype=np.int64)
+        for _ in range(self.depth):
+            nodes <<= 1
+            left_sum = self.tree[nodes]
+            go_right = values > left_sum
+            values -= left_sum * go_right
+            nodes += go_right
+        return nodes - self.leaf_count
+
+
+class PrioritizedReplayBuffer(ReplayBuffer):
+    """
+    Prioritized Experience Replay Buffer
+
+    Samples transition i with probability P(i) = p_i^alpha / sum_k p_k^alpha,
+    where p_i = |TD error| + eps, and corrects the induced bias with
+    importance-sampling weights w_i = (N * P(i))^-beta normalized by the
+    batch maximum. beta is annealed linearly to 1 over beta_steps samples.
+    New transitions get the current maximum priority so they are replayed
+    at least once.
+
+    Reference: Schaul et al. (2016) "Prioritized Experience Replay"
+    """
+
+    def __init__(self, capacity=10000, alpha=0.6, beta_start=0.4, beta_steps=100000, eps=1e-6):
+        super().__init__(capacity)
+        self.alpha = alpha
+        self.beta = beta_start
+        self.beta_increment = (1.0 - beta_start) / max(1, beta_steps)
+        self.eps = eps
+        self.max_priority = 1.0
+        self.tree = SumTree(self.capacity)
+
+    def push(self, state, action, reward, next_state, done):
+        with self.lock:
+            index = self.position
+            super().push(state, action, reward, next_state, done)
+            self.tree.set_one(index, self.max_priority ** self.alpha)
+
+    def push_batch(self, states, actions, rewards, next_states, dones):
+        with self.lock:
+            indices = super().push_batch(states, actions, rewards, next_states, dones)
+            self.tree.update(indices, np.full(len(indices), self.max_priority ** self.alpha))
+            return indices
+
+    def sample_indices(self, batch_size):
+        """Stratified proportional sampling: one draw per equal-mass segment"""
+        segment = self.tree.total() / batch_size
+        values = (np.arange(batch_size) + np.random.random_sample(batch_size)) * segment
+        indices = self.tree.find(values)
+        self.beta = min(1.0, self.beta + self.beta_increment)
+        return np.minimum(indices, self.count - 1)
+
+    def importance_weights(self, indices):
+        """Importance-sampling weights for the given slots as a float32 tensor"""
+        probs = self.tree.get(indices) / self.tree.total()
+        weights = (self.count * probs) ** (-self.beta)
+        weights /= weights.max()
+        return torch.from_numpy(weights.astype(np.float32))
+
+    def update_priorities(self, indices, td_errors):
+        priorities = np.abs(np.asarray(td_errors, dtype=np.float64)) + self.eps
+        with self.lock:
+            self.max_priority = max(self.max_priority, priorities.max())
+            self.tree.update(indices, priorities ** self.alpha)
+
+    def _meta(self):
+        return {**super()._meta(), "beta": self.beta, "max_priority": self.max_priority}
+
+    def save(self, directory):
+        super().save(directory)
+        np.save(os.path.join(directory, "tree.npy"), self.tree.tree)
+
+    def load(self, directory):
+        meta = super().load(directory)
+        self.beta, self.max_priority = meta["beta"], meta["max_priority"]
+        self.tree.tree[:] = np.load(os.path.join(directory, "tree.npy"), mmap_mode="r")
+        return meta
+
+
+def _gather(column, indices, out):
+    """out[:] = column[indices] without a temporary when the dtypes match"""
+    if column.dtype == out.dtype:
+        np.take(column, indices, axis=0, out=out)
+    else:
+        out[...] = column[indices]
+
+
+class PrefetchSampler:
+    """
+    Background minibatch sampler for a replay buffer
+
+    A worker thread draws slot indices (and importance weights for a
+    PrioritizedReplayBuffer) and gathers the rows into a ring of
+    preallocated tensors while the training thread runs the previous
+    update, so get() usually returns a ready batch without touching the
+    buffer. Sampling and gathering hold buffer.lock, so every batch is a
+    consistent copy of the buffer at one point in time; it is up to depth
+    batches older than the transitions pushed since. Priority updates for
+    a prefetched batch may hit slots that were overwritten in between,
+    as in any asynchronous PER setup.
+
+    A batch returned by get() stays valid until the next get().
+    """
+
+    def __init__(self, buffer, batch_size, depth=2, pin_memory=False):
+        self.buffer = buffer
+        self.batch_size = int(batch_size)
+        self.depth = max(1, int(depth))
+        self.pin_memory = pin_memory
+        self.prioritized = isinstance(buffer, PrioritizedReplayBuffer)
+        self.batches = 0
+        self.waits = 0
+
+        self._allocated = False
+        self._free = queue.Queue()
+        self._ready = queue.Queue(maxsize=self.depth)
+        self._held = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="replay-prefetch", daemon=True)
+        self._thread.start()
+
+    def _allocate(self, state_shape):
+        """depth queued + one being filled + one held by the consumer"""
+        n = self.batch_size
+        for _ in range(self.depth + 2):
+            tensors = (
+                torch.empty((n, *state_shape), dtype=torch.float32),
+                torch.empty(n, dtype=torch.int64),
+                torch.empty(n, dtype=torch.float32),
+                torch.empty((n, *state_shape), dtype=torch.float32),
+                torch.empty(n, dtype=torch.float32),
+                torch.empty(n, dtype=torch.float32),
+            )
+            if self.pin_memory:
+                tensors = tuple(t.pin_memory() for t in tensors)
+            self._free.put((tensors, np.empty(n, dtype=np.int64)))
+
+    def _fill(self, slot):
+        (states, actions, rewards, next_states, dones, weights), indices = slot
+        buffer = self.buffer
+        with buffer.lock:
+            indices[:] = buffer.sample_indices(self.batch_size)
+            if self.prioritized:
+                weights.copy_(buffer.importance_weights(indices))
+            for column, out in zip(COLUMNS, (states, actions, rewards, next_states, dones)):
+                _gather(getattr(buffer, column), indices, out.numpy())
+
+    def _run(self):
+        try:
+            while not self._stop.is_set():
+                if len(self.buffer) < self.batch_size:
+                    time.sleep(0.001)
+                    continue
+                if not self._allocated:
+                    self._allocated = True
+                    self._allocate(self.buffer.states.shape[1:])
+                slot = self._free.get()
+                self._fill(slot)
+                while not self._stop.is_set():
+                    try:
+                        self._ready.put(slot, timeout=0.1)
+                        break
+                    except queue.Full:
+                        pass
+        except Exception as e:
+            self._ready.put(e)
+
+    def get(self):
+        """
+        Next minibatch as (states, actions, rewards, next_states, dones,
+        weights, indices), the tuple DQNAgent.sample_batch() returns
+        """
+        if self._held is not None:
+            self._free.put(self._held)
+            self._held = None
+        if self._ready.empty():
+            self.waits += 1
+        slot = self._ready.get()
+        if isinstance(slot, Exception):
+            raise RuntimeError("Replay prefetch thread failed") from slot
+        self._held = slot
+        self.batches += 1
+        (states, actions, rewards, next_states, dones, weights), indices = slot
+        return states, actions, rewards, next_states, dones, weights if self.prioritized else None, indices
+
+    def close(self):
+        """Stop the worker thread (queued batches are dropped)"""
+        self._stop.set()
+        while self._thread.is_alive():
+            try:
+                self._ready.get_nowait()
+            except queue.Empty:
+                self._thread.join(timeout=0.01)
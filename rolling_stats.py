@@ -0,0 +1,154 @@
+"""
+학습 곡선용 벡터화 이동 통계
+누적합(cumsum)과 strided view 로 벡터화 (visualize, TrainingLogger, DQN 스크립트 공용)
+"""
+
+import math
+from statistics import NormalDist
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+def rolling_mean(values, window):
+    """
+    길이 window 이동 평균 (np.convolve(values, ones(window)/window, 'valid') 와 동일)
+
+    Returns:
+        길이 n - window + 1 배열 (값이 window 개보다 적으면 빈 배열)
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if len(values) < window:
+        return np.zeros(0)
+    cumsum = np.concatenate(([0.0], np.cumsum(values)))
+    return (cumsum[window:] - cumsum[:-window]) / window
+
+
+def rolling_std(values, window):
+    """길이 window 이동 표준편차 (모표준편차, ddof=0)"""
+    values = np.asarray(values, dtype=np.float64)
+    if len(values) < window:
+        return np.zeros(0)
+    # 전체 평균을 빼서 제곱 누적합의 자릿수 손실을 줄임
+    centered = values - values.mean()
+    cumsum = np.concatenate(([0.0], np.cumsum(centered)))
+    cumsum_sq = np.concatenate(([0.0], np.cumsum(centered * centered)))
+    mean = (cumsum[window:] - cumsum[:-window]) / window
+    mean_sq = (cumsum_sq[window:] - cumsum_sq[:-window]) / window
+    return np.sqrt(np.maximum(mean_sq - mean * mean, 0.0))
+
+
+def rolling_quantile(values, window, q):
+    """길이 window 이동 분위수 (q: 0~1 또는 그 배열), 복사 없는 sliding window view 사용"""
+    values = np.asarray(values, dtype=np.float64)
+    if len(values) < window:
+        return np.zeros(0)
+    return np.quantile(sliding_window_view(values, window), q, axis=-1)
+
+
+def rolling_success_rate(values, window, threshold=200):
+    """길이 window 이동 구간에서 threshold 이상인 비율 (%)"""
+    return rolling_mean(np.asarray(values) >= threshold, window) * 100
+
+
+def block_means(values, block):
+    """
+    겹치지 않는 block 단위 평균 (마지막 구간은 남은 값만)
+
+    Returns:
+        (각 구간 마지막 인덱스, 구간 평균)
+    """
+    values = np.asarray(values, dtype=np.float64)
+    starts = np.arange(0, len(values), block)
+    if len(starts) == 0:
+        return starts, np.zeros(0)
+    ends = np.minimum(starts + block, len(values))
+    return ends - 1, np.add.reduceat(values, starts) / (ends - starts)
+
+
+def block_success_rate(values, block, threshold=200):
+    """겹치지 않는 block 단위 성공률 (%) -> (각 구간 마지막 인덱스, 성공률)"""
+    last, rates = block_means(np.asarray(values) >= threshold, block)
+    return last, rates * 100
+
+
+def _tail(values, window):
+    """마지막 window 개 값 (리스트 전체를 배열로 바꾸지 않고 먼저 자름)"""
+    try:
+        tail = values[-window:]
+    except TypeError:   # deque 등 슬라이싱이 안 되는 시퀀스
+        tail = list(values)[-window:]
+    return np.asarray(tail, dtype=np.float64)
+
+
+def trailing_mean(values, window):
+    """마지막 window 개 값의 평균 (값이 적으면 있는 만큼, 없으면 0)"""
+    tail = _tail(values, window)
+    return float(tail.mean()) if len(tail) else 0.0
+
+
+def trailing_std(values, window):
+    """마지막 window 개 값의 표준편차 (값이 없으면 0)"""
+    tail = _tail(values, window)
+    return float(tail.std()) if len(tail) else 0.0
+
+
+def ema(values, alpha=None, span=None):
+    """
+    지수 이동 평균 y_t = alpha * x_t + (1 - alpha) * y_{t-1}, y_0 = x_0
+
+    alpha 또는 span (alpha = 2 / (span + 1)) 중 하나를 지정합니다.
+    블록마다 닫힌 형태(가중 누적합)로 계산해 파이썬 루프는 블록 수만큼만 돕니다.
+    블록 길이는 (1 - alpha)^-k 가 1e12 를 넘지 않도록 정해 수치 오차를 제한합니다.
+    """
+    if (alpha is None) == (span is None):
+        raise ValueError("Specify exactly one of alpha or span")
+    if alpha is None:
+        alpha = 2.0 / (span + 1.0)
+    if not 0 < alpha <= 1:
+        raise ValueError(f"alpha must be in (0, 1], got {alpha}")
+
+    values = np.asarray(values, dtype=np.float64)
+    out = np.empty_like(values)
+    if len(values) == 0:
+        return out
+    if alpha == 1:
+        out[:] = values
+        return out
+
+    decay = 1.0 - alpha
+    block = max(1, int(math.log(1e-12) / math.log(decay)))
+    powers = decay ** np.arange(1, block + 1)          # decay^(i+1)
+    inverse = decay ** -np.arange(block)                # decay^-i
+
+    previous = values[0]
+    out[0] = previous
+    for start in range(1, len(values), block):
+        x = values[start:start + block]
+        k = len(x)
+        # y_i = decay^(i+1) * y_prev + alpha * sum_{j<=i} decay^(i-j) x_j
+        out[start:start + k] = (powers[:k] * previous
+                                + alpha * np.cumsum(x * inverse[:k]) * powers[:k] / decay)
+        previous = out[start + k - 1]
+    return out
+
+
+def confidence_band(curves, confidence=0.95):
+    """
+    여러 seed 의 곡선에 대한 평균과 신뢰 구간 (정규 근사)
+
+    Args:
+        curves: seed 별 1차원 배열 목록 (가장 짧은 길이에 맞춰 자름)
+        confidence: 신뢰 수준
+
+    Returns:
+        (mean, lower, upper) 배열
+    """
+    length = min(len(c) for c in curves)
+    stacked = np.stack([np.asarray(c, dtype=np.float64)[:length] for c in curves])
+    mean = stacked.mean(axis=0)
+    if len(stacked) < 2:
+        return mean, mean.copy(), mean.copy()
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    half_width = z * stacked.std(axis=0, ddof=1) / math.sqrt(len(stacked))
+    return mean, mean - half_width, mean + half_width
@@ -0,0 +1,156 @@
+"""
+Parallel hyperparameter sweep for the LunarLander DQN comparison
+Each config trains in its own worker process (dqn_lunarlander_251129_integration.run_test)
+"""
+
+import itertools
+import json
+import multiprocessing as mp
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+import torch
+
+import dqn_lunarlander_251129_integration as integration
+
+
+TRAIN_FUNCTIONS = {
+    'DQN': integration.train_dqn,
+    'Double DQN': integration.train_double_dqn,
+    'Dueling DQN': integration.train_double_dqn,
+}
+
+
+def expand_grid(grid):
+    """
+    Cartesian product of a parameter grid
+
+    Example:
+        expand_grid({'alg': ['DQN', 'Double DQN'], 'lr': [1e-3, 5e-3], 'seed': [0, 1]})
+        -> 8 config dicts
+    """
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[k] for k in keys))]
+
+
+def configs_from_test_configs(test_configs, seeds=(0,)):
+    """Flatten integration.TEST_CONFIGS entries into sweep configs, one per seed"""
+    configs = []
+    for config in test_configs:
+        for seed in seeds:
+            configs.append({
+                'version': config['version'],
+                'alg': config['alg'],
+                'lr': config['params']['lr'],
+                'gamma': config['params']['gamma'],
+                'batch_size': config['params']['batch_size'],
+                'tau': config['params'].get('tau', integration.tau),
+                'seed': seed,
+            })
+    return configs
+
+
+def _init_worker(num_threads):
+    """Cap intra-op threads so workers do not oversubscribe the cores"""
+    torch.set_num_threads(num_threads)
+
+
+def run_config(config, n_episodes):
+    """Train and evaluate one config; runs inside a worker process"""
+    start = time.perf_counter()
+    avg_return, success_rate, avg_length, score_history = integration.run_test(
+        config['alg'].replace(' ', '_'),
+        TRAIN_FUNCTIONS[config['alg']],
+        n_episodes,
+        config.get('lr', integration.learning_rate),
+        config.get('gamma', integration.gamma),
+        config.get('batch_size', integration.batch_size),
+        config.get('tau', integration.tau),
+        seed=config.get('seed'),
+        updates_per_step=config.get('updates_per_step', 1.0),
+        train_every=config.get('train_every', 1),
+    )
+    return {
+        **config,
+        'avg_return': float(avg_return),
+        'success_rate': float(success_rate),
+        'avg_length': float(avg_length),
+        'wall_time': time.perf_counter() - start,
+        'score_history': [(int(e), float(s)) for e, s in score_history],
+    }
+
+
+def run_sweep(configs, n_episodes=integration.TRAINING_EPISODES, max_workers=None,
+              threads_per_worker=1, output_prefix='sweep_results'):
+    """
+    Run every config in a process pool and write a combined results table
+
+    Writes <output_prefix>.csv (one row per config) and <output_prefix>.json
+    (rows plus score_history for plotting). Returns the results DataFrame.
+    """
+    if max_workers is None:
+        max_workers = max(1, min(len(configs), (os.cpu_count() or 1) // threads_per_worker))
+
+    print("="*60)
+    print(f"🔥 Sweep: {len(configs)} configs, {max_workers} workers x {threads_per_worker} threads")
+    print("="*60)
+
+    start = time.perf_counter()
+    results = [None] * len(configs)
+    with ProcessPoolExecutor(max_workers=max_workers,
+                             mp_context=mp.get_context('spawn'),
+                             initializer=_init_worker,
+                             initargs=(threads_per_worker,)) as pool:
+        futures = {pool.submit(run_config, config, n_episodes): i for i, config in enumerate(configs)}
+        for future in as_completed(futures):
+            result = future.result()
+            results[futures[future]] = result
+            print(f"  ✅ {result['alg']} {result.get('version', '')} seed={result.get('seed')} | "
+                  f"Avg Return: {result['avg_return']:.2f} | "
+                  f"Success: {result['success_rate']:.1f}% | "
+                  f"{result['wall_time']:.0f}s")
+
+    df = pd.DataFrame([{k: v for k, v in r.items() if k != 'score_history'} for r in results])
+    df.to_csv(f'{output_prefix}.csv', index=False)
+    with open(f'{output_prefix}.json', 'w') as f:
+        json.dump(results, f, indent=2)
+
+    print(f"\n{df.to_string(index=False)}")
+    print(f"\nTotal wall time: {time.perf_counter() - start:.0f}s")
+    print(f"📊 Saved: {output_prefix}.csv, {output_prefix}.json")
+    return df
+
+
+if __name__ == '__main__':
+    import sys
+
+    n_episodes = integration.TRAINING_EPISODES
+    max_workers = None
+    threads_per_worker = 1
+    seeds = [0]
+    output_prefix = 'sweep_results'
+
+    for arg in sys.argv[1:]:
+        if arg.startswith('--episodes='):
+            n_episodes = int(arg.split('=', 1)[1])
+        elif arg.startswith('--workers='):
+            max_workers = int(arg.split('=', 1)[1])
+        elif arg.startswith('--threads='):
+            threads_per_worker = int(arg.split('=', 1)[1])
+        elif arg.startswith('--seeds='):
+            seeds = [int(x) for x in arg.split('=', 1)[1].split(',')]
+        elif arg.startswith('--out='):
+            output_prefix = arg.split('=', 1)[1]
+        else:
+            print("Usage: python sweep.py [--episodes=N] [--workers=N] [--threads=N] "
+                  "[--seeds=0,1,2] [--out=PREFIX]")
+            print("\nRuns the six TEST_CONFIGS (x seeds) of the integration script in parallel.")
+            sys.exit(1)
+
+    run_sweep(configs_from_test_configs(integration.TEST_CONFIGS, seeds),
+              n_episodes=n_episodes,
+              max_workers=max_workers,
+              threads_per_worker=threads_per_worker,
+              output_prefix=output_prefix)
@@ -7,12 +7,25 @@ import numpy as np
 import torch
 import torch.nn as nn
 import torch.optim as optim
-from collections import deque
 import random
 import gymnasium as gym
 import os
+import glob
+import time
 import cv2
 from datetime import datetime
+from functools import partial
+
+from replay_buffer import ReplayBuffer, PrioritizedReplayBuffer, MemmapReplayBuffer, PrefetchSampler
+from evaluation import evaluate_policy
+from update_scheduler import UpdateScheduler
+from compiled import compile_function, compile_module
+from columnar_log import ColumnarTrainingLogger
+from live_monitor import DEFAULT_PORT, MetricsPublisher
+from profiling import NULL_TIMER, TrainingProfiler, parse_window
+from checkpoint import CheckpointWriter, atomic_save
+from training_state import has_training_state, load_training_state, save_training_state
+from offline_dataset import DatasetWriter, OfflineDataset
 
 
 class DQN(nn.Module):
@@ -85,28 +98,37 @@ class DuelingDQN(nn.Module):
         return q_values
 
 
-class ReplayBuffer:
-    """Experience Replay Buffer"""
+class TargetQCache:
+    """
+    Per-replay-slot cache of target network outputs Q_target(s', .)
 
-    def __init__(self, capacity=10000):
-        self.buffer = deque(maxlen=capacity)
+    With hard target updates the target network is frozen for a whole
+    update period, so Q_target(s') of a stored transition does not change
+    until the next update_target_network() or until its replay slot is
+    overwritten. Only cache misses are forwarded through the network.
+    """
 
-    def push(self, state, action, reward, next_state, done):
-        self.buffer.append((state, action, reward, next_state, done))
+    def __init__(self, capacity, action_dim):
+        self.values = np.zeros((capacity, action_dim), dtype=np.float32)
+        self.cached_at = np.full(capacity, -1, dtype=np.int64)   # buffer.total_pushed at caching time
 
-    def sample(self, batch_size):
-        batch = random.sample(self.buffer, batch_size)
-        states, actions, rewards, next_states, dones = zip(*batch)
-        return (
-            np.array(states),
-            np.array(actions),
-            np.array(rewards),
-            np.array(next_states),
-            np.array(dones),
-        )
+    def invalidate(self):
+        self.cached_at.fill(-1)
+
+    def lookup(self, target_network, next_states, indices, replay_buffer):
+        pushed = replay_buffer.total_pushed
+        cached_at = self.cached_at[indices]
+
+        # Slot i is rewritten by the first push p >= cached_at with p % capacity == i
+        next_write = cached_at + (indices - cached_at) % replay_buffer.capacity
+        miss = (cached_at < 0) | (next_write < pushed)
+
+        if miss.any():
+            miss_indices = indices[miss]
+            self.values[miss_indices] = target_network(next_states[torch.from_numpy(miss)]).numpy()
+            self.cached_at[miss_indices] = pushed
 
-    def __len__(self):
-        return len(self.buffer)
+        return torch.from_numpy(self.values[indices])
 
 
 class DQNAgent:
@@ -123,6 +145,10 @@ class DQNAgent:
         epsilon_decay=0.995,
         buffer_capacity=10000,
         batch_size=64,
+        prioritized_replay=False,
+        cache_target_q=False,
+        replay_dir=None,
+        compress_states=False,
     ):
         self.state_dim = state_dim
         self.action_dim = action_dim
@@ -139,7 +165,31 @@ class DQNAgent:
         self.target_network.load_state_dict(self.q_network.state_dict())
 
         self.optimizer = optim.Adam(self.q_network.parameters(), lr=lr)
-        self.replay_buffer = ReplayBuffer(buffer_capacity)
+
+        # Uniform or prioritized (sum-tree) experience replay, or uniform
+        # replay with the states memory-mapped under replay_dir
+        self.prioritized_replay = prioritized_replay
+        if prioritized_replay:
+            if replay_dir is not None:
+                raise ValueError("Memory-mapped replay is uniform only (drop --per or --memmap-replay)")
+            self.replay_buffer = PrioritizedReplayBuffer(buffer_capacity)
+        elif replay_dir is not None:
+            self.replay_buffer = MemmapReplayBuffer(buffer_capacity, replay_dir, compress_states)
+        else:
+            self.replay_buffer = ReplayBuffer(buffer_capacity)
+
+        # Optional cache of target network outputs (valid for one target-update period)
+        self.target_cache = TargetQCache(buffer_capacity, action_dim) if cache_target_q else None
+
+        # Compiled forward / update callables, set by compile() (None = eager)
+        self.policy_fn = None
+        self.update_fn = self.optimize
+
+        # Phase timers for the update path (profiling.PhaseTimer when profiling)
+        self.timer = NULL_TIMER
+
+        # Background minibatch sampler, set by start_prefetch()
+        self.sampler = None
 
     def select_action(self, state, training=True):
         """Select action using epsilon-greedy policy"""
@@ -148,60 +198,187 @@ class DQNAgent:
         else:
             with torch.no_grad():
                 state_tensor = torch.FloatTensor(state).unsqueeze(0)
-                q_values = self.q_network(state_tensor)
+                q_values = (self.policy_fn or self.q_network)(state_tensor)
                 return q_values.argmax(1).item()
 
-    def train_step(self):
+    def select_actions(self, states, training=True):
+        """Select epsilon-greedy actions for a batch of states in one forward pass"""
+        with torch.no_grad():
+            q_values = (self.policy_fn or self.q_network)(torch.as_tensor(states, dtype=torch.float32))
+            actions = q_values.argmax(1).numpy()
+
+        if training:
+            explore = np.random.random_sample(len(actions)) < self.epsilon
+            actions[explore] = np.random.randint(self.action_dim, size=int(explore.sum()))
+        return actions
+
+    def compile(self, mode=None):
+        """
+        Switch action selection and the full update (forward, loss, backward,
+        optimizer step) to compiled code, falling back to TorchScript / eager
+
+        q_network and target_network stay the original modules, so save()
+        and load() read and write the same checkpoint keys as before.
+        """
+        self.policy_fn = compile_module(self.q_network, mode)
+        self.update_fn = compile_function(self.optimize, mode)
+        return self
+
+    def start_prefetch(self, depth=2):
+        """
+        Assemble minibatches on a background thread (PrefetchSampler) while
+        the current update runs; batches lag the buffer by at most depth
+        """
+        if self.target_cache is not None:
+            # Cached Q_target(s') is keyed by the slot's contents at lookup time
+            raise ValueError("Replay prefetching cannot be combined with the target-Q cache")
+        self.stop_prefetch()
+        self.sampler = PrefetchSampler(self.replay_buffer, self.batch_size, depth)
+        return self
+
+    def stop_prefetch(self):
+        if self.sampler is not None:
+            self.sampler.close()
+            self.sampler = None
+
+    def train_step(self, batch=None):
         """Perform one training step"""
-        if len(self.replay_buffer) < self.batch_size:
-            return None
+        if batch is None:
+            if len(self.replay_buffer) < self.batch_size:
+                return None
+
+            # Sample from replay buffer (already batched tensors)
+            batch = self.sample_batch()
+        states, actions, rewards, next_states, dones, weights, indices = batch
+
+        if self.update_fn == self.optimize:
+            # Eager: time forward + loss, backward and the optimizer step separately
+            with self.timer.phase("forward_loss"):
+                loss, td_errors = self.td_loss(states, actions, rewards, next_states, dones, weights, indices)
+            with self.timer.phase("backward"):
+                self.optimizer.zero_grad()
+                loss.backward()
+            with self.timer.phase("optimizer_step"):
+                self.optimizer.step()
+            loss, td_errors = loss.detach(), td_errors.detach()
+        else:
+            # Compiled: loss, backward and optimizer step run as one fused call
+            with self.timer.phase("update"):
+                loss, td_errors = self.update_fn(states, actions, rewards, next_states, dones, weights, indices)
 
-        # Sample from replay buffer
-        states, actions, rewards, next_states, dones = self.replay_buffer.sample(
-            self.batch_size
-        )
+        # Refresh replay priorities with the new TD errors
+        if self.prioritized_replay:
+            with self.timer.phase("priority_update"):
+                self.replay_buffer.update_priorities(indices, td_errors.numpy())
 
-        # Convert to tensors
-        states = torch.FloatTensor(states)
-        actions = torch.LongTensor(actions)
-        rewards = torch.FloatTensor(rewards)
-        next_states = torch.FloatTensor(next_states)
-        dones = torch.FloatTensor(dones)
+        return loss.item()
 
+    def compute_q_values(self, states, actions, next_states, indices=None):
+        """Q(s, a) from the online network and max_a' Q_target(s', a')"""
         # Compute current Q values
-        current_q_values = self.q_network(states).gather(1, actions.unsqueeze(1))
+        current_q_values = self.q_network(states).gather(1, actions.unsqueeze(1)).squeeze(1)
 
-        # Compute target Q values
+        # Compute next-state values with the target network
         with torch.no_grad():
-            next_q_values = self.target_network(next_states).max(1)[0]
-            target_q_values = rewards + (1 - dones) * self.gamma * next_q_values
+            next_q_values = self.target_q_values(next_states, indices).max(1)[0]
+
+        return current_q_values, next_q_values
+
+    def train_steps(self, num_updates):
+        """
+        Run num_updates training steps back to back
+
+        With uniform replay all num_updates x batch_size transitions are
+        drawn in one vectorized sample and then split into minibatches, so
+        sampling is entered once. Prioritized replay samples each minibatch
+        on its own: stratified sampling spreads one draw over the whole
+        sum tree, so slices of a large draw would each cover one contiguous
+        range of slots, and beta / importance weights are per minibatch.
+        Returns the list of losses.
+        """
+        if num_updates <= 0 or len(self.replay_buffer) < self.batch_size:
+            return []
+        if self.sampler is not None or self.prioritized_replay:
+            return [self.train_step(self.sample_batch()) for _ in range(num_updates)]
+
+        batch = self.sample_batch(num_updates * self.batch_size)
+        losses = []
+        for k in range(num_updates):
+            part = slice(k * self.batch_size, (k + 1) * self.batch_size)
+            minibatch = tuple(None if x is None else x[part] for x in batch)
+            losses.append(self.train_step(minibatch))
+        return losses
+
+    def sample_batch(self, batch_size=None):
+        """Sample a minibatch plus importance-sampling weights and buffer indices"""
+        if self.sampler is not None and batch_size in (None, self.batch_size):
+            with self.timer.phase("replay_wait"):
+                return self.sampler.get()
+        with self.timer.phase("replay_sample"):
+            indices = self.replay_buffer.sample_indices(batch_size or self.batch_size)
+            if self.prioritized_replay:
+                weights = self.replay_buffer.importance_weights(indices)
+            else:
+                weights = None
+        # Column gather + conversion to torch tensors
+        with self.timer.phase("replay_gather"):
+            states, actions, rewards, next_states, dones = self.replay_buffer.get_batch(indices)
+        return states, actions, rewards, next_states, dones, weights, indices
+
+    def td_loss(self, states, actions, rewards, next_states, dones, weights=None, indices=None):
+        """(Importance-weighted) TD loss and the TD errors, before backward"""
+        current_q_values, next_q_values = self.compute_q_values(states, actions, next_states, indices)
+
+        # Compute target Q values
+        target_q_values = rewards + (1 - dones) * self.gamma * next_q_values
+        td_errors = target_q_values - current_q_values
 
         # Compute loss
-        loss = nn.MSELoss()(current_q_values.squeeze(), target_q_values)
+        if weights is None:
+            loss = nn.MSELoss()(current_q_values, target_q_values)
+        else:
+            loss = (weights * td_errors.pow(2)).mean()
+        return loss, td_errors
+
+    def optimize(self, states, actions, rewards, next_states, dones, weights=None, indices=None):
+        """Minimize the (importance-weighted) TD loss; returns (loss, TD errors)"""
+        loss, td_errors = self.td_loss(states, actions, rewards, next_states, dones, weights, indices)
 
         # Optimize
         self.optimizer.zero_grad()
         loss.backward()
         self.optimizer.step()
 
-        return loss.item()
+        return loss.detach(), td_errors.detach()
+
+    def target_q_values(self, next_states, indices):
+        """Target network Q(s', .), served from the per-slot cache when enabled"""
+        if self.target_cache is None:
+            return self.target_network(next_states)
+        return self.target_cache.lookup(self.target_network, next_states, indices, self.replay_buffer)
 
     def update_target_network(self):
         """Update target network"""
         self.target_network.load_state_dict(self.q_network.state_dict())
+        if self.target_cache is not None:
+            self.target_cache.invalidate()
 
     def decay_epsilon(self):
         """Decay epsilon"""
         self.epsilon = max(self.epsilon_end, self.epsilon * self.epsilon_decay)
 
-    def save(self, filepath):
-        """Save model"""
-        torch.save({
+    def checkpoint_state(self):
+        """Checkpoint dict written by save() (live references, snapshot before writing asynchronously)"""
+        return {
             'q_network': self.q_network.state_dict(),
             'target_network': self.target_network.state_dict(),
             'optimizer': self.optimizer.state_dict(),
             'epsilon': self.epsilon,
-        }, filepath)
+        }
+
+    def save(self, filepath):
+        """Save model"""
+        atomic_save(self.checkpoint_state(), filepath)
 
     def load(self, filepath):
         """Load model"""
@@ -233,6 +410,10 @@ class DoubleDQNAgent(DQNAgent):
         epsilon_decay=0.995,
         buffer_capacity=10000,
         batch_size=64,
+        prioritized_replay=False,
+        cache_target_q=False,
+        replay_dir=None,
+        compress_states=False,
     ):
         super().__init__(
             state_dim,
@@ -244,49 +425,31 @@ class DoubleDQNAgent(DQNAgent):
             epsilon_decay,
             buffer_capacity,
             batch_size,
+            prioritized_replay,
+            cache_target_q,
+            replay_dir,
+            compress_states,
         )
         self.algorithm = "Double DQN"
 
-    def train_step(self):
-        """Perform one training step using Double DQN algorithm"""
-        if len(self.replay_buffer) < self.batch_size:
-            return None
-
-        # Sample from replay buffer
-        states, actions, rewards, next_states, dones = self.replay_buffer.sample(
-            self.batch_size
-        )
-
-        # Convert to tensors
-        states = torch.FloatTensor(states)
-        actions = torch.LongTensor(actions)
-        rewards = torch.FloatTensor(rewards)
-        next_states = torch.FloatTensor(next_states)
-        dones = torch.FloatTensor(dones)
+    def compute_q_values(self, states, actions, next_states, indices=None):
+        """Q values for the Double DQN target (online selects, target evaluates)"""
+        # One online forward over [states; next_states] instead of two
+        batch_size = states.shape[0]
+        online_q_values = self.q_network(torch.cat([states, next_states]))
 
         # Compute current Q values
-        current_q_values = self.q_network(states).gather(1, actions.unsqueeze(1))
+        current_q_values = online_q_values[:batch_size].gather(1, actions.unsqueeze(1)).squeeze(1)
 
         # Double DQN: Use online network to select actions, target network to evaluate
         with torch.no_grad():
-            # Select best actions using online network
-            next_actions = self.q_network(next_states).argmax(1, keepdim=True)
+            # Select best actions using online network (next-state half, detached)
+            next_actions = online_q_values[batch_size:].detach().argmax(1, keepdim=True)
 
             # Evaluate selected actions using target network
-            next_q_values = self.target_network(next_states).gather(1, next_actions).squeeze(1)
+            next_q_values = self.target_q_values(next_states, indices).gather(1, next_actions).squeeze(1)
 
-            # Compute target Q values
-            target_q_values = rewards + (1 - dones) * self.gamma * next_q_values
-
-        # Compute loss
-        loss = nn.MSELoss()(current_q_values.squeeze(), target_q_values)
-
-        # Optimize
-        self.optimizer.zero_grad()
-        loss.backward()
-        self.optimizer.step()
-
-        return loss.item()
+        return current_q_values, next_q_values
 
 
 class DuelingDQNAgent(DQNAgent):
@@ -315,6 +478,10 @@ class DuelingDQNAgent(DQNAgent):
         epsilon_decay=0.995,
         buffer_capacity=10000,
         batch_size=64,
+        prioritized_replay=False,
+        cache_target_q=False,
+        replay_dir=None,
+        compress_states=False,
     ):
         # Initialize parent (but we'll replace networks)
         super().__init__(
@@ -327,6 +494,10 @@ class DuelingDQNAgent(DQNAgent):
             epsilon_decay,
             buffer_capacity,
             batch_size,
+            prioritized_replay,
+            cache_target_q,
+            replay_dir,
+            compress_states,
         )
 
         # Replace standard DQN networks with Dueling DQN networks
@@ -366,6 +537,10 @@ class DuelingDoubleDQNAgent(DQNAgent):
         epsilon_decay=0.995,
         buffer_capacity=10000,
         batch_size=64,
+        prioritized_replay=False,
+        cache_target_q=False,
+        replay_dir=None,
+        compress_states=False,
     ):
         # Initialize parent (but we'll replace networks)
         super().__init__(
@@ -378,6 +553,10 @@ class DuelingDoubleDQNAgent(DQNAgent):
             epsilon_decay,
             buffer_capacity,
             batch_size,
+            prioritized_replay,
+            cache_target_q,
+            replay_dir,
+            compress_states,
         )
 
         # Replace standard DQN networks with Dueling DQN networks
@@ -390,46 +569,24 @@ class DuelingDoubleDQNAgent(DQNAgent):
 
         self.algorithm = "Dueling Double DQN"
 
-    def train_step(self):
-        """Perform one training step using Dueling Double DQN algorithm"""
-        if len(self.replay_buffer) < self.batch_size:
-            return None
-
-        # Sample from replay buffer
-        states, actions, rewards, next_states, dones = self.replay_buffer.sample(
-            self.batch_size
-        )
-
-        # Convert to tensors
-        states = torch.FloatTensor(states)
-        actions = torch.LongTensor(actions)
-        rewards = torch.FloatTensor(rewards)
-        next_states = torch.FloatTensor(next_states)
-        dones = torch.FloatTensor(dones)
+    def compute_q_values(self, states, actions, next_states, indices=None):
+        """Q values for the Dueling Double DQN target"""
+        # One online forward over [states; next_states] instead of two
+        batch_size = states.shape[0]
+        online_q_values = self.q_network(torch.cat([states, next_states]))
 
         # Compute current Q values
-        current_q_values = self.q_network(states).gather(1, actions.unsqueeze(1))
+        current_q_values = online_q_values[:batch_size].gather(1, actions.unsqueeze(1)).squeeze(1)
 
         # Double DQN with Dueling architecture
         with torch.no_grad():
-            # Select best actions using online network (Dueling)
-            next_actions = self.q_network(next_states).argmax(1, keepdim=True)
+            # Select best actions using online network (Dueling, next-state half, detached)
+            next_actions = online_q_values[batch_size:].detach().argmax(1, keepdim=True)
 
             # Evaluate selected actions using target network (Dueling)
-            next_q_values = self.target_network(next_states).gather(1, next_actions).squeeze(1)
-
-            # Compute target Q values
-            target_q_values = rewards + (1 - dones) * self.gamma * next_q_values
-
-        # Compute loss
-        loss = nn.MSELoss()(current_q_values.squeeze(), target_q_values)
-
-        # Optimize
-        self.optimizer.zero_grad()
-        loss.backward()
-        self.optimizer.step()
+            next_q_values = self.target_q_values(next_states, indices).gather(1, next_actions).squeeze(1)
 
-        return loss.item()
+        return current_q_values, next_q_values
 
 
 def record_episode_video(env, agent, episode_num, output_dir="trained_videos"):
@@ -473,6 +630,37 @@ def record_episode_video(env, agent, episode_num, output_dir="trained_videos"):
     return total_reward, steps, video_filename
 
 
+def create_agent(algorithm, state_dim, action_dim, **kwargs):
+    """Create the agent matching an algorithm name (dqn, ddqn, dueling, d3qn, ...)"""
+    algo = algorithm.lower()
+    if algo in ["double_dqn", "ddqn"]:
+        return DoubleDQNAgent(state_dim, action_dim, **kwargs)
+    elif algo in ["dueling_dqn", "dueling", "duel"]:
+        return DuelingDQNAgent(state_dim, action_dim, **kwargs)
+    elif algo in ["dueling_double_dqn", "dueling_ddqn", "d3qn"]:
+        return DuelingDoubleDQNAgent(state_dim, action_dim, **kwargs)
+    else:
+        return DQNAgent(state_dim, action_dim, **kwargs)
+
+
+def make_vector_env(num_envs, max_steps=1000, asynchronous=False):
+    """Create N LunarLander-v3 copies behind a Gymnasium vector env"""
+    env_fn = partial(gym.make, "LunarLander-v3", max_episode_steps=max_steps)
+    if asynchronous:
+        return gym.vector.AsyncVectorEnv([env_fn] * num_envs)
+    return gym.vector.SyncVectorEnv([env_fn] * num_envs)
+
+
+def periodic_checkpoints(directory):
+    """models/checkpoint_ep_<N>.pt files on disk, oldest episode first"""
+    episodes = {}
+    for path in glob.glob(os.path.join(directory, "checkpoint_ep_*.pt")):
+        episode = os.path.basename(path)[len("checkpoint_ep_"):-len(".pt")]
+        if episode.isdigit():
+            episodes[path] = int(episode)
+    return sorted(episodes, key=episodes.get)
+
+
 def train_dqn(
     num_episodes=500,
     max_steps=1000,
@@ -481,6 +669,28 @@ def train_dqn(
     test_freq=100,
     algorithm="dqn",
     show_test_gui=False,
+    prioritized_replay=False,
+    num_envs=1,
+    async_envs=False,
+    eval_episodes=10,
+    updates_per_step=None,
+    learning_starts=0,
+    train_every=1,
+    batch_size=64,
+    compile=False,
+    log_step_every=100,
+    live_port=None,
+    profile=False,
+    cprofile_window=None,
+    torch_profile_window=None,
+    keep_checkpoints=5,
+    state_dir="models/training_state",
+    resume=False,
+    buffer_capacity=10000,
+    replay_dir=None,
+    compress_states=False,
+    record_dataset=None,
+    prefetch=0,
 ):
     """Train DQN or Double DQN agent on official Gymnasium LunarLander-v3"""
     print("="*60)
@@ -488,57 +698,130 @@ def train_dqn(
     print("="*60)
 
     # Create official environment (no rendering during training)
-    env = gym.make("LunarLander-v3")
+    if num_envs > 1:
+        env = make_vector_env(num_envs, max_steps, async_envs)
+        state_dim = env.single_observation_space.shape[0]
+        action_dim = int(env.single_action_space.n)
+        print(f"Using {num_envs} {'async' if async_envs else 'sync'} vectorized environments")
+    else:
+        env = gym.make("LunarLander-v3")
+        state_dim = env.observation_space.shape[0]
+        action_dim = int(env.action_space.n)
 
     # Create agent
-    state_dim = env.observation_space.shape[0]
-    action_dim = env.action_space.n
-
-    algo = algorithm.lower()
-    if algo in ["double_dqn", "ddqn"]:
-        agent = DoubleDQNAgent(state_dim, action_dim)
-        print("Using Double DQN algorithm")
-    elif algo in ["dueling_dqn", "dueling", "duel"]:
-        agent = DuelingDQNAgent(state_dim, action_dim)
-        print("Using Dueling DQN algorithm")
-    elif algo in ["dueling_double_dqn", "dueling_ddqn", "d3qn"]:
-        agent = DuelingDoubleDQNAgent(state_dim, action_dim)
-        print("Using Dueling Double DQN algorithm (D3QN)")
-    else:
-        agent = DQNAgent(state_dim, action_dim)
-        print("Using vanilla DQN algorithm")
+    agent = create_agent(
+        algorithm, state_dim, action_dim,
+        batch_size=batch_size,
+        prioritized_replay=prioritized_replay,
+        buffer_capacity=buffer_capacity,
+        replay_dir=replay_dir,
+        compress_states=compress_states,
+    )
+    print(f"Using {agent.algorithm} algorithm")
+    if prioritized_replay:
+        print("Using prioritized experience replay (sum-tree)")
+    if replay_dir is not None:
+        print(f"Using memory-mapped replay in {replay_dir} "
+              f"({'float16' if compress_states else 'float32'} states)")
+    if compile:
+        agent.compile()
+        print("Using compiled action selection and updates (torch.compile)")
+
+    # Gradient updates per env transition (default: one per env.step call)
+    if updates_per_step is None:
+        updates_per_step = 1.0 / num_envs
+    scheduler = UpdateScheduler(updates_per_step, learning_starts, train_every)
 
     # Create directories
     os.makedirs("models", exist_ok=True)
     os.makedirs("trained_videos", exist_ok=True)
 
+    # Checkpoints are snapshotted in memory and written by a background thread
+    # (superseded best-model writes coalesce; only the newest keep_checkpoints
+    # periodic checkpoints stay on disk; on resume this counts the ones the
+    # interrupted run already wrote, a fresh run leaves older files alone)
+    checkpoints = CheckpointWriter(keep_last=keep_checkpoints,
+                                   existing={"periodic": periodic_checkpoints("models")} if resume else None)
+
+    # Resumable state (agent, replay buffer, RNGs, counters) saved every save_freq episodes
+    counters = None
+    if resume:
+        if not has_training_state(state_dir):
+            raise FileNotFoundError(f"No training state to resume in {state_dir}")
+        counters = load_training_state(state_dir, agent, env if num_envs == 1 else None)
+        if counters["algorithm"] != agent.algorithm:
+            raise ValueError(f"{state_dir} holds a {counters['algorithm']} run, not {agent.algorithm}")
+        scheduler.calls, scheduler.credit = counters["scheduler"]
+        print(f"Resuming from {state_dir} after episode {counters['episode']} "
+              f"({counters['total_steps']} steps, {len(agent.replay_buffer)} transitions in replay)")
+
+    # Minibatches for the next updates are gathered on a background thread
+    # (started after a resume has refilled the replay buffer)
+    if prefetch:
+        agent.start_prefetch(prefetch)
+        print(f"Prefetching up to {prefetch} minibatches in the background")
+
+    # Append-only columnar training log (training_logs/<algorithm>_log/), flushed as it goes
+    logger = ColumnarTrainingLogger(agent.algorithm, step_every=log_step_every,
+                                    resume=counters["logger"] if counters else None)
+
+    # Every stored transition is also recorded to an offline dataset (chunked .npz);
+    # a resumed run continues the dataset from the rows saved with the training state
+    recorder = None
+    if record_dataset is not None:
+        dataset_counts = counters.get("dataset") if counters else None
+        recorder = DatasetWriter(record_dataset, metadata={"algorithm": agent.algorithm, "num_envs": num_envs,
+                                                             "action_dim": action_dim},
+                                 resume=dataset_counts)
+        print(f"Recording transitions to {record_dataset}"
+              + (f" (continuing after {dataset_counts['rows']} transitions)" if dataset_counts else ""))
+
+    # Fire-and-forget UDP metrics for live_monitor.py (dropped when no viewer listens)
+    publisher = None
+    if live_port is not None:
+        publisher = MetricsPublisher(port=live_port)
+        print(f"Publishing live metrics to udp://127.0.0.1:{live_port} (python live_monitor.py --port={live_port})")
+
+    # Per-phase timing report written next to the log (training_logs/<algorithm>_profile.txt)
+    profiler = None
+    timer = NULL_TIMER
+    if profile or cprofile_window or torch_profile_window:
+        profiler = TrainingProfiler(logger.algorithm, logger.log_dir, cprofile_window, torch_profile_window)
+        timer = agent.timer = profiler.timer
+
     # Training loop
     episode_rewards = []
     best_reward = -float('inf')
-
-    for episode in range(1, num_episodes + 1):
-        obs, info = env.reset()
-        episode_reward = 0
-        episode_loss = []
-
-        for step in range(max_steps):
-            # Select and perform action
-            action = agent.select_action(obs)
-            next_obs, reward, terminated, truncated, info = env.step(action)
-
-            # Store transition
-            agent.replay_buffer.push(obs, action, reward, next_obs, terminated or truncated)
-
-            # Train
-            loss = agent.train_step()
-            if loss is not None:
-                episode_loss.append(loss)
-
-            episode_reward += reward
-            obs = next_obs
-
-            if terminated or truncated:
-                break
+    total_steps = 0
+    total_updates = 0
+    start_episode = 1
+    if counters:
+        episode_rewards = counters["episode_rewards"]
+        best_reward = counters["best_reward"]
+        total_steps = counters["total_steps"]
+        total_updates = counters["total_updates"]
+        start_episode = counters["episode"] + 1
+
+    def save_state(episode):
+        """Snapshot everything needed to continue after this episode"""
+        logger.flush()
+        if recorder is not None:
+            recorder.flush()
+        save_training_state(state_dir, agent, {
+            "algorithm": agent.algorithm,
+            "episode": episode,
+            "total_steps": total_steps,
+            "total_updates": total_updates,
+            "best_reward": best_reward,
+            "episode_rewards": [float(r) for r in episode_rewards],
+            "scheduler": (scheduler.calls, scheduler.credit),
+            "logger": logger.row_counts(),
+            "dataset": recorder.counts() if recorder is not None else None,
+        }, env if num_envs == 1 else None)
+
+    def end_episode(episode, episode_reward, avg_loss):
+        """Per-episode bookkeeping shared by the single and vectorized loops"""
+        nonlocal best_reward
 
         # Update target network
         if episode % target_update_freq == 0:
@@ -549,7 +832,6 @@ def train_dqn(
 
         # Record metrics
         episode_rewards.append(episode_reward)
-        avg_loss = np.mean(episode_loss) if episode_loss else 0
 
         # Print progress
         if episode % 10 == 0:
@@ -563,40 +845,184 @@ def train_dqn(
         # Save best model
         if episode_reward > best_reward:
             best_reward = episode_reward
-            agent.save("models/best_model.pt")
+            with timer.phase("save_best"):
+                checkpoints.save(agent, "models/best_model.pt")
             print(f"New best model saved! Reward: {best_reward:.2f}")
 
+        with timer.phase("logging"):
+            logger.log_episode(episode, episode_reward, np.mean(episode_rewards[-10:]),
+                               best_reward, avg_loss, agent.epsilon)
+            if publisher is not None:
+                publisher.publish_episode(episode, episode_reward, np.mean(episode_rewards[-10:]),
+                                          agent.epsilon, avg_loss)
+
         # Save checkpoint
         if episode % save_freq == 0:
-            agent.save(f"models/checkpoint_ep_{episode}.pt")
+            with timer.phase("checkpoint"):
+                checkpoints.save(agent, f"models/checkpoint_ep_{episode}.pt", group="periodic")
 
         # Test and record video
         if episode % test_freq == 0:
             print(f"\nTesting at episode {episode}...")
+            with timer.phase("evaluation"):
+                avg_return, success_rate, avg_length = evaluate_policy(
+                    agent.q_network, eval_episodes, seeds=list(range(eval_episodes))
+                )
+            print(f"Eval ({eval_episodes} episodes) - Avg Reward: {avg_return:.2f}, "
+                  f"Success: {success_rate:.1f}%, Avg Steps: {avg_length:.1f}")
+            logger.log_test(episode, avg_return)
             test_render_mode = "human" if show_test_gui else "rgb_array"
-            test_env = gym.make("LunarLander-v3", render_mode=test_render_mode)
-            reward, steps, video_path = record_episode_video(test_env, agent, episode)
-            test_env.close()
+            with timer.phase("video"):
+                test_env = gym.make("LunarLander-v3", render_mode=test_render_mode)
+                reward, steps, video_path = record_episode_video(test_env, agent, episode)
+                test_env.close()
             print(f"Test - Reward: {reward:.2f}, Steps: {steps}")
             print(f"Video saved: {video_path}\n")
 
+        if state_dir is not None and episode % save_freq == 0:
+            with timer.phase("training_state"):
+                save_state(episode)
+
+        if profiler is not None:
+            profiler.on_episode_end(episode)
+
+    def log_step(losses):
+        """Per-env-step metrics (every log_step_every-th call is written)"""
+        nonlocal total_updates
+        total_updates += len(losses)
+        with timer.phase("logging"):
+            if publisher is not None:
+                publisher.publish_step(total_steps, total_updates,
+                                       losses[-1] if losses else None, agent.epsilon)
+            metrics = {"epsilon": agent.epsilon, "buffer_size": len(agent.replay_buffer)}
+            if losses:
+                metrics["loss"] = np.mean(losses)
+            logger.log_step(total_steps, **metrics)
+
+    if num_envs > 1:
+        # Vectorized collection: one batched forward and N transitions per step.
+        # Gymnasium autoresets a finished sub-env on the *next* step(), so the
+        # step right after a done returns the reset observation and must not
+        # be stored as a transition.
+        obs, info = env.reset()
+        running_rewards = np.zeros(num_envs)
+        autoreset = np.zeros(num_envs, dtype=bool)
+        loss_sum, loss_count = 0.0, 0
+        loss_start = np.zeros((num_envs, 2))
+        episode = start_episode - 1
+
+        while episode < num_episodes:
+            with timer.phase("select_action"):
+                actions = agent.select_actions(obs)
+            with timer.phase("env_step"):
+                next_obs, rewards, terminated, truncated, info = env.step(actions)
+            dones = terminated | truncated
+
+            # Store transitions of sub-envs that actually stepped
+            live = ~autoreset
+            with timer.phase("replay_push"):
+                agent.replay_buffer.push_batch(
+                    obs[live], actions[live], rewards[live], next_obs[live], dones[live]
+                )
+                if recorder is not None:
+                    recorder.add_batch(obs[live], actions[live], rewards[live], next_obs[live], dones[live])
+
+            # Train
+            num_updates = scheduler.step(len(agent.replay_buffer), int(live.sum()))
+            with timer.phase("train"):
+                losses = agent.train_steps(num_updates)
+            for loss in losses:
+                loss_sum += loss
+                loss_count += 1
+
+            total_steps += int(live.sum())
+            log_step(losses)
+
+            running_rewards += rewards
+            for i in np.flatnonzero(dones):
+                episode += 1
+                n_losses = loss_count - loss_start[i, 1]
+                avg_loss = (loss_sum - loss_start[i, 0]) / n_losses if n_losses else 0
+                end_episode(episode, running_rewards[i], avg_loss)
+                running_rewards[i] = 0.0
+                loss_start[i] = (loss_sum, loss_count)
+                if episode >= num_episodes:
+                    break
+
+            autoreset = dones
+            obs = next_obs
+    else:
+        for episode in range(start_episode, num_episodes + 1):
+            obs, info = env.reset()
+            episode_reward = 0
+            episode_loss = []
+
+            for step in range(max_steps):
+                # Select and perform action
+                with timer.phase("select_action"):
+                    action = agent.select_action(obs)
+                with timer.phase("env_step"):
+                    next_obs, reward, terminated, truncated, info = env.step(action)
+
+                # Store transition
+                with timer.phase("replay_push"):
+                    agent.replay_buffer.push(obs, action, reward, next_obs, terminated or truncated)
+                    if recorder is not None:
+                        recorder.add(obs, action, reward, next_obs, terminated or truncated)
+
+                # Train
+                num_updates = scheduler.step(len(agent.replay_buffer))
+                with timer.phase("train"):
+                    losses = agent.train_steps(num_updates)
+                episode_loss.extend(losses)
+
+                total_steps += 1
+                log_step(losses)
+
+                episode_reward += reward
+                obs = next_obs
+
+                if terminated or truncated:
+                    break
+
+            avg_loss = np.mean(episode_loss) if episode_loss else 0
+            end_episode(episode, episode_reward, avg_loss)
+
     env.close()
+    if agent.sampler is not None:
+        print(f"Prefetched minibatches: {agent.sampler.batches} "
+              f"(updates waited for a batch {agent.sampler.waits} times)")
+        agent.stop_prefetch()
+    if recorder is not None:
+        print(f"Recorded {recorder.close()} transitions to {record_dataset}")
+    if publisher is not None:
+        print(f"Live monitor overhead: {publisher.overhead() * 100:.3f}% of training time "
+              f"({publisher.sent} messages sent, {publisher.dropped} dropped)")
+        publisher.close()
+    if profiler is not None:
+        print(f"Profile report: {profiler.write_report()}")
 
     # Final test
     print("\n" + "="*60)
     print("Training completed! Running final test...")
     print("="*60)
 
+    checkpoints.close()
+    print(f"Checkpoints written: {checkpoints.writes} ({checkpoints.coalesced} superseded best-model saves skipped)")
     agent.load("models/best_model.pt")
     # Final test always shows GUI to see the trained agent
     test_env = gym.make("LunarLander-v3", render_mode="human")
 
+    final_rewards = []
     for i in range(3):
         reward, steps, video_path = record_episode_video(test_env, agent, f"final_{i}")
+        final_rewards.append(reward)
         print(f"Final Test {i+1} - Reward: {reward:.2f}, Steps: {steps}")
         print(f"Video: {video_path}")
 
     test_env.close()
+    logger.log_final_tests(final_rewards)
+    logger.save()
 
     print("\n" + "="*60)
     print(f"Best reward achieved: {best_reward:.2f}")
@@ -605,6 +1031,98 @@ def train_dqn(
     print("="*60)
 
 
+def train_offline(
+    dataset_dir,
+    algorithm="ddqn",
+    epochs=1,
+    updates_per_transition=1.0,
+    batch_size=64,
+    buffer_capacity=1_000_000,
+    prioritized_replay=False,
+    target_update_every=1000,
+    eval_episodes=10,
+    compile=False,
+    max_updates_per_call=64,
+    prefetch=0,
+):
+    """
+    Train an agent purely from a recorded dataset (no environment stepping)
+
+    Chunks are streamed through the agent's replay buffer, which acts as a
+    shuffle window of buffer_capacity transitions, while the next chunks
+    are decompressed in the background. updates_per_transition gradient
+    updates are owed per streamed transition (UpdateScheduler); the target
+    network is synced every target_update_every updates. The environment is
+    only used for the greedy evaluation after each epoch.
+    """
+    dataset = OfflineDataset(dataset_dir)
+    print("="*60)
+    print(f"Offline training {algorithm.upper()} on {dataset_dir} "
+          f"({len(dataset)} transitions, {len(dataset.chunks)} chunks, {epochs} epoch(s))")
+    print("="*60)
+
+    agent = create_agent(
+        algorithm, dataset.state_shape[0], dataset.manifest["metadata"].get("action_dim", 4),
+        batch_size=batch_size,
+        buffer_capacity=min(buffer_capacity, len(dataset)),
+        prioritized_replay=prioritized_replay,
+    )
+    if compile:
+        agent.compile()
+    if prefetch:
+        agent.start_prefetch(prefetch)
+    scheduler = UpdateScheduler(updates_per_transition, learning_starts=batch_size)
+
+    updates, last_sync = 0, 0
+    losses = []
+    wait_time, eval_time = 0.0, 0.0
+    start = time.perf_counter()
+    chunks_per_epoch = len(dataset.chunks)
+    chunk_start = time.perf_counter()
+    for i, chunk in enumerate(dataset.iter_chunks(epochs)):
+        wait_time += time.perf_counter() - chunk_start
+        agent.replay_buffer.push_batch(chunk["states"], chunk["actions"], chunk["rewards"],
+                                       chunk["next_states"], chunk["dones"])
+
+        owed = scheduler.step(len(agent.replay_buffer), len(chunk["actions"]))
+        while owed > 0:
+            n = min(owed, max_updates_per_call)
+            losses.extend(agent.train_steps(n))
+            updates += n
+            owed -= n
+            if updates - last_sync >= target_update_every:
+                agent.update_target_network()
+                last_sync = updates
+
+        if (i + 1) % chunks_per_epoch == 0:
+            epoch = (i + 1) // chunks_per_epoch
+            eval_start = time.perf_counter()
+            elapsed = eval_start - start - eval_time
+            avg_return, success_rate, _ = evaluate_policy(
+                agent.q_network, eval_episodes, seeds=list(range(eval_episodes))
+            )
+            eval_time += time.perf_counter() - eval_start
+            print(f"Epoch {epoch}/{epochs} | Updates: {updates} ({updates / elapsed:.1f}/s) | "
+                  f"Loss: {np.mean(losses[-1000:]) if losses else 0:.4f} | "
+                  f"Eval Avg Reward: {avg_return:.2f} | Success: {success_rate:.1f}%")
+        chunk_start = time.perf_counter()
+
+    # Learner time, excluding the per-epoch evaluations
+    elapsed = time.perf_counter() - start - eval_time
+    agent.stop_prefetch()
+    os.makedirs("models", exist_ok=True)
+    model_path = f"models/offline_{algorithm}.pt"
+    agent.save(model_path)
+
+    print("\n" + "="*60)
+    print(f"Updates: {updates} in {elapsed:.1f}s ({updates / elapsed:.1f} updates/s, "
+          f"{wait_time:.2f}s waiting for chunks)")
+    print(f"Model saved: {model_path}")
+    print("="*60)
+    return agent, {"updates": updates, "updates_per_sec": updates / elapsed,
+                   "chunk_wait_s": wait_time, "losses": losses}
+
+
 if __name__ == "__main__":
     import sys
 
@@ -612,6 +1130,28 @@ if __name__ == "__main__":
     num_episodes = 500
     algorithm = "ddqn"  # Default to Double DQN (better performance)
     show_test_gui = False
+    prioritized_replay = False
+    num_envs = 1
+    async_envs = False
+    updates_per_step = None
+    learning_starts = 0
+    train_every = 1
+    batch_size = 64
+    compile = False
+    live_port = None
+    profile = False
+    cprofile_window = None
+    torch_profile_window = None
+    keep_checkpoints = 5
+    state_dir = "models/training_state"
+    resume = False
+    buffer_capacity = 10000
+    replay_dir = None
+    compress_states = False
+    record_dataset = None
+    prefetch = 0
+    offline_dataset = None
+    epochs = 1
 
     # Parse command line arguments
     args = sys.argv[1:]
@@ -622,15 +1162,90 @@ if __name__ == "__main__":
             algorithm = arg_lower
         elif arg_lower in ["--show-gui", "--gui"]:
             show_test_gui = True
+        elif arg_lower in ["--per", "--prioritized"]:
+            prioritized_replay = True
+        elif arg_lower.startswith("--envs="):
+            num_envs = int(arg_lower.split("=", 1)[1])
+        elif arg_lower == "--async":
+            async_envs = True
+        elif arg_lower.startswith("--replay-ratio="):
+            updates_per_step = float(arg_lower.split("=", 1)[1])
+        elif arg_lower.startswith("--learning-starts="):
+            learning_starts = int(arg_lower.split("=", 1)[1])
+        elif arg_lower.startswith("--train-every="):
+            train_every = int(arg_lower.split("=", 1)[1])
+        elif arg_lower.startswith("--batch-size="):
+            batch_size = int(arg_lower.split("=", 1)[1])
+        elif arg_lower == "--compile":
+            compile = True
+        elif arg_lower == "--live":
+            live_port = DEFAULT_PORT
+        elif arg_lower.startswith("--live="):
+            live_port = int(arg_lower.split("=", 1)[1])
+        elif arg_lower.startswith("--buffer-size="):
+            buffer_capacity = int(arg_lower.split("=", 1)[1])
+        elif arg.startswith("--memmap-replay="):
+            replay_dir = arg.split("=", 1)[1]
+        elif arg_lower == "--fp16-states":
+            compress_states = True
+        elif arg_lower == "--prefetch":
+            prefetch = 2
+        elif arg_lower.startswith("--prefetch="):
+            prefetch = int(arg_lower.split("=", 1)[1])
+        elif arg.startswith("--record-dataset="):
+            record_dataset = arg.split("=", 1)[1]
+        elif arg.startswith("--offline="):
+            offline_dataset = arg.split("=", 1)[1]
+        elif arg_lower.startswith("--epochs="):
+            epochs = int(arg_lower.split("=", 1)[1])
+        elif arg_lower == "--resume":
+            resume = True
+        elif arg.startswith("--state-dir="):
+            state_dir = arg.split("=", 1)[1]
+        elif arg_lower.startswith("--keep-checkpoints="):
+            keep_checkpoints = int(arg_lower.split("=", 1)[1]) or None
+        elif arg_lower == "--profile":
+            profile = True
+        elif arg_lower.startswith("--cprofile="):
+            cprofile_window = parse_window(arg_lower.split("=", 1)[1])
+        elif arg_lower.startswith("--torch-profile="):
+            torch_profile_window = parse_window(arg_lower.split("=", 1)[1])
         else:
             try:
                 num_episodes = int(arg)
             except ValueError:
-                print("Usage: python train.py [num_episodes] [algorithm] [--show-gui]")
+                print("Usage: python train.py [num_episodes] [algorithm] [--show-gui] [--per] [--envs=N] [--async]"
+                      " [--replay-ratio=R] [--learning-starts=N] [--train-every=K] [--batch-size=N] [--compile]"
+                      " [--live[=PORT]] [--profile] [--cprofile=A-B] [--torch-profile=A-B]"
+                      " [--keep-checkpoints=N] [--resume] [--state-dir=DIR]"
+                      " [--buffer-size=N] [--memmap-replay=DIR] [--fp16-states]"
+                      " [--record-dataset=DIR] [--offline=DIR] [--epochs=N] [--prefetch[=N]]")
                 print("\nArguments:")
                 print("  num_episodes : Number of episodes (default: 500)")
                 print("  algorithm    : Algorithm to use (default: ddqn)")
                 print("  --show-gui   : Show pygame window during test episodes")
+                print("  --per        : Use prioritized experience replay")
+                print("  --envs=N     : Collect experience from N vectorized environments")
+                print("  --async      : Step vectorized environments in subprocesses")
+                print("  --replay-ratio=R    : Gradient updates per env transition (default: 1 per env step)")
+                print("  --learning-starts=N : Transitions collected before the first update")
+                print("  --train-every=K     : Run the owed updates together every K env steps")
+                print("  --batch-size=N      : Minibatch size per update (default: 64)")
+                print("  --compile           : torch.compile action selection and updates")
+                print(f"  --live[=PORT]       : Publish metrics for live_monitor.py (default port: {DEFAULT_PORT})")
+                print("  --keep-checkpoints=N: Periodic checkpoints kept on disk (default: 5, 0 = all)")
+                print("  --buffer-size=N     : Replay capacity in transitions (default: 10000)")
+                print("  --memmap-replay=DIR : Keep replay states in memory-mapped files under DIR (uniform replay)")
+                print("  --fp16-states       : Store memory-mapped replay states as float16")
+                print("  --prefetch[=N]      : Gather up to N minibatches ahead on a background thread (default: 2)")
+                print("  --record-dataset=DIR: Record every transition to a chunked offline dataset")
+                print("  --offline=DIR       : Train from a recorded dataset only (no env stepping)")
+                print("  --epochs=N          : Passes over the offline dataset (default: 1)")
+                print("  --resume            : Continue the run saved in --state-dir (same arguments)")
+                print("  --state-dir=DIR     : Resumable state saved every 50 episodes (default: models/training_state)")
+                print("  --profile           : Per-phase timing report (training_logs/<algorithm>_profile.txt)")
+                print("  --cprofile=A-B      : Also capture cProfile over episodes A..B")
+                print("  --torch-profile=A-B : Also capture torch.profiler over episodes A..B (Chrome trace)")
                 print("\nAvailable Algorithms:")
                 print("  dqn              : Vanilla DQN")
                 print("  ddqn, double_dqn : Double DQN (recommended)")
@@ -642,14 +1257,86 @@ if __name__ == "__main__":
                 print("  python train.py 1000 dueling")
                 print("  python train.py 1000 d3qn")
                 print("  python train.py ddqn --show-gui")
+                print("  python train.py 1000 d3qn --per")
+                print("  python train.py 1000 ddqn --envs=8 --async")
+                print("  python train.py 1000 ddqn --batch-size=256 --train-every=4 --replay-ratio=0.5")
+                print("  python train.py 1000 d3qn --compile")
+                print("  python train.py 1000 ddqn --live   (then: python live_monitor.py)")
+                print("  python train.py 200 ddqn --profile --torch-profile=50-52")
+                print("  python train.py 1000 ddqn --resume")
+                print("  python train.py 500 ddqn --record-dataset=datasets/ddqn_500")
+                print("  python train.py d3qn --offline=datasets/ddqn_500 --epochs=3")
+                print("  python train.py 5000 ddqn --buffer-size=20000000 --memmap-replay=/data/replay --fp16-states")
                 sys.exit(1)
 
+    if offline_dataset is not None:
+        train_offline(
+            offline_dataset,
+            algorithm=algorithm,
+            epochs=epochs,
+            updates_per_transition=updates_per_step if updates_per_step is not None else 1.0,
+            batch_size=batch_size,
+            buffer_capacity=max(buffer_capacity, 1_000_000),
+            prioritized_replay=prioritized_replay,
+            compile=compile,
+            prefetch=prefetch,
+        )
+        sys.exit(0)
+
     print("\n" + "="*60)
     print("Configuration:")
     print(f"  Episodes: {num_episodes}")
     print(f"  Algorithm: {algorithm.upper()}")
     print(f"  Environment: Official Gymnasium LunarLander-v3")
     print(f"  Show test GUI: {'Yes' if show_test_gui else 'No (final test only)'}")
+    print(f"  Replay: {'Prioritized (sum-tree)' if prioritized_replay else 'Uniform'}")
+    if num_envs > 1:
+        print(f"  Vector envs: {num_envs} ({'async' if async_envs else 'sync'})")
+    print(f"  Batch size: {batch_size}")
+    print(f"  Replay capacity: {buffer_capacity}"
+          + (f" (memory-mapped in {replay_dir}{', float16 states' if compress_states else ''})" if replay_dir else ""))
+    if updates_per_step is not None or train_every > 1 or learning_starts > 0:
+        print(f"  Updates: ratio {updates_per_step if updates_per_step is not None else 1.0 / num_envs}, "
+              f"every {train_every} step(s), start after {learning_starts} transitions")
+    if compile:
+        print("  Compiled: Yes (torch.compile, eager fallback)")
+    if live_port is not None:
+        print(f"  Live monitor: udp://127.0.0.1:{live_port}")
+    if resume:
+        print(f"  Resume: {state_dir}")
+    if record_dataset is not None:
+        print(f"  Record dataset: {record_dataset}")
+    if prefetch:
+        print(f"  Prefetch: {prefetch} minibatches (background sampler)")
+    if profile or cprofile_window or torch_profile_window:
+        print("  Profiling: phase timers"
+              + (f", cProfile episodes {cprofile_window[0]}-{cprofile_window[1]}" if cprofile_window else "")
+              + (f", torch.profiler episodes {torch_profile_window[0]}-{torch_profile_window[1]}"
+                 if torch_profile_window else ""))
     print("="*60 + "\n")
 
-    train_dqn(num_episodes=num_episodes, algorithm=algorithm, show_test_gui=show_test_gui)
+    train_dqn(
+        num_episodes=num_episodes,
+        algorithm=algorithm,
+        show_test_gui=show_test_gui,
+        prioritized_replay=prioritized_replay,
+        num_envs=num_envs,
+        async_envs=async_envs,
+        updates_per_step=updates_per_step,
+        learning_starts=learning_starts,
+        train_every=train_every,
+        batch_size=batch_size,
+        compile=compile,
+        live_port=live_port,
+        profile=profile,
+        cprofile_window=cprofile_window,
+        torch_profile_window=torch_profile_window,
+        keep_checkpoints=keep_checkpoints,
+        state_dir=state_dir,
+        resume=resume,
+        buffer_capacity=buffer_capacity,
+        replay_dir=replay_dir,
+        compress_states=compress_states,
+        record_dataset=record_dataset,
+        prefetch=prefetch,
+    )
@@ -4,9 +4,42 @@
 """
 
 import json
+import time
+from collections import deque
 from pathlib import Path
 from datetime import datetime
 
+import numpy as np
+
+# get_summary 의 최근 구간 통계 길이와 성공 기준
+SUMMARY_WINDOW = 100
+SUCCESS_THRESHOLD = 200
+
+
+def normalize_algorithm_name(algorithm_name):
+    """알고리즘 이름을 로그 파일 이름(vanilla, double, dueling, d3qn)으로 변환"""
+    algorithm = algorithm_name.lower().replace(' ', '_').replace('dqn', '').replace('_', '')
+    if 'dueling' in algorithm and 'double' in algorithm:
+        algorithm = 'd3qn'
+    elif 'vanilla' not in algorithm:
+        # vanilla, double, dueling, d3qn 중 하나로 매칭
+        if 'double' in algorithm_name.lower():
+            algorithm = 'double'
+        elif 'dueling' in algorithm_name.lower():
+            algorithm = 'dueling'
+    # "DQN" 처럼 접두어가 없으면 vanilla
+    return algorithm or 'vanilla'
+
+
+def _recent_summary(rewards):
+    """최근 SUMMARY_WINDOW 에피소드 보상의 평균 ± 표준편차와 성공률"""
+    rewards = np.asarray(rewards, dtype=np.float64)
+    n = len(rewards)
+    success = (rewards >= SUCCESS_THRESHOLD).mean() * 100
+    summary = f"최근 {n} 에피소드: {rewards.mean():.2f} ± {rewards.std():.2f}\n"
+    summary += f"최근 {n} 에피소드 성공률 ({SUCCESS_THRESHOLD}+): {success:.1f}%\n"
+    return summary
+
 
 class TrainingLogger:
     """학습 과정 데이터를 기록하는 로거"""
@@ -16,15 +49,7 @@ class TrainingLogger:
         Args:
             algorithm_name: 알고리즘 이름 (vanilla, double, dueling, d3qn)
         """
-        self.algorithm = algorithm_name.lower().replace(' ', '_').replace('dqn', '').replace('_', '')
-        if 'dueling' in self.algorithm and 'double' in self.algorithm:
-            self.algorithm = 'd3qn'
-        elif 'vanilla' not in self.algorithm:
-            # vanilla, double, dueling, d3qn 중 하나로 매칭
-            if 'double' in algorithm_name.lower():
-                self.algorithm = 'double'
-            elif 'dueling' in algorithm_name.lower():
-                self.algorithm = 'dueling'
+        self.algorithm = normalize_algorithm_name(algorithm_name)
 
         self.data = {
             'algorithm': algorithm_name,
@@ -83,6 +108,7 @@ class TrainingLogger:
         summary += f"에피소드: {len(self.data['episodes'])}\n"
         summary += f"최고 보상: {max(self.data['best_rewards']):.2f}\n"
         summary += f"최종 평균: {self.data['avg_rewards'][-1]:.2f}\n"
+        summary += _recent_summary(self.data['rewards'][-SUMMARY_WINDOW:])
         summary += f"테스트 횟수: {len(self.data['test_rewards'])}\n"
         if self.data['final_test_rewards']:
             avg_final = sum(self.data['final_test_rewards']) / len(self.data['final_test_rewards'])
@@ -90,3 +116,225 @@ class TrainingLogger:
         summary += f"{'='*60}\n"
 
         return summary
+
+
+class StreamingTrainingLogger:
+    """
+    추가 전용(append-only) 스트리밍 로거
+
+    TrainingLogger와 같은 인터페이스이지만 기록을 메모리 리스트에 쌓지 않고
+    training_logs/<algorithm>_log.jsonl 에 한 줄씩(JSON Lines) 추가합니다.
+    - 쓰기는 버퍼링되며 flush_every 개 또는 flush_interval 초마다 파일에 반영
+      (학습이 중간에 죽어도 마지막 flush 까지의 기록은 남음)
+    - 스텝 단위 지표는 별도 파일 <algorithm>_steps.jsonl 에 기록
+      (step_every 번째 호출마다 1개씩 샘플링)
+    - 요약에 필요한 값만 누적하므로 메모리 사용량이 에피소드 수와 무관
+    """
+
+    def __init__(self, algorithm_name, log_dir='training_logs',
+                 flush_every=100, flush_interval=5.0, step_every=1):
+        """
+        Args:
+            algorithm_name: 알고리즘 이름 (vanilla, double, dueling, d3qn)
+            log_dir: 로그 디렉토리
+            flush_every: 버퍼에 쌓인 레코드가 이 개수 이상이면 flush
+            flush_interval: 마지막 flush 후 이 시간(초)이 지나면 flush
+            step_every: log_step() 호출 중 기록할 간격
+        """
+        self.algorithm_name = algorithm_name
+        self.algorithm = normalize_algorithm_name(algorithm_name)
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.step_every = max(1, int(step_every))
+
+        # 로그 디렉토리 생성
+        self.log_dir = Path(log_dir)
+        self.log_dir.mkdir(exist_ok=True)
+
+        self.closed = False
+        self._last_flush = time.monotonic()
+        self._step_calls = 0
+        self._open()
+
+        # get_summary 용 누적 값
+        self.num_episodes = 0
+        self.best_reward = None
+        self.last_avg_reward = None
+        self.recent_rewards = deque(maxlen=SUMMARY_WINDOW)
+        self.num_tests = 0
+        self.final_test_rewards = []
+
+        self._write({'type': 'meta', 'algorithm': algorithm_name,
+                     'start_time': datetime.now().isoformat()})
+
+    def _open(self):
+        """로그 파일 열기 (하위 클래스에서 저장 형식 변경)"""
+        self.path = self.log_dir / f'{self.algorithm}_log.jsonl'
+        self.step_path = self.log_dir / f'{self.algorithm}_steps.jsonl'
+        self._file = open(self.path, 'w')
+        self._step_file = None
+        self._buffer = []
+        self._step_buffer = []
+
+    def _write(self, record):
+        self._buffer.append(json.dumps(record))
+        self._maybe_flush()
+
+    def _write_step(self, record):
+        self._step_buffer.append(json.dumps(record))
+        self._maybe_flush()
+
+    def _pending(self):
+        """아직 파일에 쓰지 않은 레코드 수"""
+        return len(self._buffer) + len(self._step_buffer)
+
+    def _maybe_flush(self):
+        if (self._pending() >= self.flush_every
+                or time.monotonic() - self._last_flush >= self.flush_interval):
+            self.flush()
+
+    def flush(self):
+        """버퍼의 레코드를 파일에 기록"""
+        if self._buffer:
+            self._file.write('\n'.join(self._buffer) + '\n')
+            self._file.flush()
+            self._buffer.clear()
+        if self._step_buffer:
+            if self._step_file is None:
+                self._step_file = open(self.step_path, 'w')
+            self._step_file.write('\n'.join(self._step_buffer) + '\n')
+            self._step_file.flush()
+            self._step_buffer.clear()
+        self._last_flush = time.monotonic()
+
+    def log_episode(self, episode, reward, avg_reward, best_reward, loss, epsilon):
+        """에피소드 데이터 기록"""
+        self._write({'type': 'episode', 'episode': episode, 'reward': float(reward),
+                     'avg_reward': float(avg_reward), 'best_reward': float(best_reward),
+                     'loss': float(loss) if loss is not None else 0.0, 'epsilon': float(epsilon)})
+        self.num_episodes += 1
+        self.best_reward = best_reward if self.best_reward is None else max(self.best_reward, best_reward)
+        self.last_avg_reward = avg_reward
+        self.recent_rewards.append(float(reward))
+
+    def log_step(self, step, **metrics):
+        """스텝 단위 지표 기록 (예: log_step(1000, loss=0.12, epsilon=0.5))"""
+        self._step_calls += 1
+        if self._step_calls % self.step_every != 0:
+            return
+        self._write_step({'step': step, **{k: float(v) for k, v in metrics.items()}})
+
+    def log_test(self, episode, test_reward):
+        """테스트 결과 기록"""
+        self._write({'type': 'test', 'episode': episode, 'reward': float(test_reward)})
+        self.num_tests += 1
+
+    def log_final_tests(self, test_rewards):
+        """최종 테스트 결과 기록 (Best Model 3회)"""
+        self.final_test_rewards = [float(r) for r in test_rewards]
+        self._write({'type': 'final', 'rewards': self.final_test_rewards})
+
+    def save(self):
+        """종료 시각을 기록하고 파일을 닫음"""
+        self.close()
+        print(f"📊 학습 데이터 저장: {self.path}")
+
+    def close(self):
+        if self.closed:
+            return
+        self._write({'type': 'end', 'end_time': datetime.now().isoformat()})
+        self.flush()
+        self._close_files()
+        self.closed = True
+
+    def _close_files(self):
+        self._file.close()
+        if self._step_file is not None:
+            self._step_file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def get_summary(self):
+        """학습 요약 반환"""
+        if not self.num_episodes:
+            return "No data logged yet"
+
+        summary = f"\n{'='*60}\n"
+        summary += f"학습 요약 - {self.algorithm_name}\n"
+        summary += f"{'='*60}\n"
+        summary += f"에피소드: {self.num_episodes}\n"
+        summary += f"최고 보상: {self.best_reward:.2f}\n"
+        summary += f"최종 평균: {self.last_avg_reward:.2f}\n"
+        summary += _recent_summary(self.recent_rewards)
+        summary += f"테스트 횟수: {self.num_tests}\n"
+        if self.final_test_rewards:
+            avg_final = sum(self.final_test_rewards) / len(self.final_test_rewards)
+            summary += f"최종 테스트 평균: {avg_final:.2f}\n"
+        summary += f"{'='*60}\n"
+
+        return summary
+
+
+def _read_jsonl(filepath):
+    """JSON Lines 파일을 한 줄씩 읽음 (비정상 종료로 잘린 마지막 줄은 무시)"""
+    with open(filepath, 'r') as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                break
+
+
+def load_streaming_log(filepath):
+    """
+    StreamingTrainingLogger 의 .jsonl 로그를 TrainingLogger.save() 와 같은
+    dict 형태로 복원 (visualize.load_training_data 에서 사용)
+    """
+    data = {
+        'algorithm': None,
+        'start_time': None,
+        'episodes': [],
+        'rewards': [],
+        'avg_rewards': [],
+        'best_rewards': [],
+        'losses': [],
+        'epsilons': [],
+        'test_rewards': [],
+        'test_episodes': [],
+        'final_test_rewards': []
+    }
+    for record in _read_jsonl(filepath):
+        kind = record.get('type')
+        if kind == 'episode':
+            data['episodes'].append(record['episode'])
+            data['rewards'].append(record['reward'])
+            data['avg_rewards'].append(record['avg_reward'])
+            data['best_rewards'].append(record['best_reward'])
+            data['losses'].append(record['loss'])
+            data['epsilons'].append(record['epsilon'])
+        elif kind == 'test':
+            data['test_episodes'].append(record['episode'])
+            data['test_rewards'].append(record['reward'])
+        elif kind == 'final':
+            data['final_test_rewards'] = record['rewards']
+        elif kind == 'meta':
+            data['algorithm'] = record['algorithm']
+            data['start_time'] = record['start_time']
+        elif kind == 'end':
+            data['end_time'] = record['end_time']
+    return data
+
+
+def load_step_metrics(filepath):
+    """스텝 지표 .jsonl 을 {지표 이름: 리스트} 형태로 읽음 ('step' 포함)"""
+    columns = {}
+    for i, record in enumerate(_read_jsonl(filepath)):
+        for key, value in record.items():
+            columns.setdefault(key, [None] * i).append(value)
+        for key in columns.keys() - record.keys():
+            columns[key].append(None)
+    return columns
@@ -0,0 +1,107 @@
+"""
+Resumable training state for train_dqn
+Everything needed to continue a preempted run on the same trajectory:
+agent checkpoint, replay buffer arrays, RNG states and loop counters
+"""
+
+import os
+import random
+import shutil
+
+import numpy as np
+import torch
+
+from checkpoint import atomic_save
+
+
+AGENT_FILE = "agent.pt"
+STATE_FILE = "state.pt"
+BUFFER_DIR = "replay_buffer"
+
+
+def capture_rng_state(env=None):
+    """Python, NumPy and torch global RNG states (plus the env's own generator)"""
+    state = {
+        "python": random.getstate(),
+        "numpy": np.random.get_state(),
+        "torch": torch.get_rng_state(),
+    }
+    if env is not None:
+        state["env"] = env.np_random.bit_generator.state
+    return state
+
+
+def restore_rng_state(state, env=None):
+    random.setstate(state["python"])
+    np.random.set_state(state["numpy"])
+    torch.set_rng_state(state["torch"])
+    if env is not None and "env" in state:
+        env.np_random.bit_generator.state = state["env"]
+
+
+def save_training_state(directory, agent, counters, env=None):
+    """
+    Write a resumable snapshot to directory
+
+    Layout:
+    - agent.pt        : agent.checkpoint_state() (networks, optimizer, epsilon)
+    - replay_buffer/  : ReplayBuffer.save() column arrays (.npy) + meta.json
+    - state.pt        : counters (episode, steps, best reward, scheduler,
+                        logger rows, ...) and RNG states
+
+    The snapshot is assembled in <directory>.tmp and swapped in afterwards,
+    so an interruption while saving leaves the previous snapshot intact
+    (in <directory>.old if it happens between the two renames of the swap,
+    which has_training_state / load_training_state fall back to).
+    """
+    directory = str(directory).rstrip("/")
+    tmp_dir, old_dir = f"{directory}.tmp", f"{directory}.old"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    atomic_save(agent.checkpoint_state(), os.path.join(tmp_dir, AGENT_FILE))
+    agent.replay_buffer.save(os.path.join(tmp_dir, BUFFER_DIR))
+    atomic_save({"counters": counters, "rng": capture_rng_state(env)}, os.path.join(tmp_dir, STATE_FILE))
+
+    if os.path.isdir(directory):
+        shutil.rmtree(old_dir, ignore_errors=True)
+        os.rename(directory, old_dir)
+    # else: an earlier swap was interrupted and <directory>.old is the latest
+    # snapshot; keep it until the new one is in place
+    os.rename(tmp_dir, directory)
+    shutil.rmtree(old_dir, ignore_errors=True)
+
+
+def _snapshot_dir(directory):
+    """directory, or <directory>.old when a save was interrupted mid-swap; None if neither holds a snapshot"""
+    directory = str(directory).rstrip("/")
+    for candidate in (directory, f"{directory}.old"):
+        if os.path.exists(os.path.join(candidate, STATE_FILE)):
+            return candidate
+    return None
+
+
+def has_training_state(directory):
+    return _snapshot_dir(directory) is not None
+
+
+def load_training_state(directory, agent, env=None):
+    """
+    Restore agent, replay buffer and RNG states from save_training_state()
+
+    Returns:
+        the counters dict passed to save_training_state()
+    """
+    snapshot = _snapshot_dir(directory)
+    if snapshot is None:
+        raise FileNotFoundError(f"No training state to resume in {directory}")
+    directory = snapshot
+    agent.load(os.path.join(directory, AGENT_FILE))
+    agent.replay_buffer.load(os.path.join(directory, BUFFER_DIR))
+    if agent.target_cache is not None:
+        agent.target_cache.invalidate()
+
+    # RNG states contain NumPy arrays, so this trusted local file is not weights_only
+    state = torch.load(os.path.join(directory, STATE_FILE), weights_only=False)
+    restore_rng_state(state["rng"], env)
+    return state["counters"]
@@ -0,0 +1,40 @@
+"""
+Replay-ratio update scheduling for the DQN training loops
+Decides how many gradient updates to run after each environment step
+"""
+
+
+class UpdateScheduler:
+    """
+    Update Scheduler
+
+    - updates_per_step: replay ratio, gradient updates per environment
+      transition (fractional values accumulate, e.g. 0.25 = one update
+      every 4 transitions)
+    - learning_starts: no updates until the replay buffer holds at least
+      this many transitions
+    - train_every: only release updates every K calls; the updates owed for
+      those K steps are released together so they can be drawn as one
+      K x batch_size sample and run back to back
+    """
+
+    def __init__(self, updates_per_step=1.0, learning_starts=0, train_every=1):
+        self.updates_per_step = updates_per_step
+        self.learning_starts = learning_starts
+        self.train_every = max(1, int(train_every))
+        self.calls = 0
+        self.credit = 0.0
+
+    def step(self, buffer_size, env_steps=1):
+        """Register env_steps new transitions; returns the number of updates due now"""
+        self.calls += 1
+        if buffer_size < self.learning_starts:
+            return 0
+
+        self.credit += env_steps * self.updates_per_step
+        if self.calls % self.train_every != 0:
+            return 0
+
+        num_updates = int(self.credit)
+        self.credit -= num_updates
+        return num_updates
@@ -3,12 +3,23 @@ LunarLander-v3 DQN Algorithms - 시계열 시각화
 4개 알고리즘의 학습 과정을 비교하는 그래프 생성
 """
 
+import hashlib
+import inspect
 import json
+import multiprocessing as mp
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
 import numpy as np
 import matplotlib.pyplot as plt
 import matplotlib.font_manager as fm
 from pathlib import Path
 
+from training_logger import load_streaming_log
+from columnar_log import load_columnar_log
+import rolling_stats
+
 # 한글 폰트 설정 (macOS)
 plt.rcParams['font.family'] = 'AppleGothic'
 plt.rcParams['axes.unicode_minus'] = False
@@ -29,35 +40,123 @@ LABELS = {
 }
 
 
-def load_training_data(algorithm):
-    """알고리즘별 학습 데이터 로드"""
-    data_file = Path(f'training_logs/{algorithm}_log.json')
-    if data_file.exists():
-        with open(data_file, 'r') as f:
-            return json.load(f)
-    return None
+# (로그 디렉토리, 알고리즘)별 로드 결과와 이동 통계 캐시 (여섯 plot_* 함수가 공유)
+_DATA_CACHE = {}
+_STATS_CACHE = {}
+
+ALGORITHMS = ['vanilla', 'double', 'dueling', 'd3qn']
+
+# 그래프별 이동 통계 윈도우
+REWARD_WINDOW = 50
+LOSS_WINDOW = 20
+SUCCESS_WINDOW = 100
+SUCCESS_THRESHOLD = 200
+
+
+def _latest_mtime(path):
+    """파일 또는 디렉토리(내부 파일 중 최신)의 수정 시각"""
+    if path.is_dir():
+        return max((p.stat().st_mtime for p in path.rglob('*') if p.is_file()), default=0)
+    return path.stat().st_mtime
+
+
+def clear_data_cache():
+    """캐시 비우기 (학습 로그가 새로 기록된 후 다시 읽을 때)"""
+    _DATA_CACHE.clear()
+    _STATS_CACHE.clear()
+
+
+def load_training_data(algorithm, log_dir='training_logs'):
+    """
+    알고리즘별 학습 데이터 로드 (프로세스당 한 번만 읽고 캐시)
+
+    log_dir 의 컬럼형 로그 디렉토리(<algo>_log/, np.memmap 으로 즉시 로드),
+    스트리밍 .jsonl, 기존 .json 중 가장 최근에 기록된 것을 사용
+    """
+    key = (str(log_dir), algorithm)
+    if key in _DATA_CACHE:
+        return _DATA_CACHE[key]
+
+    found = find_log(algorithm, log_dir)
+    data = None
+    if found is not None:
+        path, loader = found
+        data = loader(path)
+    _DATA_CACHE[key] = data
+    return data
 
 
-def plot_reward_comparison():
+def find_log(algorithm, log_dir='training_logs'):
+    """load_training_data 가 읽을 로그 (경로, 로더), 없으면 None"""
+    log_dir = Path(log_dir)
+    candidates = [
+        (log_dir / f'{algorithm}_log', load_columnar_log),
+        (log_dir / f'{algorithm}_log.jsonl', load_streaming_log),
+        (log_dir / f'{algorithm}_log.json', _load_json),
+    ]
+    candidates = [(path, loader) for path, loader in candidates if path.exists()]
+    if not candidates:
+        return None
+    return max(candidates, key=lambda c: _latest_mtime(c[0]))
+
+
+def compute_rolling_stats(data):
+    """
+    보상/Loss/성공률 그래프가 공유하는 이동 통계를 한 번에 계산
+
+    Returns:
+        {'reward_ma': (episodes, 50-이동평균), 'loss_ma': (episodes, 20-이동평균),
+         'success': (구간 끝 episodes, 100 에피소드 구간별 성공률 %)}
+    """
+    # memmap 이 아닌 일반 배열로 복사 (워커 프로세스로 넘길 수 있도록)
+    episodes = np.array(data['episodes'])
+    avg_rewards = np.asarray(data['avg_rewards'], dtype=np.float64)
+    losses = np.asarray(data.get('losses', []), dtype=np.float64)
+
+    def aligned(values, window):
+        # 값이 window 개보다 적으면 원본 그대로
+        if len(values) >= window:
+            return episodes[window-1:], rolling_stats.rolling_mean(values, window)
+        return episodes[:len(values)], values
+
+    success_last, success_rates = rolling_stats.block_success_rate(
+        avg_rewards, SUCCESS_WINDOW, SUCCESS_THRESHOLD)
+
+    return {
+        'reward_ma': aligned(avg_rewards, REWARD_WINDOW),
+        'loss_ma': aligned(losses, LOSS_WINDOW),
+        'success': (episodes[success_last], success_rates),
+    }
+
+
+def load_rolling_stats(algorithm, log_dir='training_logs'):
+    """compute_rolling_stats 결과를 (로그 디렉토리, 알고리즘)별로 캐시"""
+    key = (str(log_dir), algorithm)
+    if key not in _STATS_CACHE:
+        data = load_training_data(algorithm, log_dir)
+        _STATS_CACHE[key] = None if data is None else compute_rolling_stats(data)
+    return _STATS_CACHE[key]
+
+
+def _load_json(data_file):
+    with open(data_file, 'r') as f:
+        return json.load(f)
+
+
+def plot_reward_comparison(log_dir='training_logs', output_dir='visualizations'):
     """평균 보상 비교 그래프"""
     fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(16, 6))
 
-    for algo in ['vanilla', 'double', 'dueling', 'd3qn']:
-        data = load_training_data(algo)
+    for algo in ALGORITHMS:
+        data = load_training_data(algo, log_dir)
         if data is None:
             continue
 
         episodes = data['episodes']
         avg_rewards = data['avg_rewards']
 
-        # 이동 평균 계산 (50 에피소드)
-        window = 50
-        if len(avg_rewards) >= window:
-            moving_avg = np.convolve(avg_rewards, np.ones(window)/window, mode='valid')
-            moving_episodes = episodes[window-1:]
-        else:
-            moving_avg = avg_rewards
-            moving_episodes = episodes
+        # 이동 평균 (50 에피소드, 미리 계산된 통계 사용)
+        moving_episodes, moving_avg = load_rolling_stats(algo, log_dir)['reward_ma']
 
         # 원본 데이터 (투명)
         ax1.plot(episodes, avg_rewards, color=COLORS[algo], alpha=0.2, linewidth=0.5)
@@ -73,8 +172,8 @@ def plot_reward_comparison():
     ax1.axhline(y=200, color='red', linestyle='--', alpha=0.5, label='목표 (200+)')
 
     # 최고 보상 비교
-    for algo in ['vanilla', 'double', 'dueling', 'd3qn']:
-        data = load_training_data(algo)
+    for algo in ALGORITHMS:
+        data = load_training_data(algo, log_dir)
         if data is None:
             continue
 
@@ -92,25 +191,29 @@ def plot_reward_comparison():
     ax2.axhline(y=300, color='red', linestyle='--', alpha=0.5, label='목표 (300+)')
 
     plt.tight_layout()
-    plt.savefig('visualizations/reward_comparison.png', dpi=300, bbox_inches='tight')
-    print("✅ 저장됨: visualizations/reward_comparison.png")
+    plt.savefig(f'{output_dir}/reward_comparison.png', dpi=300, bbox_inches='tight')
+    print(f"✅ 저장됨: {output_dir}/reward_comparison.png")
     plt.close()
 
 
-def plot_test_performance():
+def plot_test_performance(log_dir='training_logs', output_dir='visualizations'):
     """테스트 성능 비교 (매 100 에피소드)"""
     fig, ax = plt.subplots(figsize=(14, 7))
 
     test_episodes = [100, 200, 300, 400, 500, 600, 700, 800, 900, 1000]
 
-    for algo in ['vanilla', 'double', 'dueling', 'd3qn']:
-        data = load_training_data(algo)
+    for algo in ALGORITHMS:
+        data = load_training_data(algo, log_dir)
         if data is None:
             continue
 
         test_rewards = data.get('test_rewards', [])
         if len(test_rewards) > 0:
-            ax.plot(test_episodes[:len(test_rewards)], test_rewards,
+            # 로그에 테스트 에피소드가 있으면 사용 (없으면 100 단위 가정)
+            episodes = data.get('test_episodes', [])
+            if len(episodes) != len(test_rewards):
+                episodes = test_episodes[:len(test_rewards)]
+            ax.plot(episodes, test_rewards,
                    color=COLORS[algo], marker='o', markersize=8,
                    label=LABELS[algo], linewidth=2)
 
@@ -123,17 +226,17 @@ def plot_test_performance():
     ax.axhline(y=0, color='red', linestyle='--', alpha=0.3, linewidth=1)
 
     plt.tight_layout()
-    plt.savefig('visualizations/test_performance.png', dpi=300, bbox_inches='tight')
-    print("✅ 저장됨: visualizations/test_performance.png")
+    plt.savefig(f'{output_dir}/test_performance.png', dpi=300, bbox_inches='tight')
+    print(f"✅ 저장됨: {output_dir}/test_performance.png")
     plt.close()
 
 
-def plot_loss_comparison():
+def plot_loss_comparison(log_dir='training_logs', output_dir='visualizations'):
     """Loss 추이 비교"""
     fig, ax = plt.subplots(figsize=(14, 7))
 
-    for algo in ['vanilla', 'double', 'dueling', 'd3qn']:
-        data = load_training_data(algo)
+    for algo in ALGORITHMS:
+        data = load_training_data(algo, log_dir)
         if data is None:
             continue
 
@@ -141,14 +244,8 @@ def plot_loss_comparison():
         losses = data.get('losses', [])
 
         if len(losses) > 0:
-            # 이동 평균으로 부드럽게
-            window = 20
-            if len(losses) >= window:
-                moving_avg = np.convolve(losses, np.ones(window)/window, mode='valid')
-                moving_episodes = episodes[window-1:]
-            else:
-                moving_avg = losses
-                moving_episodes = episodes
+            # 이동 평균으로 부드럽게 (20 에피소드, 미리 계산된 통계 사용)
+            moving_episodes, moving_avg = load_rolling_stats(algo, log_dir)['loss_ma']
 
             ax.plot(episodes, losses, color=COLORS[algo], alpha=0.2, linewidth=0.5)
             ax.plot(moving_episodes, moving_avg, color=COLORS[algo],
@@ -162,17 +259,17 @@ def plot_loss_comparison():
     ax.set_ylim(bottom=0)
 
     plt.tight_layout()
-    plt.savefig('visualizations/loss_comparison.png', dpi=300, bbox_inches='tight')
-    print("✅ 저장됨: visualizations/loss_comparison.png")
+    plt.savefig(f'{output_dir}/loss_comparison.png', dpi=300, bbox_inches='tight')
+    print(f"✅ 저장됨: {output_dir}/loss_comparison.png")
     plt.close()
 
 
-def plot_epsilon_comparison():
+def plot_epsilon_comparison(log_dir='training_logs', output_dir='visualizations'):
     """Epsilon 감소 추이"""
     fig, ax = plt.subplots(figsize=(14, 7))
 
-    for algo in ['vanilla', 'double', 'dueling', 'd3qn']:
-        data = load_training_data(algo)
+    for algo in ALGORITHMS:
+        data = load_training_data(algo, log_dir)
         if data is None:
             continue
 
@@ -191,12 +288,12 @@ def plot_epsilon_comparison():
     ax.set_ylim(0, 1.05)
 
     plt.tight_layout()
-    plt.savefig('visualizations/epsilon_comparison.png', dpi=300, bbox_inches='tight')
-    print("✅ 저장됨: visualizations/epsilon_comparison.png")
+    plt.savefig(f'{output_dir}/epsilon_comparison.png', dpi=300, bbox_inches='tight')
+    print(f"✅ 저장됨: {output_dir}/epsilon_comparison.png")
     plt.close()
 
 
-def plot_final_comparison():
+def plot_final_comparison(log_dir='training_logs', output_dir='visualizations'):
     """최종 성능 비교 (막대 그래프)"""
     fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(16, 12))
 
@@ -205,18 +302,18 @@ def plot_final_comparison():
     final_avg_rewards = []
     final_test_rewards = []
 
-    for algo in ['vanilla', 'double', 'dueling', 'd3qn']:
-        data = load_training_data(algo)
+    for algo in ALGORITHMS:
+        data = load_training_data(algo, log_dir)
         if data is None:
             continue
 
         algorithms.append(LABELS[algo])
-        best_rewards.append(max(data['best_rewards']))
-        final_avg_rewards.append(data['avg_rewards'][-1] if data['avg_rewards'] else 0)
+        best_rewards.append(np.max(data['best_rewards']))
+        final_avg_rewards.append(data['avg_rewards'][-1] if len(data['avg_rewards']) else 0)
 
         # 최종 3회 테스트 평균
         final_tests = data.get('final_test_rewards', [])
-        final_test_rewards.append(np.mean(final_tests) if final_tests else 0)
+        final_test_rewards.append(np.mean(final_tests) if len(final_tests) else 0)
 
     x_pos = np.arange(len(algorithms))
     colors = [COLORS[algo] for algo in ['vanilla', 'double', 'dueling', 'd3qn'][:len(algorithms)]]
@@ -272,34 +369,22 @@ def plot_final_comparison():
             ax4.text(i, v + 2, f'{v:.1f}', ha='center', va='bottom', fontweight='bold')
 
     plt.tight_layout()
-    plt.savefig('visualizations/final_comparison.png', dpi=300, bbox_inches='tight')
-    print("✅ 저장됨: visualizations/final_comparison.png")
+    plt.savefig(f'{output_dir}/final_comparison.png', dpi=300, bbox_inches='tight')
+    print(f"✅ 저장됨: {output_dir}/final_comparison.png")
     plt.close()
 
 
-def plot_success_rate():
+def plot_success_rate(log_dir='training_logs', output_dir='visualizations'):
     """성공률 분석 (200+ 보상 달성 비율)"""
     fig, ax = plt.subplots(figsize=(14, 7))
 
-    for algo in ['vanilla', 'double', 'dueling', 'd3qn']:
-        data = load_training_data(algo)
+    for algo in ALGORITHMS:
+        data = load_training_data(algo, log_dir)
         if data is None:
             continue
 
-        episodes = data['episodes']
-        avg_rewards = data['avg_rewards']
-
-        # 100 에피소드 단위로 성공률 계산
-        window = 100
-        success_rates = []
-        success_episodes = []
-
-        for i in range(0, len(avg_rewards), window):
-            end_idx = min(i + window, len(avg_rewards))
-            window_rewards = avg_rewards[i:end_idx]
-            success_rate = sum(1 for r in window_rewards if r >= 200) / len(window_rewards) * 100
-            success_rates.append(success_rate)
-            success_episodes.append(episodes[end_idx - 1])
+        # 100 에피소드 단위 성공률 (미리 계산된 통계 사용)
+        success_episodes, success_rates = load_rolling_stats(algo, log_dir)['success']
 
         ax.plot(success_episodes, success_rates, color=COLORS[algo],
                marker='o', markersize=6, label=LABELS[algo], linewidth=2)
@@ -313,38 +398,215 @@ def plot_success_rate():
     ax.axhline(y=80, color='green', linestyle='--', alpha=0.5, linewidth=2, label='목표 (80%)')
 
     plt.tight_layout()
-    plt.savefig('visualizations/success_rate.png', dpi=300, bbox_inches='tight')
-    print("✅ 저장됨: visualizations/success_rate.png")
+    plt.savefig(f'{output_dir}/success_rate.png', dpi=300, bbox_inches='tight')
+    print(f"✅ 저장됨: {output_dir}/success_rate.png")
     plt.close()
 
 
-def create_all_visualizations():
+# 그래프 이름 -> 그리기 함수 (서로 독립이므로 병렬 렌더링 가능)
+FIGURES = {
+    'reward_comparison': plot_reward_comparison,
+    'test_performance': plot_test_performance,
+    'loss_comparison': plot_loss_comparison,
+    'epsilon_comparison': plot_epsilon_comparison,
+    'final_comparison': plot_final_comparison,
+    'success_rate': plot_success_rate,
+}
+
+
+def _init_render_worker():
+    """렌더링 워커: 화면 없는 Agg 백엔드 사용"""
+    plt.switch_backend('Agg')
+
+
+def _render_figure(name, log_dir, output_dir, data, stats):
+    """워커 프로세스에서 그래프 하나 렌더링 (부모가 읽은 로그와 계산한 이동 통계 재사용)"""
+    for algo, algo_data in data.items():
+        _DATA_CACHE[(str(log_dir), algo)] = algo_data
+    for algo, algo_stats in stats.items():
+        _STATS_CACHE[(str(log_dir), algo)] = algo_stats
+    start = time.perf_counter()
+    FIGURES[name](log_dir, output_dir)
+    return name, time.perf_counter() - start
+
+
+MANIFEST_FILE = '.manifest.json'
+
+
+def _file_fingerprint(path, previous):
+    """
+    파일 하나의 {size, mtime_ns, sha256}
+
+    크기와 수정 시각이 manifest 에 기록된 값과 같으면 해시를 다시 계산하지 않음
+    """
+    stat = path.stat()
+    if previous and previous['size'] == stat.st_size and previous['mtime_ns'] == stat.st_mtime_ns:
+        return previous
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': digest.hexdigest()}
+
+
+def log_fingerprints(log_dir, previous=None):
+    """그래프 입력 로그 파일(컬럼형 로그는 내부 파일 전체)별 fingerprint"""
+    previous = previous or {}
+    fingerprints = {}
+    for algo in ALGORITHMS:
+        found = find_log(algo, log_dir)
+        if found is None:
+            continue
+        path = found[0]
+        files = sorted(p for p in path.rglob('*') if p.is_file()) if path.is_dir() else [path]
+        for file in files:
+            key = str(file)
+            fingerprints[key] = _file_fingerprint(file, previous.get(key))
+    return fingerprints
+
+
+def stats_code_hash():
+    """이동 통계 코드(rolling_stats 모듈 + compute_rolling_stats)의 해시"""
+    source = inspect.getsource(rolling_stats) + inspect.getsource(compute_rolling_stats)
+    return hashlib.sha256(source.encode()).hexdigest()
+
+
+def figure_key(name, fingerprints):
+    """입력 로그 내용 + 그리기 파라미터 + 그리기 함수와 이동 통계 코드의 해시"""
+    params = {
+        'figure': name,
+        'inputs': {path: fp['sha256'] for path, fp in sorted(fingerprints.items())},
+        'windows': [REWARD_WINDOW, LOSS_WINDOW, SUCCESS_WINDOW, SUCCESS_THRESHOLD],
+        'algorithms': ALGORITHMS,
+        'colors': COLORS,
+        'labels': LABELS,
+        'code': inspect.getsource(FIGURES[name]),
+        'stats_code': stats_code_hash(),
+    }
+    return hashlib.sha256(json.dumps(params, sort_keys=True).encode()).hexdigest()
+
+
+def _load_manifest(output_dir):
+    manifest_file = Path(output_dir) / MANIFEST_FILE
+    if manifest_file.exists():
+        try:
+            with open(manifest_file) as f:
+                return json.load(f)
+        except json.JSONDecodeError:
+            pass
+    return {'inputs': {}, 'figures': {}}
+
+
+def _save_manifest(output_dir, manifest):
+    """임시 파일에 쓰고 교체 (중간에 죽어도 manifest 가 깨지지 않음)"""
+    manifest_file = Path(output_dir) / MANIFEST_FILE
+    tmp_file = manifest_file.with_suffix('.tmp')
+    with open(tmp_file, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_file, manifest_file)
+
+
+def create_reports(runs, max_workers=None, force=False):
+    """
+    여러 학습 결과의 그래프를 한 프로세스 풀에서 렌더링
+
+    Args:
+        runs: (log_dir, output_dir) 목록
+        max_workers: 워커 수 (기본: CPU 수, 1 이면 현재 프로세스에서 순차 렌더링)
+
+    로그와 이동 통계는 부모 프로세스에서 실행(run)마다 한 번만 읽고 계산해
+    각 그래프 작업에 넘기므로, 전체 시간은 (워커가 충분하면) 가장 느린 그래프에 맞춰집니다.
+
+    output_dir/.manifest.json 에 그래프별 입력 로그 해시와 파라미터 해시를
+    기록해 두고, 바뀐 그래프(또는 PNG 가 없는 그래프)만 다시 그립니다.
+    force=True 면 모두 다시 그립니다.
+
+    Returns:
+        (다시 그린 그래프 수, 건너뛴 그래프 수)
+    """
+    tasks = []
+    manifests = {}
+    skipped = 0
+    for log_dir, output_dir in runs:
+        Path(output_dir).mkdir(parents=True, exist_ok=True)
+        manifest = _load_manifest(output_dir)
+        fingerprints = log_fingerprints(log_dir, manifest['inputs'])
+        manifest['inputs'] = fingerprints
+
+        stale = {}
+        for name in FIGURES:
+            key = figure_key(name, fingerprints)
+            if (force or manifest['figures'].get(name) != key
+                    or not (Path(output_dir) / f'{name}.png').exists()):
+                stale[name] = key
+        skipped += len(FIGURES) - len(stale)
+        manifests[str(output_dir)] = (manifest, stale)
+        if not stale:
+            continue
+
+        # 워커가 JSON 로그를 다시 읽고 파싱하지 않도록 파싱된 데이터와 통계를 함께 전달
+        # (컬럼형 로그는 워커에서 np.memmap 으로 바로 열리므로 경로만 넘김)
+        data = {}
+        for algo in ALGORITHMS:
+            found = find_log(algo, log_dir)
+            if found is None or found[1] is not load_columnar_log:
+                data[algo] = load_training_data(algo, log_dir)
+        stats = {algo: load_rolling_stats(algo, log_dir) for algo in ALGORITHMS}
+        tasks.extend((name, log_dir, output_dir, data, stats) for name in stale)
+
+    if max_workers is None:
+        max_workers = min(len(tasks), os.cpu_count() or 1)
+
+    def done(name, output_dir):
+        manifest, stale = manifests[str(output_dir)]
+        manifest['figures'][name] = stale[name]
+
+    try:
+        if max_workers <= 1:
+            if tasks:
+                plt.switch_backend('Agg')
+            for task in tasks:
+                _render_figure(*task)
+                done(task[0], task[2])
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers,
+                                     mp_context=mp.get_context('spawn'),
+                                     initializer=_init_render_worker) as pool:
+                futures = {pool.submit(_render_figure, *task): task for task in tasks}
+                for future in as_completed(futures):
+                    future.result()
+                    task = futures[future]
+                    done(task[0], task[2])
+    finally:
+        # 성공한 그래프만 manifest 에 반영 (실패한 그래프는 다음 실행 때 다시 그림)
+        for output_dir, (manifest, stale) in manifests.items():
+            _save_manifest(output_dir, manifest)
+
+    if skipped:
+        print(f"⏭️  변경 없음: {skipped}개 그래프 건너뜀")
+    return len(tasks), skipped
+
+
+def create_all_visualizations(log_dir='training_logs', output_dir='visualizations', max_workers=None,
+                              force=False):
     """모든 시각화 생성"""
     # 저장 디렉토리 생성
-    Path('visualizations').mkdir(exist_ok=True)
+    Path(output_dir).mkdir(exist_ok=True)
+    clear_data_cache()
 
     print("\n" + "="*60)
     print("📊 시각화 생성 중...")
     print("="*60)
 
     try:
-        plot_reward_comparison()
-        plot_test_performance()
-        plot_loss_comparison()
-        plot_epsilon_comparison()
-        plot_final_comparison()
-        plot_success_rate()
+        create_reports([(log_dir, output_dir)], max_workers, force)
 
         print("\n" + "="*60)
         print("✅ 모든 시각화 완료!")
         print("="*60)
         print("\n생성된 파일:")
-        print("  - visualizations/reward_comparison.png")
-        print("  - visualizations/test_performance.png")
-        print("  - visualizations/loss_comparison.png")
-        print("  - visualizations/epsilon_comparison.png")
-        print("  - visualizations/final_comparison.png")
-        print("  - visualizations/success_rate.png")
+        for name in FIGURES:
+            print(f"  - {output_dir}/{name}.png")
         print()
 
     except Exception as e:
@@ -354,4 +616,26 @@ def create_all_visualizations():
 
 
 if __name__ == '__main__':
-    create_all_visualizations()
+    import sys
+
+    max_workers = None
+    force = False
+    run_dirs = []
+    for arg in sys.argv[1:]:
+        if arg.startswith('--workers='):
+            max_workers = int(arg.split('=', 1)[1])
+        elif arg == '--force':
+            force = True
+        elif not arg.startswith('--'):
+            run_dirs.append(arg)
+        else:
+            print("Usage: python visualize.py [--workers=N] [--force] [run_dir ...]")
+            print("\n  run_dir 를 주면 각 run_dir/training_logs 로 run_dir/visualizations 생성")
+            print("  --force : 로그가 바뀌지 않은 그래프도 모두 다시 그리기")
+            sys.exit(1)
+
+    if run_dirs:
+        create_reports([(Path(d) / 'training_logs', Path(d) / 'visualizations') for d in run_dirs],
+                       max_workers, force)
+    else:
+        create_all_visualizations(max_workers=max_workers, force=force)